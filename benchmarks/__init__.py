@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks for Bio2BEL CTD. Run them with :code:`tox -e benchmark`."""
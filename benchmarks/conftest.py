@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Fixtures for the benchmarks, which share one synthetic CTD database per session."""
+
+import os
+
+import pytest
+
+from benchmarks.synthetic import SCALES, generate
+from bio2bel_ctd import Manager
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--ctd-scale',
+        default=os.environ.get('BIO2BEL_CTD_BENCHMARK_SCALE', 'small'),
+        help='The number of synthetic interactions to benchmark with: one of {} or a number'.format(
+            ', '.join(SCALES)),
+    )
+
+
+@pytest.fixture(scope='session')
+def ctd_interactions(request) -> int:
+    """The number of synthetic chemical-gene interactions."""
+    scale = request.config.getoption('--ctd-scale')
+    return SCALES[scale] if scale in SCALES else int(scale)
+
+
+@pytest.fixture(scope='session')
+def ctd_files(tmp_path_factory, ctd_interactions):
+    """The paths of the synthetic CTD files."""
+    directory = str(tmp_path_factory.mktemp('ctd'))
+    return generate(directory, ctd_interactions)
+
+
+@pytest.fixture(scope='session')
+def manager_cls(ctd_files, tmp_path_factory):
+    """A manager class that reads the synthetic files and caches BEL graphs in a temporary directory."""
+
+    class BenchmarkManager(Manager):
+        pyctd_data_dir = os.path.dirname(next(iter(ctd_files.values())))
+        bel_cache_dir = str(tmp_path_factory.mktemp('bel_cache'))
+
+    return BenchmarkManager
+
+
+@pytest.fixture(scope='session')
+def connection(tmp_path_factory) -> str:
+    """The connection string of the benchmark database."""
+    return 'sqlite:///{}'.format(tmp_path_factory.mktemp('db') / 'ctd.db')
+
+
+@pytest.fixture(scope='session')
+def populated_manager(manager_cls, connection, ctd_files):
+    """A manager whose database is populated with the synthetic files."""
+    manager = manager_cls(connection=connection)
+    manager.populate(urls=list(ctd_files.values()), only_tables=['action', 'chemical', 'gene', 'chem_gene_ixn'])
+    return manager
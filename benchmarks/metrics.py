@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the wall time, peak memory, and number of SQL queries of a block of code."""
+
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+__all__ = [
+    'get_peak_rss_mb',
+    'measure',
+]
+
+
+def get_peak_rss_mb() -> float:
+    """Get the peak resident set size of this process and its finished children, in megabytes."""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak / scale
+
+
+@contextmanager
+def measure():
+    """Measure a block of code, filling in the yielded dictionary when it finishes.
+
+    The dictionary gets the ``seconds`` it took, the ``queries`` sent to the database through any engine, and the
+    ``peak_rss_mb`` of the process afterwards. Since the peak can only grow, it's only an upper bound for the block.
+    """
+    metrics = {}
+    queries = []
+
+    def count_query(*_):
+        queries.append(None)
+
+    event.listen(Engine, 'before_cursor_execute', count_query)
+    start = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics['seconds'] = time.perf_counter() - start
+        event.remove(Engine, 'before_cursor_execute', count_query)
+        metrics['queries'] = len(queries)
+        metrics['peak_rss_mb'] = get_peak_rss_mb()
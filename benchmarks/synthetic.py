@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""Generate synthetic CTD files of any size for benchmarking.
+
+The files have the same names and columns as the real ones, so they can be loaded with
+:meth:`bio2bel_ctd.Manager.populate`. Chemicals and genes are picked with a long-tailed distribution and interactions
+get their interaction actions and gene forms from a distribution that resembles the one in the CTD, including
+interactions with several actions and signatures that aren't translated to BEL.
+
+Run this script with :code:`python -m benchmarks.synthetic --scale medium --directory ~/ctd-benchmark`.
+"""
+
+import gzip
+import os
+import random
+from itertools import accumulate
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+import click
+
+__all__ = [
+    'SCALES',
+    'generate',
+]
+
+#: The number of interactions generated for each named scale
+SCALES = {
+    'small': 10000,
+    'medium': 1000000,
+    'large': 10000000,
+}
+
+#: Relative frequencies of the interaction actions and gene forms of interactions, roughly following the CTD
+SIGNATURE_WEIGHTS = [
+    (('increases^expression',), ('mRNA',), 26),
+    (('decreases^expression',), ('mRNA',), 18),
+    (('affects^expression',), ('mRNA',), 2),
+    (('increases^expression',), ('protein',), 6),
+    (('decreases^expression',), ('protein',), 4),
+    (('increases^activity',), ('protein',), 4),
+    (('decreases^activity',), ('protein',), 4),
+    (('affects^binding',), ('protein',), 5),
+    (('increases^phosphorylation',), ('protein',), 3),
+    (('decreases^phosphorylation',), ('protein',), 2),
+    (('affects^localization',), ('protein',), 1),
+    (('increases^methylation',), ('gene',), 2),
+    (('decreases^methylation',), ('gene',), 1),
+    (('affects^methylation',), ('gene',), 1),
+    (('increases^response to substance',), ('protein',), 3),
+    (('decreases^reaction',), ('protein',), 1),
+    (('affects^cotreatment', 'increases^expression'), ('mRNA',), 9),
+    (('affects^cotreatment', 'decreases^activity'), ('protein',), 3),
+    (('increases^expression',), ('mRNA', 'protein'), 5),
+]
+
+#: The organisms of the interactions, with their NCBI Taxonomy identifiers and relative frequencies
+ORGANISM_WEIGHTS = [
+    ('Homo sapiens', 9606, 45),
+    ('Rattus norvegicus', 10116, 25),
+    ('Mus musculus', 10090, 25),
+    ('Danio rerio', 7955, 5),
+]
+
+ACTION_CODES = [
+    ('activity', 'act', 'elicits or inhibits a function'),
+    ('binding', 'b', 'molecular interaction'),
+    ('cotreatment', 'ct', 'chemical cotreatment'),
+    ('expression', 'exp', 'expression'),
+    ('localization', 'loc', 'localization'),
+    ('methylation', 'myl', 'methylation'),
+    ('phosphorylation', 'pho', 'phosphorylation'),
+    ('reaction', 'rxn', 'elicits or inhibits a reaction'),
+    ('response to substance', 'rsp', 'susceptibility'),
+]
+
+_HEADER = '# Synthetic data for benchmarking Bio2BEL CTD\n#\n# Fields:\n# {}\n#\n'
+
+
+def _get_cum_weights(weights: Sequence[float]) -> List[float]:
+    return list(accumulate(weights))
+
+
+def _get_long_tail_weights(number: int, exponent: float = 1.1) -> List[float]:
+    """Get cumulative weights for picking from a number of items with a Zipf-like distribution."""
+    return _get_cum_weights([1 / rank ** exponent for rank in range(1, number + 1)])
+
+
+def _open(directory: str, file_name: str, fields: Sequence[str]):
+    file = gzip.open(os.path.join(directory, file_name), 'wt', encoding='utf-8', compresslevel=1)
+    file.write(_HEADER.format('\t'.join(fields)))
+    return file
+
+
+def _write_chemicals(directory: str, number: int) -> List[Tuple[str, str, str]]:
+    chemicals = [
+        ('D{:06d}'.format(i), 'chemical {}'.format(i), '{}-{:02d}-{}'.format(1000 + i, i % 100, i % 10))
+        for i in range(number)
+    ]
+    fields = ['ChemicalName', 'ChemicalID', 'CasRN', 'Definition', 'ParentIDs', 'TreeNumbers', 'ParentTreeNumbers',
+              'Synonyms', 'DrugBankIDs']
+    with _open(directory, 'CTD_chemicals.tsv.gz', fields) as file:
+        for mesh_id, name, cas_rn in chemicals:
+            file.write('\t'.join([name, 'MESH:' + mesh_id, cas_rn, '', '', '', '', '', '']) + '\n')
+    return chemicals
+
+
+def _write_genes(directory: str, number: int) -> List[Tuple[int, str]]:
+    genes = [(i + 1, 'GENE{}'.format(i + 1)) for i in range(number)]
+    fields = ['GeneSymbol', 'GeneName', 'GeneID', 'AltGeneIDs', 'Synonyms', 'BioGRIDIDs', 'PharmGKBIDs', 'UniProtIDs']
+    with _open(directory, 'CTD_genes.tsv.gz', fields) as file:
+        for gene_id, symbol in genes:
+            file.write('\t'.join([symbol, 'gene {}'.format(gene_id), str(gene_id), '', '', '', '', '']) + '\n')
+    return genes
+
+
+def _write_actions(directory: str) -> None:
+    with open(os.path.join(directory, 'CTD_chem_gene_ixn_types.tsv'), 'w') as file:
+        file.write(_HEADER.format('\t'.join(['TypeName', 'Code', 'Description', 'ParentCode'])))
+        for name, code, description in ACTION_CODES:
+            file.write('\t'.join([name, code, description, '']) + '\n')
+
+
+def _get_interaction_text(chemical_name: str, gene_symbol: str, actions: Sequence[str],
+                          gene_forms: Sequence[str]) -> str:
+    return '{} results in {} of {} {}'.format(
+        chemical_name,
+        ' and '.join(action.replace('^', ' ') for action in actions),
+        gene_symbol,
+        '/'.join(gene_forms),
+    )
+
+
+def _write_interactions(directory: str, number: int, chemicals: Sequence[Tuple[str, str, str]],
+                        genes: Sequence[Tuple[int, str]], rng: random.Random) -> None:
+    chemical_weights = _get_long_tail_weights(len(chemicals))
+    gene_weights = _get_long_tail_weights(len(genes), exponent=0.8)
+    signature_weights = _get_cum_weights([weight for _, _, weight in SIGNATURE_WEIGHTS])
+    organism_weights = _get_cum_weights([weight for _, _, weight in ORGANISM_WEIGHTS])
+
+    fields = ['ChemicalName', 'ChemicalID', 'CasRN', 'GeneSymbol', 'GeneID', 'GeneForms', 'Organism', 'OrganismID',
+              'Interaction', 'InteractionActions', 'PubMedIDs']
+    with _open(directory, 'CTD_chem_gene_ixns.tsv.gz', fields) as file:
+        for _ in range(number):
+            mesh_id, chemical_name, cas_rn = rng.choices(chemicals, cum_weights=chemical_weights)[0]
+            gene_id, gene_symbol = rng.choices(genes, cum_weights=gene_weights)[0]
+            actions, gene_forms, _ = rng.choices(SIGNATURE_WEIGHTS, cum_weights=signature_weights)[0]
+            organism, organism_id, _ = rng.choices(ORGANISM_WEIGHTS, cum_weights=organism_weights)[0]
+            pubmed_ids = rng.sample(range(1, 30000000), rng.choice((1, 1, 1, 2, 3)))
+
+            file.write('\t'.join([
+                chemical_name,
+                mesh_id,
+                cas_rn,
+                gene_symbol,
+                str(gene_id),
+                '|'.join(gene_forms),
+                organism,
+                str(organism_id),
+                _get_interaction_text(chemical_name, gene_symbol, actions, gene_forms),
+                '|'.join(actions),
+                '|'.join(map(str, pubmed_ids)),
+            ]) + '\n')
+
+
+def generate(directory: str, interactions: int, chemicals: Optional[int] = None, genes: Optional[int] = None,
+             seed: int = 0) -> Mapping[str, str]:
+    """Generate synthetic CTD files for chemicals, genes, interaction types, and chemical-gene interactions.
+
+    :param directory: The directory where the files are written. It's created if it doesn't exist.
+    :param interactions: The number of chemical-gene interactions
+    :param chemicals: The number of chemicals. Defaults to one for every 150 interactions, like in the CTD.
+    :param genes: The number of genes. Defaults to one for every 40 interactions.
+    :param seed: The seed of the random number generator, so the same files are generated every time
+    :return: The paths of the files, by their names
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+
+    chemical_rows = _write_chemicals(directory, chemicals or max(100, interactions // 150))
+    gene_rows = _write_genes(directory, genes or max(100, interactions // 40))
+    _write_actions(directory)
+    _write_interactions(directory, interactions, chemical_rows, gene_rows, rng)
+
+    return {
+        name: os.path.join(directory, name)
+        for name in ('CTD_chemicals.tsv.gz', 'CTD_genes.tsv.gz', 'CTD_chem_gene_ixn_types.tsv',
+                     'CTD_chem_gene_ixns.tsv.gz')
+    }
+
+
+@click.command()
+@click.option('--scale', type=click.Choice(SCALES), default='small', help='Number of interactions to generate')
+@click.option('-n', '--interactions', type=int, help='Number of interactions to generate, instead of a scale')
+@click.option('-d', '--directory', required=True, type=click.Path(file_okay=False))
+@click.option('--seed', type=int, default=0)
+def main(scale, interactions, directory, seed):
+    """Generate synthetic CTD files."""
+    for path in generate(directory, interactions or SCALES[scale], seed=seed).values():
+        click.echo(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of loading the CTD, converting it to BEL, enriching graphs, and looking up entities.
+
+Each benchmark records the wall time, peak memory, and number of SQL queries in the ``extra_info`` of its result. Run
+them with :code:`tox -e benchmark -- --ctd-scale medium` and compare runs with :code:`pytest-benchmark compare`.
+"""
+
+import random
+
+from click.testing import CliRunner
+
+from benchmarks.metrics import measure
+from bio2bel_ctd.cli import main
+from bio2bel_ctd.models import Chemical, Gene
+from pybel import BELGraph
+from pybel.dsl import abundance, rna
+
+#: The number of chemicals and genes put in the graphs that get enriched
+SAMPLE_SIZE = 200
+
+
+def _run_measured(benchmark, function, *args, **kwargs):
+    """Run a function once under the benchmark and record its metrics."""
+
+    def run():
+        with measure() as metrics:
+            result = function(*args, **kwargs)
+        benchmark.extra_info.update(metrics)
+        return result
+
+    return benchmark.pedantic(run, rounds=1, iterations=1)
+
+
+def _sample(manager, column):
+    values = [value for value, in manager.session.query(column)]
+    return random.Random(0).sample(values, min(SAMPLE_SIZE, len(values)))
+
+
+def test_populate(benchmark, manager_cls, tmp_path, ctd_files):
+    manager = manager_cls(connection='sqlite:///{}'.format(tmp_path / 'populate.db'))
+    _run_measured(
+        benchmark,
+        manager.populate,
+        urls=list(ctd_files.values()),
+        only_tables=['action', 'chemical', 'gene', 'chem_gene_ixn'],
+    )
+    assert manager.count_chemical_gene_interactions()
+
+
+def test_to_bel(benchmark, populated_manager):
+    graph = _run_measured(benchmark, populated_manager.to_bel, use_cache=False)
+    benchmark.extra_info['edges'] = graph.number_of_edges()
+
+
+def test_enrich_chemicals(benchmark, populated_manager):
+    graph = BELGraph()
+    for mesh_id in _sample(populated_manager, Chemical.chemical_id):
+        graph.add_node_from_data(abundance(namespace='MESH', identifier=mesh_id.replace('MESH:', '')))
+
+    populated_manager.get_chemical_lookup_index()
+    _run_measured(benchmark, populated_manager.enrich_chemicals, graph)
+    benchmark.extra_info['edges'] = graph.number_of_edges()
+
+
+def test_enrich_graph_genes(benchmark, populated_manager):
+    graph = BELGraph()
+    for entrez_id in _sample(populated_manager, Gene.gene_id):
+        graph.add_node_from_data(rna(namespace='ENTREZ', identifier=str(entrez_id)))
+
+    _run_measured(benchmark, populated_manager.enrich_graph_genes, graph)
+    benchmark.extra_info['edges'] = graph.number_of_edges()
+
+
+def _lookup(connection, commands):
+    runner = CliRunner()
+    for command in commands:
+        result = runner.invoke(main, ['-c', connection, 'manage'] + command)
+        assert 0 == result.exit_code, result.output
+
+
+def test_cli_chemical_lookups(benchmark, populated_manager, connection):
+    commands = [['chemicals', 'get', mesh_id] for mesh_id in _sample(populated_manager, Chemical.chemical_id)[:20]]
+    _run_measured(benchmark, _lookup, connection, commands)
+
+
+def test_cli_gene_lookups(benchmark, populated_manager, connection):
+    commands = [['genes', 'get', str(entrez_id)] for entrez_id in _sample(populated_manager, Gene.gene_id)[:20]]
+    _run_measured(benchmark, _lookup, connection, commands)
@@ -26,12 +26,17 @@ INSTALL_REQUIRES = [
     'pybel>=0.11.1',
     'bio2bel>=0.1.4',
     'pyctd',
+    'sqlalchemy>=1.4',
     'click',
+    'numpy',
+    'requests',
     'tqdm',
     'bio2bel_mesh',
 ]
 EXTRAS_REQUIRE = {
     'web': ['flask', 'flask-admin'],
+    'columnar': ['pyarrow'],
+    'async': ['sqlalchemy>=1.4', 'aiosqlite'],
 }
 ENTRY_POINTS = {
     'bio2bel': [
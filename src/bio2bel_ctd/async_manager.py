@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""An asyncio version of the lookups and enrichment of :class:`bio2bel_ctd.Manager` for use in web services.
+
+:class:`AsyncManager` queries the database with SQLAlchemy's asyncio extension, so the event loop isn't blocked while
+waiting for it. Each call checks a connection out of the engine's pool for as long as it queries, so many enrichment
+requests can run concurrently. The interactions are loaded with the same eager loading options as the synchronous
+manager and translated with the same handlers, so the graphs are edited the same way.
+
+The asyncio extension needs SQLAlchemy 1.4 or later and an async driver, like ``aiosqlite`` for SQLite or ``asyncpg``
+for PostgreSQL. When installing, use the async extra like:
+
+.. source-code:: sh
+
+    pip install bio2bel_ctd[async]
+"""
+
+import asyncio
+import logging
+from typing import Mapping, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.engine.url import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from pybel import BELGraph
+from .bulk import iter_batches
+from .constants import DEFAULT_BATCH_SIZE
+from .enrichment_utils import add_chemical_gene_interaction
+from .filters import InteractionFilter
+from .lookup import (
+    ENTREZ_NAMESPACES, ChemicalLookupIndex, get_entrez_gene_ids, get_graph_identifiers, resolve_graph_chemicals,
+)
+from .manager import get_interaction_load_options
+from .models import ChemGeneIxn, Chemical, Gene
+from .stats import TranslationStats
+
+__all__ = [
+    'AsyncManager',
+    'get_async_connection_string',
+]
+
+log = logging.getLogger(__name__)
+
+#: The async drivers used for databases whose connection strings don't name one
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def get_async_connection_string(connection: Union[str, URL]) -> URL:
+    """Get a connection string that uses an async driver.
+
+    :param connection: A connection string, like ``sqlite:///ctd.db``. If it already names a driver, it's kept.
+    """
+    url = make_url(connection)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url
+
+
+class AsyncManager:
+    """Looks up chemicals, genes, and interactions and enriches BEL graphs without blocking the event loop."""
+
+    def __init__(self, connection: Union[str, URL], pool_size: int = 5, max_overflow: int = 10, **kwargs):
+        """
+        :param connection: A connection string. It's changed to use an async driver if it doesn't name one.
+        :param pool_size: The number of connections kept in the pool
+        :param max_overflow: The number of connections opened beyond the pool when many requests run at the same time
+        :param kwargs: Other keyword arguments to pass to :func:`sqlalchemy.ext.asyncio.create_async_engine`
+        """
+        url = get_async_connection_string(connection)
+
+        # SQLite doesn't use a queue pool, so it doesn't take its sizes
+        if url.get_backend_name() != 'sqlite':
+            kwargs.setdefault('pool_size', pool_size)
+            kwargs.setdefault('max_overflow', max_overflow)
+
+        self.engine = create_async_engine(url, **kwargs)
+        self.session_maker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        self._chemical_lookup_index = None
+        self._chemical_lookup_index_lock = None
+
+    @classmethod
+    def from_manager(cls, manager, **kwargs) -> 'AsyncManager':
+        """Make an async manager for the same database as a manager.
+
+        :param bio2bel_ctd.Manager manager: A manager
+        :param kwargs: Keyword arguments to pass to :class:`AsyncManager`
+        """
+        return cls(manager.connection, **kwargs)
+
+    async def dispose(self) -> None:
+        """Close the connections in the pool."""
+        await self.engine.dispose()
+
+    async def _get_one_or_none(self, statement):
+        async with self.session_maker() as session:
+            result = await session.execute(statement)
+            return result.scalars().one_or_none()
+
+    async def is_populated(self) -> bool:
+        """Check if the database is already populated, by checking if there's any chemical-gene interaction."""
+        async with self.session_maker() as session:
+            result = await session.execute(select(select(ChemGeneIxn.id).exists()))
+            return result.scalar()
+
+    async def get_chemical_by_mesh(self, mesh_id: str) -> Optional[Chemical]:
+        """Get a chemical by its MeSH identifier, if it exists.
+
+        :param mesh_id: A MeSH identifier of a chemical
+        """
+        return await self._get_one_or_none(select(Chemical).where(Chemical.chemical_id == mesh_id))
+
+    async def get_chemical_by_cas(self, cas_rn: str) -> Optional[Chemical]:
+        """Get a chemical by its CAS Registry Number, if it exists.
+
+        :param cas_rn: A CAS Registry Number
+        """
+        return await self._get_one_or_none(select(Chemical).where(Chemical.cas_rn == cas_rn))
+
+    async def get_gene_by_entrez_id(self, entrez_id: str) -> Optional[Gene]:
+        """Get a gene by its Entrez Gene identifier, if it exists.
+
+        :param entrez_id: An Entrez Gene identifier of a gene
+        """
+        gene_ids = get_entrez_gene_ids([entrez_id])
+        if not gene_ids:
+            return
+
+        return await self._get_one_or_none(select(Gene).where(Gene.gene_id == gene_ids[0]))
+
+    async def get_interaction_by_id(self, ixn_id: int) -> Optional[ChemGeneIxn]:
+        """Get an interaction by its database identifier, with everything needed to convert it to BEL loaded.
+
+        :param ixn_id: An interaction database identifier
+        """
+        return await self._get_one_or_none(
+            select(ChemGeneIxn)
+            .where(ChemGeneIxn.id == ixn_id)
+            .options(*get_interaction_load_options())
+        )
+
+    async def _add_interactions(self, graph: BELGraph, criterion, stats: Optional[TranslationStats] = None,
+                                filters: Optional[InteractionFilter] = None) -> None:
+        """Add the interactions matching the criterion to the graph, batch-loading their related entities."""
+        statement = select(ChemGeneIxn) \
+            .where(criterion) \
+            .options(*get_interaction_load_options())
+
+        if filters:
+            statement = statement.where(*filters.get_criteria())
+
+        async with self.session_maker() as session:
+            result = await session.execute(statement)
+            interactions = result.scalars().all()
+
+        for ixn in interactions:
+            add_chemical_gene_interaction(graph, ixn, stats=stats)
+
+    async def enrich_graph_chemical(self, graph: BELGraph, mesh_id: str, stats: Optional[TranslationStats] = None,
+                                    filters: Optional[InteractionFilter] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for the given chemical.
+
+        :param graph: A BEL graph
+        :param mesh_id: A MeSH identifier of a chemical
+        :param stats: If given, the translation of the interactions is recorded in it
+        :param filters: If given, only the interactions that meet its conditions are added
+        """
+        chemical_ids = select(Chemical.id).where(Chemical.chemical_id == mesh_id)
+        await self._add_interactions(graph, ChemGeneIxn.chemical__id.in_(chemical_ids), stats=stats, filters=filters)
+
+    async def enrich_graph_gene(self, graph: BELGraph, entrez_id: str, stats: Optional[TranslationStats] = None,
+                                filters: Optional[InteractionFilter] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for the given gene.
+
+        :param graph: A BEL graph
+        :param entrez_id: An Entrez Gene identifier of a gene
+        :param stats: If given, the translation of the interactions is recorded in it
+        :param filters: If given, only the interactions that meet its conditions are added
+        """
+        entrez_ids = get_entrez_gene_ids([entrez_id])
+        if not entrez_ids:
+            return
+
+        gene_ids = select(Gene.id).where(Gene.gene_id == entrez_ids[0])
+        await self._add_interactions(graph, ChemGeneIxn.gene__id.in_(gene_ids), stats=stats, filters=filters)
+
+    async def enrich_graph_genes(self, graph: BELGraph, batch_size: int = DEFAULT_BATCH_SIZE,
+                                 stats: Optional[TranslationStats] = None,
+                                 filters: Optional[InteractionFilter] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for all Entrez genes.
+
+        :param graph: A BEL graph
+        :param batch_size: The number of Entrez Gene identifiers to look up in each query
+        :param stats: If given, the translation of the interactions is recorded in it
+        :param filters: If given, only the interactions that meet its conditions are added
+        """
+        # asyncpg only binds integers to integer columns, so the identifiers from the graph are converted first
+        entrez_ids = get_entrez_gene_ids(get_graph_identifiers(graph, ENTREZ_NAMESPACES))
+
+        for batch in iter_batches(entrez_ids, batch_size):
+            gene_ids = select(Gene.id).where(Gene.gene_id.in_(batch))
+            await self._add_interactions(graph, ChemGeneIxn.gene__id.in_(gene_ids), stats=stats, filters=filters)
+
+    async def get_chemical_lookup_index(self) -> ChemicalLookupIndex:
+        """Get an index for resolving chemicals by MeSH identifier, name, and CAS Registry Number.
+
+        The index is built from the chemical table by the first request that needs it and kept for the lifetime of
+        the manager. Concurrent requests wait for it instead of building it again.
+        """
+        if self._chemical_lookup_index is not None:
+            return self._chemical_lookup_index
+
+        # The lock is made here so it belongs to the running event loop
+        if self._chemical_lookup_index_lock is None:
+            self._chemical_lookup_index_lock = asyncio.Lock()
+
+        async with self._chemical_lookup_index_lock:
+            if self._chemical_lookup_index is None:
+                statement = select(Chemical.id, Chemical.chemical_id, Chemical.chemical_name, Chemical.cas_rn)
+                async with self.session_maker() as session:
+                    result = await session.execute(statement)
+                    self._chemical_lookup_index = ChemicalLookupIndex.from_rows(result.all())
+
+        return self._chemical_lookup_index
+
+    async def enrich_chemicals(self, graph: BELGraph, batch_size: int = DEFAULT_BATCH_SIZE,
+                               stats: Optional[TranslationStats] = None,
+                               filters: Optional[InteractionFilter] = None) -> Mapping[str, Mapping[str, int]]:
+        """Find chemicals that can be mapped and enriched with the CTD.
+
+        :param graph: A BEL graph
+        :param batch_size: The number of chemicals to look up in each query
+        :param stats: If given, the translation of the interactions is recorded in it
+        :param filters: If given, only the interactions that meet its conditions are added
+        :return: The number of nodes that were (``hit``) and weren't (``miss``) found, by namespace
+        """
+        counts, chemical_pks = resolve_graph_chemicals(graph, await self.get_chemical_lookup_index())
+
+        for batch in iter_batches(sorted(chemical_pks), batch_size):
+            await self._add_interactions(graph, ChemGeneIxn.chemical__id.in_(batch), stats=stats, filters=filters)
+
+        return counts
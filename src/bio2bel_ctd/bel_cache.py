@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""An on-disk cache of the BEL graph built from the CTD by :meth:`bio2bel_ctd.Manager.to_bel` with ``use_cache=True``.
+
+Graphs are pickled to files named after the version of the database they were built from, which is given by
+:meth:`bio2bel_ctd.Manager.get_database_version`, and the variant of the graph, like the key of the
+:class:`bio2bel_ctd.filters.InteractionFilter` it was built with. A graph built from an older version is never loaded,
+and the whole cache is cleared when the database is populated.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import pybel
+from pybel import BELGraph
+from .constants import BEL_CACHE_DIR
+
+__all__ = [
+    'get_bel_cache_path',
+    'load_cached_graph',
+    'store_cached_graph',
+    'clear_bel_cache',
+]
+
+log = logging.getLogger(__name__)
+
+_EXTENSION = '.gpickle'
+
+
+def _get_name(version: str, variant: Optional[str] = None) -> str:
+    return 'ctd-{}'.format(version) if variant is None else 'ctd-{}-{}'.format(version, variant)
+
+
+def get_bel_cache_path(version: str, directory: Optional[str] = None, variant: Optional[str] = None) -> str:
+    """Get the path of the cached BEL graph for a version of the database.
+
+    :param version: The version of the database
+    :param directory: The directory of the cache. Defaults to :data:`bio2bel_ctd.constants.BEL_CACHE_DIR`.
+    :param variant: The variant of the graph, like the key of the filters it was built with. Defaults to the graph of
+     the whole database.
+    """
+    return os.path.join(directory or BEL_CACHE_DIR, _get_name(version, variant=variant) + _EXTENSION)
+
+
+def load_cached_graph(version: str, directory: Optional[str] = None,
+                      variant: Optional[str] = None) -> Optional[BELGraph]:
+    """Load the cached BEL graph for a version of the database, if there is one.
+
+    :param version: The version of the database
+    :param directory: The directory of the cache. Defaults to :data:`bio2bel_ctd.constants.BEL_CACHE_DIR`.
+    :param variant: The variant of the graph, like the key of the filters it was built with
+    """
+    path = get_bel_cache_path(version, directory=directory, variant=variant)
+    if not os.path.exists(path):
+        return
+
+    log.info('loading cached BEL graph from %s', path)
+    return pybel.from_pickle(path)
+
+
+def store_cached_graph(graph: BELGraph, version: str, directory: Optional[str] = None,
+                       variant: Optional[str] = None) -> str:
+    """Cache the BEL graph for a version of the database, replacing graphs cached for other versions.
+
+    The graph is written to a temporary file that is then renamed, so a reader never sees a partially written graph.
+    The other variants cached for the same version are kept.
+
+    :param graph: The BEL graph built from the database
+    :param version: The version of the database
+    :param directory: The directory of the cache. Defaults to :data:`bio2bel_ctd.constants.BEL_CACHE_DIR`.
+    :param variant: The variant of the graph, like the key of the filters it was built with
+    :return: The path of the cached graph
+    """
+    path = get_bel_cache_path(version, directory=directory, variant=variant)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    clear_bel_cache(directory=directory, keep_version=version)
+
+    temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+    pybel.to_pickle(graph, temporary_path)
+    os.replace(temporary_path, path)
+
+    log.info('cached BEL graph at %s', path)
+    return path
+
+
+def clear_bel_cache(directory: Optional[str] = None, keep_version: Optional[str] = None) -> int:
+    """Remove the cached BEL graphs.
+
+    :param directory: The directory of the cache. Defaults to :data:`bio2bel_ctd.constants.BEL_CACHE_DIR`.
+    :param keep_version: If given, the graphs cached for this version of the database are kept
+    :return: The number of cached graphs that were removed
+    """
+    directory = directory or BEL_CACHE_DIR
+    if not os.path.isdir(directory):
+        return 0
+
+    count = 0
+    for name in os.listdir(directory):
+        if not name.endswith(_EXTENSION):
+            continue
+
+        if keep_version is not None and (
+            name == _get_name(keep_version) + _EXTENSION or
+            name.startswith(_get_name(keep_version) + '-')
+        ):
+            continue
+
+        os.remove(os.path.join(directory, name))
+        count += 1
+
+    return count
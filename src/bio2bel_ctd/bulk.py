@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+
+"""A bulk loader for the CTD that writes rows straight into the database instead of going through PyCTD's import.
+
+Each table is loaded in batches with ``COPY ... FROM STDIN`` on PostgreSQL and with ``executemany`` on other
+databases, all in one transaction. The indexes declared on the tables are dropped before they're loaded and
+recreated afterwards, so they are built once instead of being updated with every row.
+
+Rows get the same primary keys as with :meth:`pyctd.manager.database.DbManager.import_tables`: their position in the
+file. Foreign keys to the vocabulary tables (chemicals, genes, diseases, and pathways) are resolved from their
+positions in their own files.
+
+The files are read line by line straight from their gzip streams with :func:`iter_rows` and written in batches of a
+fixed size, so neither the decompressed files nor whole tables ever need to fit on disk or in memory.
+"""
+
+import gzip
+import io
+import logging
+import os
+import time
+from contextlib import closing
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, TextIO, Tuple, TypeVar
+
+from pyctd.manager import defaults, table_conf
+from pyctd.manager.database import DbManager
+from pyctd.manager.table import Table
+from sqlalchemy import Float, Integer, inspect
+from sqlalchemy.engine import Connection, Engine
+
+from .incremental import get_dependent_tables
+from .models import Base
+
+__all__ = [
+    'iter_rows',
+    'iter_batches',
+    'load_tables',
+    'load_table',
+    'add_populated_dependent_tables',
+    'clear_tables',
+]
+
+log = logging.getLogger(__name__)
+
+X = TypeVar('X')
+
+#: The number of rows read from a CTD file and written to the database at a time
+DEFAULT_BULK_BATCH_SIZE = 50000
+
+#: The suffixes of the vocabulary tables, whose identifiers are resolved to foreign keys in the other tables
+DOMAINS = [model.table_suffix for model in table_conf.models_to_map]
+
+
+def _get_table(name: str):
+    """Get a SQLAlchemy table by its name without the PyCTD prefix."""
+    return Base.metadata.tables[defaults.TABLE_PREFIX + name]
+
+
+def _get_converters(table) -> Dict[str, Any]:
+    """Get functions to convert strings from a CTD file to the values for each column of a SQLAlchemy table."""
+    return {
+        column.name: (
+            _to_int if isinstance(column.type, Integer) else
+            float if isinstance(column.type, Float) else
+            str
+        )
+        for column in table.columns
+    }
+
+
+def _to_int(value: str) -> int:
+    # PyCTD reads integer columns as floats, so some of them end up written like "1.0"
+    return int(float(value))
+
+
+def _open_ctd_file(path: str) -> TextIO:
+    """Open a CTD file for reading text, decompressing it on the fly if it's gzipped."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'rt', encoding='utf-8', newline='')
+
+
+def iter_rows(path: str) -> Iterable[List[Optional[str]]]:
+    """Iterate over the rows of a CTD file, skipping comments and blank lines.
+
+    :param path: The path to a CTD file, which can be gzipped
+    :return: The fields of each row, with ``None`` for missing values
+    """
+    with _open_ctd_file(path) as file:
+        for line in file:
+            if line.startswith('#'):
+                continue
+
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+
+            yield [
+                value if value else None
+                for value in line.split('\t')
+            ]
+
+
+def iter_batches(rows: Iterable[X], batch_size: int) -> Iterable[List[X]]:
+    """Group an iterable into lists of the given size, without reading more than one batch ahead."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _get_value(row: Sequence[Optional[str]], column_index: int) -> Optional[str]:
+    return row[column_index] if column_index < len(row) else None
+
+
+def _normalize_domain_id(domain: str, domain_id: str) -> str:
+    domain_id = domain_id.strip()
+    # CTD uses the MESH: prefix for chemicals in the chemical vocabulary, but not anywhere else
+    if domain == 'chemical' and domain_id.startswith('MESH:'):
+        return domain_id[len('MESH:'):]
+    return domain_id
+
+
+def get_domain_mapping(data_dir: str, domain: str) -> Dict[str, int]:
+    """Map the identifiers of a vocabulary, like MeSH identifiers for chemicals, to their primary keys.
+
+    :param data_dir: The directory containing the CTD files
+    :param domain: The suffix of a vocabulary table, like ``chemical``
+    """
+    model = next(model for model in table_conf.models_to_map if model.table_suffix == domain)
+    conf = table_conf.tables[model]
+
+    file_path = os.path.join(data_dir, conf['file_name'])
+    column_in_file, _ = conf['domain_id_column']
+    column_index = DbManager.get_index_of_column(column_in_file, file_path)
+
+    mapping = {}
+    for primary_key, row in enumerate(iter_rows(file_path), start=1):
+        domain_id = _get_value(row, column_index)
+        if domain_id is not None:
+            mapping.setdefault(_normalize_domain_id(domain, domain_id), primary_key)
+
+    return mapping
+
+
+class _Writer:
+    """Writes batches of rows to tables over a connection."""
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.use_copy = connection.dialect.name == 'postgresql' and self._supports_copy()
+
+    def _supports_copy(self) -> bool:
+        with closing(self.connection.connection.cursor()) as cursor:
+            return hasattr(cursor, 'copy_expert')
+
+    def write(self, table, columns: Sequence[str], rows: List[Tuple]) -> None:
+        """Write a batch of rows to the table."""
+        if not rows:
+            return
+
+        if self.use_copy:
+            self._copy(table, columns, rows)
+        else:
+            self.connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+    def _copy(self, table, columns: Sequence[str], rows: List[Tuple]) -> None:
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_escape_copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        with closing(self.connection.connection.cursor()) as cursor:
+            cursor.copy_expert('COPY {} ({}) FROM STDIN'.format(table.name, ', '.join(columns)), buffer)
+
+
+def _escape_copy_value(value) -> str:
+    """Escape a value for the text format of PostgreSQL's ``COPY``."""
+    if value is None:
+        return r'\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def _drop_indexes(connection: Connection, tables: Iterable) -> List:
+    """Drop the indexes declared on the tables that exist in the database and return them so they can be recreated."""
+    inspector = inspect(connection)
+    dropped = []
+
+    for table in tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                index.drop(bind=connection)
+                dropped.append(index)
+
+    return dropped
+
+
+def _has_rows(connection: Connection, table: Table) -> bool:
+    return connection.execute(_get_table(table.name).select().limit(1)).first() is not None
+
+
+def add_populated_dependent_tables(connection: Connection, tables: Sequence[Table],
+                                   selected_tables: Iterable[Table]) -> List[Table]:
+    """Add the tables that reference the selected vocabulary tables and have rows to the selection.
+
+    The foreign keys to a vocabulary table are resolved from the positions of its rows in its file, so when it's
+    cleared and loaded again, the tables that reference it have to be loaded again too. Otherwise, their foreign keys
+    would point at different rows, or at none, which fails on databases that check them.
+
+    :param connection: A database connection or engine
+    :param tables: The PyCTD configurations of all tables that can be loaded, in the order in which they would be loaded
+    :param selected_tables: The PyCTD configurations of the tables to load
+    :return: The PyCTD configurations of the tables to load, in the order of ``tables``
+    """
+    selected_names = {table.name for table in selected_tables}
+    dependent_names = get_dependent_tables(tables, selected_names) - selected_names
+
+    names = selected_names | {
+        table.name
+        for table in tables
+        if table.name in dependent_names and _has_rows(connection, table)
+    }
+
+    if names != selected_names:
+        log.info('also reloading %s, which reference the reloaded tables', ', '.join(sorted(names - selected_names)))
+
+    return [table for table in tables if table.name in names]
+
+
+def clear_tables(connection: Connection, tables: Sequence[Table]) -> None:
+    """Delete all rows of the tables and of their one-to-many tables.
+
+    Clearing a vocabulary table without the tables that reference it leaves their foreign keys dangling, so the
+    tables should be expanded with :func:`add_populated_dependent_tables` first.
+
+    :param connection: A database connection or engine
+    :param tables: The PyCTD configurations of the tables, in the order in which they would be loaded. They are cleared
+     in reverse, so tables referencing the vocabularies are cleared before the vocabularies.
+    """
+    for table in reversed(tables):
+        for _, column_in_one_to_many_table in table.one_to_many:
+            connection.execute(_get_table(table.name + '__' + column_in_one_to_many_table).delete())
+        connection.execute(_get_table(table.name).delete())
+
+
+def load_table(connection: Connection, table: Table, data_dir: str, domain_mappings: Mapping[str, Dict[str, int]],
+               batch_size: int = DEFAULT_BULK_BATCH_SIZE) -> int:
+    """Load a CTD file into its table and its one-to-many tables.
+
+    :param connection: A database connection, which should be in a transaction
+    :param table: The PyCTD configuration of the table
+    :param data_dir: The directory containing the CTD files
+    :param domain_mappings: Mappings from the identifiers of each vocabulary to primary keys, from
+     :func:`get_domain_mapping`. Only needed for the vocabularies referenced by the table.
+    :param batch_size: The number of rows to read and write at a time
+    :return: The number of rows loaded into the table
+    """
+    file_path = os.path.join(data_dir, table.file_name)
+
+    use_columns_with_index, column_names_in_db = DbManager.get_index_and_columns_order(
+        table.columns_in_file_expected,
+        table.columns_dict,
+        file_path,
+    )
+
+    sql_table = _get_table(table.name)
+    converters = _get_converters(sql_table)
+
+    # Vocabulary identifiers in other tables are replaced by foreign keys to the vocabulary tables
+    domain_columns = {}
+    if table.model not in table_conf.models_to_map:
+        domain_columns = {
+            domain + '_id': domain
+            for domain in DOMAINS
+            if domain + '_id' in column_names_in_db
+        }
+
+    columns = ['id'] + [
+        domain_columns[column] + '__id' if column in domain_columns else column
+        for column in column_names_in_db
+    ]
+
+    one_to_many = []
+    for column_in_file, column_in_one_to_many_table in table.one_to_many:
+        one_to_many_table = _get_table(table.name + '__' + column_in_one_to_many_table)
+        one_to_many.append((
+            DbManager.get_index_of_column(column_in_file, file_path),
+            one_to_many_table,
+            [table.name + '__id', column_in_one_to_many_table],
+            _get_converters(one_to_many_table)[column_in_one_to_many_table],
+        ))
+
+    writer = _Writer(connection)
+    row_id = 0
+
+    for batch in iter_batches(iter_rows(file_path), batch_size):
+        rows = []
+        one_to_many_rows = [[] for _ in one_to_many]
+
+        for values in batch:
+            row_id += 1
+
+            row = [row_id]
+            for column_index, column in zip(use_columns_with_index, column_names_in_db):
+                value = _get_value(values, column_index)
+
+                if value is None:
+                    row.append(None)
+                elif column in domain_columns:
+                    domain = domain_columns[column]
+                    # this is an evil hack because CTD is not using the MESH prefix in this table
+                    if table.name == 'exposure_event' and domain == 'disease':
+                        value = 'MESH:' + value
+                    row.append(domain_mappings[domain].get(_normalize_domain_id(domain, value)))
+                else:
+                    row.append(converters[column](value))
+
+            rows.append(tuple(row))
+
+            for (column_index, _, _, converter), child_rows in zip(one_to_many, one_to_many_rows):
+                entry = _get_value(values, column_index)
+                if entry is None:
+                    continue
+                for value in entry.split('|'):
+                    child_rows.append((row_id, converter(value.strip())))
+
+        writer.write(sql_table, columns, rows)
+        for (_, one_to_many_table, one_to_many_columns, _), child_rows in zip(one_to_many, one_to_many_rows):
+            writer.write(one_to_many_table, one_to_many_columns, child_rows)
+
+    return row_id
+
+
+def load_tables(engine: Engine, tables: Iterable[Table], data_dir: str, only_tables: Optional[Iterable[str]] = None,
+                exclude_tables: Optional[Iterable[str]] = None,
+                batch_size: int = DEFAULT_BULK_BATCH_SIZE) -> Mapping[str, int]:
+    """Load CTD files into their tables in one transaction, replacing what's there.
+
+    The tables that reference the loaded vocabulary tables are loaded again too if they have rows, so their foreign
+    keys stay consistent. See :func:`add_populated_dependent_tables`.
+
+    :param engine: A database engine
+    :param tables: The PyCTD configurations of all tables, in the order in which they should be loaded
+    :param data_dir: The directory containing the CTD files
+    :param only_tables: The names of the tables to load. Defaults to all of them.
+    :param exclude_tables: The names of tables not to load
+    :param batch_size: The number of rows to read and write at a time
+    :return: The number of rows loaded into each table
+    """
+    tables = [
+        table
+        for table in tables
+        if exclude_tables is None or table.name not in exclude_tables
+    ]
+
+    counts = {}
+    with engine.begin() as connection:
+        tables = add_populated_dependent_tables(connection, tables, [
+            table
+            for table in tables
+            if only_tables is None or table.name in only_tables
+        ])
+
+        domains = {
+            domain
+            for table in tables
+            if table.model not in table_conf.models_to_map
+            for domain in DOMAINS
+            if domain + '_id' in table.columns_in_db
+        }
+
+        log.info('building vocabulary mappings for %s', ', '.join(sorted(domains)))
+        domain_mappings = {
+            domain: get_domain_mapping(data_dir, domain)
+            for domain in domains
+        }
+
+        sql_tables = [
+            _get_table(name)
+            for table in tables
+            for name in [table.name] + [
+                table.name + '__' + column_in_one_to_many_table
+                for _, column_in_one_to_many_table in table.one_to_many
+            ]
+        ]
+
+        clear_tables(connection, tables)
+
+        dropped_indexes = _drop_indexes(connection, sql_tables)
+
+        for table in tables:
+            log.info('bulk loading %s into table %s', table.file_name, table.name)
+            table_timer = time.time()
+            counts[table.name] = load_table(connection, table, data_dir, domain_mappings, batch_size=batch_size)
+            log.info('loaded %d rows into %s in %.2f seconds', counts[table.name], table.name,
+                     time.time() - table_timer)
+
+        log.info('recreating %d indexes', len(dropped_indexes))
+        for index in dropped_indexes:
+            index.create(bind=connection)
+
+    return counts
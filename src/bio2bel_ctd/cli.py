@@ -4,11 +4,20 @@
 
 import logging
 import sys
+from itertools import chain
 
 import click
 
-from .manager import Manager
+from sqlalchemy.orm import selectinload
+
+from .bulk import iter_batches
+from .constants import DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE
+from .export import EXPORT_FORMATS, export_chunks
+from .indexes import create_indexes, get_index_reports
+from .manager import Manager, get_interaction_load_options
 from .models import Action, ChemGeneIxn, Chemical, Gene
+from .serialization import chemical_to_json, gene_to_json, interaction_to_json
+from .stats import TranslationStats
 
 main = Manager.get_cli()
 
@@ -78,12 +87,48 @@ def _echot(*t):
     click.echo('\t'.join(map(str, t)))
 
 
-@chemicals.command()
-@click.option('--limit', type=int, default=5)
-@click.option('--offset', type=int)
-@click.pass_obj
-def ls(manager, limit, offset):
-    query = manager.session.query(Chemical)
+#: The number of rows written at a time by :func:`_echo_rows`
+ECHO_PAGE_SIZE = 1000
+
+
+def _echo_rows(rows, header=None, page_size=ECHO_PAGE_SIZE):
+    """Echo rows of tab-separated values as they're produced, after a header if given, with one write for each page.
+
+    :param iter[tuple] rows: The rows to echo
+    :param Optional[tuple] header: The names of the columns
+    :param int page_size: The number of rows to write at a time, so at most that many are held in memory
+    """
+    if header is not None:
+        rows = chain([header], rows)
+
+    for page in iter_batches(rows, page_size):
+        click.echo(''.join(
+            '\t'.join(map(str, row)) + '\n'
+            for row in page
+        ), nl=False)
+
+
+def _iter_ls_rows(manager, model, limit, offset, after, options=()):
+    """Iterate over a page of rows, found by database identifier if ``after`` is given or else by offset.
+
+    Without a limit or an offset, the rows are loaded in chunks with :meth:`bio2bel_ctd.Manager.iter_chunks` instead,
+    so listing a whole table doesn't load it into memory at once.
+    """
+    if limit <= 0 and offset is None:
+        query = manager.session.query(model)
+        if after is not None:
+            query = query.filter(model.id > after)
+        return chain.from_iterable(manager.iter_chunks(model, query=query, options=options))
+
+    return _get_ls_query(manager, model, limit, offset, after, options=options)
+
+
+def _get_ls_query(manager, model, limit, offset, after, options=()):
+    """Build a query for a page of rows, found by database identifier if ``after`` is given or else by offset."""
+    query = manager.session.query(model).options(*options)
+
+    if after is not None:
+        query = query.filter(model.id > after).order_by(model.id)
 
     if limit > 0:
         query = query.limit(limit)
@@ -91,16 +136,117 @@ def ls(manager, limit, offset):
     if offset is not None:
         query = query.offset(offset)
 
-    _echot('MeSH', 'Name', 'Definition', 'Parents')
+    return query
 
-    for chemical in query:
-        _echot(
-            chemical.chemical_id,
-            chemical.chemical_name,
-            chemical.definition,
-            '|'.join(map(str, chemical.parent_ids))
+
+_ls_options = [
+    click.option('--limit', type=int, default=5),
+    click.option('--offset', type=int),
+    click.option('--after', type=int,
+                 help='Only list rows with database identifiers after this one, which is faster than --offset'),
+]
+
+_export_options = [
+    click.option('-o', '--output', type=click.File('w'), default='-', help='Defaults to standard out'),
+    click.option('-f', '--fmt', type=click.Choice(EXPORT_FORMATS), default='tsv', show_default=True),
+    click.option('--after', type=int, help='Only export rows with database identifiers after this one'),
+    click.option('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Number of rows loaded at a time'),
+]
+
+
+def _add_options(options):
+    def decorator(f):
+        for option in reversed(options):
+            f = option(f)
+        return f
+
+    return decorator
+
+
+def _export(manager, model, to_json, output, fmt, after, chunk_size, query=None, options=()):
+    """Stream the rows of a model in chunks to a file."""
+    if query is None:
+        query = manager.session.query(model)
+
+    if after is not None:
+        query = query.filter(model.id > after)
+
+    chunks = manager.iter_chunks(model, query=query, chunk_size=chunk_size, options=options)
+    count = export_chunks(chunks, to_json, output, fmt=fmt)
+    click.echo('Exported {} rows'.format(count), err=True)
+
+
+@chemicals.command()
+@_add_options(_ls_options)
+@click.pass_obj
+def ls(manager, limit, offset, after):
+    """List chemicals"""
+    results = _iter_ls_rows(manager, Chemical, limit, offset, after, options=[selectinload(Chemical.parent_ids)])
+
+    _echo_rows(
+        (
+            (
+                chemical.id,
+                chemical.chemical_id,
+                chemical.chemical_name,
+                chemical.definition,
+                '|'.join(map(str, chemical.parent_ids)),
+            )
+            for chemical in results
+        ),
+        header=('ID', 'MeSH', 'Name', 'Definition', 'Parents'),
+    )
+
+
+@chemicals.command()
+@_add_options(_export_options)
+@click.pass_obj
+def export(manager, output, fmt, after, chunk_size):
+    """Export chemicals"""
+    _export(manager, Chemical, chemical_to_json, output, fmt, after, chunk_size)
+
+
+def _iter_identifier_batches(file, batch_size):
+    """Iterate over batches of the identifiers in a file with one on each line, skipping blank lines."""
+    return iter_batches((line.strip() for line in file if line.strip()), batch_size)
+
+
+_lookup_options = [
+    click.option('--file', type=click.File('r'), default='-',
+                 help='A file with an identifier on each line. Defaults to standard in.'),
+    click.option('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                 help='Number of identifiers looked up in each query'),
+]
+
+
+@chemicals.command()
+@_add_options(_lookup_options)
+@click.option('--cas', is_flag=True, help='Look up CAS Registry Numbers instead of MeSH identifiers')
+@click.pass_obj
+def lookup(manager, file, batch_size, cas):
+    """Look up many chemicals by MeSH identifier or CAS Registry Number"""
+    get_chemicals = manager.get_chemicals_by_cas if cas else manager.get_chemicals_by_mesh
+
+    _echot('Query', 'ID', 'MeSH', 'Name', 'CAS', 'Interactions')
+
+    for batch in _iter_identifier_batches(file, batch_size):
+        chemicals = get_chemicals(batch, batch_size=batch_size)
+        counts = manager.count_chemical_interactions(
+            (chemical.id for chemical in chemicals.values()),
+            batch_size=batch_size,
         )
 
+        rows = []
+        for identifier in batch:
+            chemical = chemicals.get(identifier)
+            if chemical is None:
+                rows.append((identifier, '', '', '', '', 0))
+            else:
+                rows.append((identifier, chemical.id, chemical.chemical_id, chemical.chemical_name,
+                             chemical.cas_rn or '', counts.get(chemical.id, 0)))
+
+        _echo_rows(rows)
+
 
 @manage.group()
 def genes():
@@ -127,26 +273,55 @@ def get(manager, entrez_id):
 
 
 @genes.command()
-@click.option('--limit', type=int, default=5)
-@click.option('--offset', type=int)
+@_add_options(_ls_options)
 @click.pass_obj
-def ls(manager, limit, offset):
-    query = manager.session.query(Gene)
+def ls(manager, limit, offset, after):
+    """List genes"""
+    results = _iter_ls_rows(manager, Gene, limit, offset, after)
+
+    _echo_rows(
+        (
+            (
+                gene.id,
+                gene.gene_id,
+                gene.gene_name,
+                gene.gene_symbol,
+            )
+            for gene in results
+        ),
+        header=('ID', 'EGID', 'Name', 'Symbol'),
+    )
 
-    if limit > 0:
-        query = query.limit(limit)
 
-    if offset is not None:
-        query = query.offset(offset)
+@genes.command()
+@_add_options(_export_options)
+@click.pass_obj
+def export(manager, output, fmt, after, chunk_size):
+    """Export genes"""
+    _export(manager, Gene, gene_to_json, output, fmt, after, chunk_size)
 
-    _echot('EGID', 'Name', 'Symbol')
 
-    for gene in query:
-        _echot(
-            gene.gene_id,
-            gene.gene_name,
-            gene.gene_symbol,
-        )
+@genes.command()
+@_add_options(_lookup_options)
+@click.pass_obj
+def lookup(manager, file, batch_size):
+    """Look up many genes by Entrez Gene identifier"""
+    _echot('Query', 'ID', 'EGID', 'Symbol', 'Name', 'Interactions')
+
+    for batch in _iter_identifier_batches(file, batch_size):
+        genes = manager.get_genes_by_entrez_id(batch, batch_size=batch_size)
+        counts = manager.count_gene_interactions((gene.id for gene in genes.values()), batch_size=batch_size)
+
+        rows = []
+        for identifier in batch:
+            gene = genes.get(int(identifier)) if identifier.isdigit() else None
+            if gene is None:
+                rows.append((identifier, '', '', '', '', 0))
+            else:
+                rows.append((identifier, gene.id, gene.gene_id, gene.gene_symbol, gene.gene_name,
+                             counts.get(gene.id, 0)))
+
+        _echo_rows(rows)
 
 
 @manage.group()
@@ -177,21 +352,44 @@ def get(manager, ixn_id):
 
 
 @ixns.command()
-@click.option('--limit', type=int, default=5)
-@click.option('--offset', type=int)
+@_add_options(_ls_options)
 @click.pass_obj
-def ls(manager, limit, offset):
+def ls(manager, limit, offset, after):
     """List chemical-gene interactions"""
+    results = _iter_ls_rows(manager, ChemGeneIxn, limit, offset, after, options=get_interaction_load_options())
+
+    _echo_rows(
+        (
+            (ixn.id, ixn)
+            for ixn in results
+        ),
+        header=('ID', 'Interaction'),
+    )
+
+
+@ixns.command()
+@_add_options(_export_options)
+@click.option('--chemical', 'mesh_id', help='Only export the interactions of the chemical with this MeSH identifier')
+@click.option('--gene', 'entrez_id', help='Only export the interactions of the gene with this Entrez Gene identifier')
+@click.option('--organism', 'organism_id', type=int, help='Only export the interactions in this NCBI Taxonomy organism')
+@click.pass_obj
+def export(manager, output, fmt, after, chunk_size, mesh_id, entrez_id, organism_id):
+    """Export chemical-gene interactions"""
     query = manager.session.query(ChemGeneIxn)
 
-    if limit > 0:
-        query = query.limit(limit)
+    if mesh_id is not None:
+        chemical_ids = manager.session.query(Chemical.id).filter(Chemical.chemical_id == mesh_id)
+        query = query.filter(ChemGeneIxn.chemical__id.in_(chemical_ids))
 
-    if offset is not None:
-        query = query.offset(offset)
+    if entrez_id is not None:
+        gene_ids = manager.session.query(Gene.id).filter(Gene.gene_id == entrez_id)
+        query = query.filter(ChemGeneIxn.gene__id.in_(gene_ids))
 
-    for ixn in query:
-        click.echo(ixn)
+    if organism_id is not None:
+        query = query.filter(ChemGeneIxn.organism_id == organism_id)
+
+    _export(manager, ChemGeneIxn, interaction_to_json, output, fmt, after, chunk_size, query=query,
+            options=get_interaction_load_options())
 
 
 @manage.group()
@@ -212,5 +410,58 @@ def ls(manager):
         )
 
 
+@manage.group()
+def db():
+    """Manage the database"""
+
+
+@db.command()
+@click.option('--create', is_flag=True, help='Create the indexes that are missing')
+@click.pass_obj
+def indexes(manager, create):
+    """Check the indexes needed by the lookups and enrichment"""
+    if create:
+        for name in create_indexes(manager.engine):
+            click.echo('Created {}'.format(name))
+
+    _echot('Index', 'Table', 'Columns', 'Exists', 'Size')
+    for report in get_index_reports(manager.engine):
+        _echot(
+            report.name,
+            report.table,
+            ', '.join(report.columns),
+            report.exists,
+            '' if report.size is None else report.size,
+        )
+
+
+@manage.group()
+def cache():
+    """Manage the cached BEL graph"""
+
+
+@cache.command()
+@click.option('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Number of interactions loaded at a time')
+@click.option('-w', '--workers', type=int, help='Number of processes used to build the graph')
+@click.option('--stats', type=click.File('w'),
+              help='Build the graph even if it is cached and write statistics about its translation here as JSON')
+@click.pass_obj
+def prewarm(manager, chunk_size, workers, stats):
+    """Build the BEL graph and cache it, unless it's already cached for the current database"""
+    translation_stats = TranslationStats() if stats is not None else None
+    graph = manager.to_bel(chunk_size=chunk_size, workers=workers, use_cache=True, stats=translation_stats)
+    if translation_stats is not None:
+        stats.write(translation_stats.to_json(indent=2))
+    click.echo('Cached BEL graph with {} nodes and {} edges in {}'.format(
+        graph.number_of_nodes(), graph.number_of_edges(), manager.bel_cache_dir))
+
+
+@cache.command()
+@click.pass_obj
+def clear(manager):
+    """Remove the cached BEL graphs"""
+    click.echo('Removed {} cached BEL graphs'.format(manager.clear_bel_cache()))
+
+
 if __name__ == '__main__':
     main()
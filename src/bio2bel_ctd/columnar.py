@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""A columnar snapshot of the chemical-gene interactions for enriching BEL graphs without a database.
+
+The snapshot is a Parquet file with one row per interaction, written by :meth:`bio2bel_ctd.Manager.export_columnar`.
+It can be copied to machines that can't reach the database and read there with :class:`ColumnarBackend`, which has
+the same enrichment methods as the manager.
+
+The rows are sorted by the MeSH identifiers of their chemicals, so the statistics of each row group let a lookup of a
+few chemicals skip most of the file, and only the columns needed for a lookup are read. When installing, use the
+columnar extra like:
+
+.. code-block:: sh
+
+    pip install bio2bel_ctd[columnar]
+"""
+
+import logging
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pybel import BELGraph
+from .constants import DEFAULT_ROW_GROUP_SIZE
+from .enrichment_utils import add_chemical_gene_interaction
+from .lookup import ENTREZ_NAMESPACES, ChemicalLookupIndex, get_graph_identifiers, resolve_graph_chemicals
+from .records import InteractionRecord, make_interaction_record
+from .stats import TranslationStats
+
+__all__ = [
+    'SCHEMA',
+    'write_columnar',
+    'ColumnarBackend',
+]
+
+log = logging.getLogger(__name__)
+
+#: The columns of a columnar snapshot
+SCHEMA = pa.schema([
+    ('ixn_id', pa.int64()),
+    ('chemical_id', pa.string()),
+    ('chemical_name', pa.string()),
+    ('cas_rn', pa.string()),
+    ('gene_id', pa.int64()),
+    ('gene_symbol', pa.string()),
+    ('organism_id', pa.int64()),
+    ('interaction', pa.string()),
+    ('gene_forms', pa.list_(pa.string())),
+    ('interaction_actions', pa.list_(pa.string())),
+    ('pubmed_ids', pa.list_(pa.int64())),
+])
+
+#: The columns needed to build an :class:`bio2bel_ctd.records.InteractionRecord`, in the order of its arguments
+INTERACTION_COLUMNS = [
+    'ixn_id',
+    'interaction',
+    'organism_id',
+    'chemical_id',
+    'chemical_name',
+    'gene_id',
+    'gene_symbol',
+    'gene_forms',
+    'interaction_actions',
+    'pubmed_ids',
+]
+
+
+def _get_row(ixn) -> Mapping:
+    """Flatten an interaction and its related entities into a row of a columnar snapshot."""
+    chemical = ixn.chemical
+    gene = ixn.gene
+
+    return dict(
+        ixn_id=ixn.id,
+        chemical_id=chemical.chemical_id,
+        chemical_name=chemical.chemical_name,
+        cas_rn=chemical.cas_rn,
+        gene_id=gene.gene_id,
+        gene_symbol=gene.gene_symbol,
+        organism_id=ixn.organism_id,
+        interaction=ixn.interaction,
+        gene_forms=[gene_form.gene_form for gene_form in ixn.gene_forms],
+        interaction_actions=[action.interaction_action for action in ixn.interaction_actions],
+        pubmed_ids=[pubmed.pubmed_id for pubmed in ixn.pubmed_ids],
+    )
+
+
+def write_columnar(interactions: Iterable, path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+    """Write chemical-gene interactions to a Parquet file.
+
+    Interactions that are missing their chemical or their gene are left out, since they can't be looked up.
+
+    :param interactions: Chemical-gene interactions with their related entities loaded. They should be sorted by the
+     MeSH identifiers of their chemicals so lookups by chemical can skip row groups.
+    :param path: The path of the Parquet file
+    :param row_group_size: The number of interactions in each row group
+    :return: The number of interactions that were written
+    """
+    count = 0
+    skipped = 0
+    columns = {name: [] for name in SCHEMA.names}  # type: Dict[str, List]
+
+    def flush():
+        table = pa.Table.from_pydict(columns, schema=SCHEMA)
+        writer.write_table(table, row_group_size=row_group_size)
+        for values in columns.values():
+            values.clear()
+
+    with pq.ParquetWriter(path, SCHEMA) as writer:
+        for ixn in interactions:
+            if ixn.chemical is None or ixn.gene is None:
+                skipped += 1
+                continue
+
+            for name, value in _get_row(ixn).items():
+                columns[name].append(value)
+            count += 1
+
+            if len(columns['ixn_id']) >= row_group_size:
+                flush()
+
+        if columns['ixn_id']:
+            flush()
+
+    if skipped:
+        log.warning('left %d interactions without a chemical or a gene out of %s', skipped, path)
+
+    log.info('wrote %d interactions to %s', count, path)
+    return count
+
+
+class ColumnarBackend:
+    """Enriches BEL graphs from a columnar snapshot of the chemical-gene interactions instead of the database."""
+
+    def __init__(self, path: str):
+        """
+        :param path: The path of a Parquet file written by :meth:`bio2bel_ctd.Manager.export_columnar`
+        """
+        self.path = path
+        self._chemical_lookup_index = None
+
+    def count_chemical_gene_interactions(self) -> int:
+        """Count the chemical-gene interactions in the snapshot, from its metadata."""
+        return pq.ParquetFile(self.path).metadata.num_rows
+
+    def _read(self, columns: List[str], filters: Optional[List] = None) -> pa.Table:
+        return pq.read_table(self.path, columns=columns, filters=filters)
+
+    def iter_interactions(self, chemical_ids: Optional[Iterable[str]] = None,
+                          gene_ids: Optional[Iterable[int]] = None) -> Iterable[InteractionRecord]:
+        """Iterate over the interactions in the snapshot, optionally only for some chemicals or genes.
+
+        :param chemical_ids: The MeSH identifiers of chemicals, as they appear in the snapshot
+        :param gene_ids: The Entrez Gene identifiers of genes
+        """
+        filters = []
+        for column, values in (('chemical_id', chemical_ids), ('gene_id', gene_ids)):
+            if values is None:
+                continue
+            values = sorted(set(values))
+            if not values:
+                return
+            filters.append((column, 'in', values))
+
+        table = self._read(INTERACTION_COLUMNS, filters=filters or None)
+
+        for batch in table.to_batches():
+            data = batch.to_pydict()
+            for values in zip(*(data[column] for column in INTERACTION_COLUMNS)):
+                yield make_interaction_record(*values)
+
+    def get_chemical_lookup_index(self) -> ChemicalLookupIndex:
+        """Get an index for resolving chemicals to their MeSH identifiers in the snapshot.
+
+        The index is built from the chemical columns once and kept for the lifetime of the backend.
+        """
+        if self._chemical_lookup_index is None:
+            table = self._read(['chemical_id', 'chemical_name', 'cas_rn']).to_pydict()
+            self._chemical_lookup_index = ChemicalLookupIndex.from_rows(
+                (chemical_id, chemical_id, chemical_name, cas_rn)
+                for chemical_id, chemical_name, cas_rn in zip(
+                    table['chemical_id'],
+                    table['chemical_name'],
+                    table['cas_rn'],
+                )
+            )
+
+        return self._chemical_lookup_index
+
+    def _add_interactions(self, graph: BELGraph, stats: Optional[TranslationStats] = None, **kwargs) -> None:
+        for ixn in self.iter_interactions(**kwargs):
+            add_chemical_gene_interaction(graph, ixn, stats=stats)
+
+    def enrich_graph_chemical(self, graph: BELGraph, mesh_id: str, stats: Optional[TranslationStats] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for the given chemical.
+
+        :param graph: A BEL graph
+        :param mesh_id: A MeSH identifier of a chemical
+        :param stats: If given, the translation of the interactions is recorded in it
+        """
+        chemical_id = self.get_chemical_lookup_index().get_by_mesh_id(mesh_id)
+        if chemical_id is None:
+            return
+
+        self._add_interactions(graph, stats=stats, chemical_ids=[chemical_id])
+
+    def enrich_graph_gene(self, graph: BELGraph, entrez_id: str, stats: Optional[TranslationStats] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for the given gene.
+
+        :param graph: A BEL graph
+        :param entrez_id: An Entrez Gene identifier of a gene
+        :param stats: If given, the translation of the interactions is recorded in it
+        """
+        self.enrich_graph_genes_by_id(graph, [entrez_id], stats=stats)
+
+    def enrich_graph_genes_by_id(self, graph: BELGraph, entrez_ids: Iterable[str],
+                                 stats: Optional[TranslationStats] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for the given genes, in one scan of the snapshot.
+
+        :param graph: A BEL graph
+        :param entrez_ids: Entrez Gene identifiers of genes. Ones that aren't numbers can't be in the CTD, so they're
+         skipped.
+        :param stats: If given, the translation of the interactions is recorded in it
+        """
+        gene_ids = [int(entrez_id) for entrez_id in entrez_ids if str(entrez_id).isdigit()]
+        self._add_interactions(graph, stats=stats, gene_ids=gene_ids)
+
+    def enrich_graph_genes(self, graph: BELGraph, stats: Optional[TranslationStats] = None) -> None:
+        """Enrich the BEL graph with chemical-gene interactions for all Entrez genes.
+
+        :param graph: A BEL graph
+        :param stats: If given, the translation of the interactions is recorded in it
+        """
+        self.enrich_graph_genes_by_id(graph, get_graph_identifiers(graph, ENTREZ_NAMESPACES), stats=stats)
+
+    def enrich_chemicals(self, graph: BELGraph,
+                         stats: Optional[TranslationStats] = None) -> Mapping[str, Mapping[str, int]]:
+        """Find chemicals that can be mapped and enriched with the snapshot.
+
+        :param graph: A BEL graph
+        :param stats: If given, the translation of the interactions is recorded in it
+        :return: The number of nodes that were (``hit``) and weren't (``miss``) found, by namespace
+        """
+        counts, chemical_ids = resolve_graph_chemicals(graph, self.get_chemical_lookup_index())
+        self._add_interactions(graph, stats=stats, chemical_ids=chemical_ids)
+        return counts
@@ -1,7 +1,30 @@
 # -*- coding: utf-8 -*-
 
+import os
+
 from bio2bel import get_data_dir
 
 MODULE_NAME = 'ctd'
 
 DATA_DIR = get_data_dir(MODULE_NAME)
+
+#: The number of chemical-gene interactions loaded from the database at a time when streaming
+DEFAULT_CHUNK_SIZE = 10000
+
+#: The number of identifiers put in each ``IN (...)`` clause when looking up many entities at once
+DEFAULT_BATCH_SIZE = 500
+
+#: The number of rows in each page when listing chemicals, genes, or interactions
+DEFAULT_PAGE_SIZE = 100
+
+#: The maximum number of chemical and of gene DSL objects kept by the memoized DSL constructors
+DSL_CACHE_SIZE = 2 ** 17
+
+#: The number of interactions in each row group of a columnar snapshot
+DEFAULT_ROW_GROUP_SIZE = 2 ** 16
+
+#: The directory of the memory-mapped interaction index built by :meth:`bio2bel_ctd.Manager.build_interaction_index`
+INTERACTION_INDEX_DIR = os.path.join(DATA_DIR, 'interaction_index')
+
+#: The directory where the BEL graphs built by :meth:`bio2bel_ctd.Manager.to_bel` are cached
+BEL_CACHE_DIR = os.path.join(DATA_DIR, 'bel_cache')
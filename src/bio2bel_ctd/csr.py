@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+
+"""A read-only, memory-mapped index of the chemical-gene interactions for fast lookups by chemical or by gene.
+
+The index is a directory of NumPy ``.npy`` files holding compressed sparse row (CSR) arrays:
+
+- the interactions are sorted by chemical, so the interactions of the ``i``-th chemical are the ones between
+  ``chemical_offsets[i]`` and ``chemical_offsets[i + 1]``
+- the positions of the interactions of the ``j``-th gene are ``gene_interactions[gene_offsets[j]:gene_offsets[j + 1]]``
+- the interaction actions, gene forms, PubMed identifiers, and texts of the interactions are packed into flat arrays
+  with their own offsets, with the actions and gene forms encoded as positions in vocabulary arrays
+- the names of the chemicals, the symbols of the genes, and the texts of the interactions are stored as UTF-8 bytes
+  with offsets, so each one takes only as much space as it needs
+
+The files are opened with :func:`numpy.load` in memory-mapped mode, so looking up a chemical or a gene only touches the
+pages it needs and processes using the same index share them through the operating system's page cache.
+
+The index is a snapshot, so it needs to be built again after the database is populated.
+"""
+
+import json
+import logging
+import os
+from typing import Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from .records import InteractionRecord, make_interaction_record
+
+__all__ = [
+    'InteractionIndex',
+    'build_interaction_index',
+]
+
+log = logging.getLogger(__name__)
+
+#: The version of the layout of the files, which is checked when an index is loaded
+INDEX_FORMAT_VERSION = 2
+
+#: The names of the arrays in an index. Each is stored in a file with the same name and the ``.npy`` extension.
+ARRAY_NAMES = [
+    'chemical_ids',
+    'chemical_names',
+    'chemical_name_offsets',
+    'chemical_offsets',
+    'gene_ids',
+    'gene_symbols',
+    'gene_symbol_offsets',
+    'gene_offsets',
+    'gene_interactions',
+    'interaction_ids',
+    'interaction_chemicals',
+    'interaction_genes',
+    'organism_ids',
+    'actions',
+    'action_offsets',
+    'action_codes',
+    'gene_forms',
+    'gene_form_offsets',
+    'gene_form_codes',
+    'pubmed_offsets',
+    'pubmed_ids',
+    'evidence_offsets',
+    'evidence',
+]
+
+_MISSING_ORGANISM = -1
+
+
+def _get_offsets(values: Iterable[int]) -> np.ndarray:
+    """Get the CSR offsets for rows of the given lengths."""
+    offsets = np.zeros(1, dtype=np.int64)
+    return np.concatenate([offsets, np.cumsum(np.fromiter(values, dtype=np.int64))])
+
+
+def _encode_strings(values: Iterable[bytes]) -> Mapping[str, np.ndarray]:
+    """Concatenate encoded strings into a flat array of bytes with CSR offsets."""
+    values = list(values)
+    return dict(
+        offsets=_get_offsets(len(value) for value in values),
+        data=np.frombuffer(b''.join(values), dtype=np.uint8),
+    )
+
+
+def _decode_string(data: np.ndarray, offsets: np.ndarray, position: int) -> str:
+    """Get the string at a position of a flat array of bytes with CSR offsets."""
+    return data[offsets[position]:offsets[position + 1]].tobytes().decode('utf-8')
+
+
+def _encode_ragged(rows: List[List[str]]) -> Mapping[str, np.ndarray]:
+    """Encode lists of strings as a vocabulary, CSR offsets, and the positions of the strings in the vocabulary."""
+    vocabulary = sorted({value for row in rows for value in row})
+    positions = {value: position for position, value in enumerate(vocabulary)}
+
+    return dict(
+        vocabulary=np.array(vocabulary, dtype=str),
+        offsets=_get_offsets(len(row) for row in rows),
+        codes=np.fromiter((positions[value] for row in rows for value in row), dtype=np.int32),
+    )
+
+
+def build_interaction_index(interactions: Iterable, directory: str) -> int:
+    """Build an interaction index from chemical-gene interactions and save it to a directory.
+
+    Interactions that are missing their chemical or their gene are left out, since they can't be looked up.
+
+    :param interactions: Chemical-gene interactions with their related entities loaded, in any order
+    :param directory: The directory where the ``.npy`` files are saved. It's created if it doesn't exist.
+    :return: The number of interactions in the index
+    """
+    interaction_ids = []
+    chemical_ids = []
+    chemical_names = {}
+    gene_ids = []
+    gene_symbols = {}
+    organism_ids = []
+    actions = []
+    gene_forms = []
+    pubmed_ids = []
+    evidence = []
+    skipped = 0
+
+    for ixn in interactions:
+        chemical = ixn.chemical
+        gene = ixn.gene
+
+        if chemical is None or gene is None:
+            skipped += 1
+            continue
+
+        interaction_ids.append(ixn.id)
+        chemical_ids.append(chemical.chemical_id)
+        chemical_names.setdefault(chemical.chemical_id, chemical.chemical_name)
+        gene_ids.append(gene.gene_id)
+        gene_symbols.setdefault(gene.gene_id, gene.gene_symbol)
+        organism_ids.append(_MISSING_ORGANISM if ixn.organism_id is None else ixn.organism_id)
+        actions.append([action.interaction_action for action in ixn.interaction_actions])
+        gene_forms.append([gene_form.gene_form for gene_form in ixn.gene_forms])
+        pubmed_ids.append([pubmed.pubmed_id for pubmed in ixn.pubmed_ids])
+        evidence.append((ixn.interaction or '').encode('utf-8'))
+
+    if skipped:
+        log.warning('left %d interactions without a chemical or a gene out of the index', skipped)
+
+    # Sort the interactions by chemical so the interactions of each chemical are contiguous
+    chemical_vocabulary, interaction_chemicals = np.unique(np.array(chemical_ids, dtype=str), return_inverse=True)
+    order = np.argsort(interaction_chemicals, kind='stable')
+    interaction_chemicals = interaction_chemicals[order].astype(np.int32)
+
+    gene_vocabulary, interaction_genes = np.unique(np.array(gene_ids, dtype=np.int64), return_inverse=True)
+    interaction_genes = interaction_genes[order].astype(np.int32)
+
+    actions = [actions[position] for position in order]
+    gene_forms = [gene_forms[position] for position in order]
+    pubmed_ids = [pubmed_ids[position] for position in order]
+    evidence = [evidence[position] for position in order]
+
+    encoded_actions = _encode_ragged(actions)
+    encoded_gene_forms = _encode_ragged(gene_forms)
+    encoded_chemical_names = _encode_strings(
+        (chemical_names[chemical_id] or '').encode('utf-8')
+        for chemical_id in chemical_vocabulary
+    )
+    encoded_gene_symbols = _encode_strings(
+        (gene_symbols[gene_id] or '').encode('utf-8')
+        for gene_id in gene_vocabulary
+    )
+    encoded_evidence = _encode_strings(evidence)
+
+    arrays = dict(
+        chemical_ids=chemical_vocabulary,
+        chemical_names=encoded_chemical_names['data'],
+        chemical_name_offsets=encoded_chemical_names['offsets'],
+        chemical_offsets=_get_offsets(np.bincount(interaction_chemicals, minlength=len(chemical_vocabulary))),
+        gene_ids=gene_vocabulary,
+        gene_symbols=encoded_gene_symbols['data'],
+        gene_symbol_offsets=encoded_gene_symbols['offsets'],
+        gene_offsets=_get_offsets(np.bincount(interaction_genes, minlength=len(gene_vocabulary))),
+        gene_interactions=np.argsort(interaction_genes, kind='stable').astype(np.int64),
+        interaction_ids=np.array(interaction_ids, dtype=np.int64)[order],
+        interaction_chemicals=interaction_chemicals,
+        interaction_genes=interaction_genes,
+        organism_ids=np.array(organism_ids, dtype=np.int64)[order],
+        actions=encoded_actions['vocabulary'],
+        action_offsets=encoded_actions['offsets'],
+        action_codes=encoded_actions['codes'],
+        gene_forms=encoded_gene_forms['vocabulary'],
+        gene_form_offsets=encoded_gene_forms['offsets'],
+        gene_form_codes=encoded_gene_forms['codes'],
+        pubmed_offsets=_get_offsets(len(row) for row in pubmed_ids),
+        pubmed_ids=np.fromiter((pubmed_id for row in pubmed_ids for pubmed_id in row), dtype=np.int64),
+        evidence_offsets=encoded_evidence['offsets'],
+        evidence=encoded_evidence['data'],
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(directory, name + '.npy'), arrays[name])
+
+    with open(os.path.join(directory, 'index.json'), 'w') as file:
+        json.dump(dict(version=INDEX_FORMAT_VERSION, interactions=len(interaction_ids)), file)
+
+    log.info('built an index of %d interactions in %s', len(interaction_ids), directory)
+    return len(interaction_ids)
+
+
+class InteractionIndex:
+    """A read-only index of the chemical-gene interactions, built with :func:`build_interaction_index`."""
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        """
+        :param arrays: The arrays of the index, by name
+        """
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'InteractionIndex':
+        """Open an index from a directory.
+
+        :param directory: The directory where the index was saved
+        :param mmap_mode: The mode with which to memory-map the files. If none, they're read into memory.
+        :raises ValueError: If the index was saved with a different layout
+        """
+        with open(os.path.join(directory, 'index.json')) as file:
+            metadata = json.load(file)
+
+        if metadata['version'] != INDEX_FORMAT_VERSION:
+            raise ValueError('{} has version {} of the index format but version {} is needed'.format(
+                directory, metadata['version'], INDEX_FORMAT_VERSION))
+
+        return cls({
+            name: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode)
+            for name in ARRAY_NAMES
+        })
+
+    def __len__(self) -> int:
+        return len(self.interaction_ids)
+
+    @staticmethod
+    def _find(vocabulary: np.ndarray, value) -> Optional[int]:
+        """Find the position of a value in a sorted vocabulary with a binary search."""
+        position = int(np.searchsorted(vocabulary, value))
+        if position < len(vocabulary) and vocabulary[position] == value:
+            return position
+
+    def get_chemical_interaction_positions(self, mesh_id: str) -> range:
+        """Get the positions of the interactions of a chemical in the index.
+
+        :param mesh_id: The MeSH identifier of a chemical, as it appears in the database
+        """
+        chemical = self._find(self.chemical_ids, mesh_id)
+        if chemical is None:
+            return range(0)
+
+        return range(int(self.chemical_offsets[chemical]), int(self.chemical_offsets[chemical + 1]))
+
+    def get_gene_interaction_positions(self, entrez_id) -> List[int]:
+        """Get the positions of the interactions of a gene in the index.
+
+        :param entrez_id: The Entrez Gene identifier of a gene
+        """
+        try:
+            entrez_id = int(entrez_id)
+        except ValueError:
+            return []
+
+        gene = self._find(self.gene_ids, entrez_id)
+        if gene is None:
+            return []
+
+        return self.gene_interactions[self.gene_offsets[gene]:self.gene_offsets[gene + 1]].tolist()
+
+    def get_interaction(self, position: int) -> InteractionRecord:
+        """Get the interaction at a position in the index.
+
+        :param position: The position of the interaction in the index
+        """
+        chemical = self.interaction_chemicals[position]
+        gene = self.interaction_genes[position]
+        organism_id = int(self.organism_ids[position])
+
+        return make_interaction_record(
+            int(self.interaction_ids[position]),
+            _decode_string(self.evidence, self.evidence_offsets, position),
+            None if organism_id == _MISSING_ORGANISM else organism_id,
+            str(self.chemical_ids[chemical]),
+            _decode_string(self.chemical_names, self.chemical_name_offsets, chemical),
+            int(self.gene_ids[gene]),
+            _decode_string(self.gene_symbols, self.gene_symbol_offsets, gene),
+            self._get_values(self.gene_forms, self.gene_form_offsets, self.gene_form_codes, position),
+            self._get_values(self.actions, self.action_offsets, self.action_codes, position),
+            self.pubmed_ids[self.pubmed_offsets[position]:self.pubmed_offsets[position + 1]].tolist(),
+        )
+
+    @staticmethod
+    def _get_values(vocabulary: np.ndarray, offsets: np.ndarray, codes: np.ndarray, position: int) -> List[str]:
+        return [str(vocabulary[code]) for code in codes[offsets[position]:offsets[position + 1]]]
+
+    def iter_chemical_interactions(self, mesh_id: str) -> Iterable[InteractionRecord]:
+        """Iterate over the interactions of a chemical.
+
+        :param mesh_id: The MeSH identifier of a chemical, as it appears in the database
+        """
+        for position in self.get_chemical_interaction_positions(mesh_id):
+            yield self.get_interaction(position)
+
+    def iter_gene_interactions(self, entrez_id) -> Iterable[InteractionRecord]:
+        """Iterate over the interactions of a gene.
+
+        :param entrez_id: The Entrez Gene identifier of a gene
+        """
+        for position in self.get_gene_interaction_positions(entrez_id):
+            yield self.get_interaction(position)
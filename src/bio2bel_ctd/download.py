@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""Parallel, resumable downloads of the CTD files.
+
+Each file is downloaded to a ``.part`` file next to its destination. If a download is interrupted, the next attempt asks
+the server for the rest of the file with an HTTP range request instead of starting over. The ``ETag`` or
+``Last-Modified`` header of the file is kept in a ``.part.validator`` file and sent as the ``If-Range`` header of the
+range request, so a file that changed on the server in the meantime is downloaded again from the start. The SHA-256
+digest of each file is checked against the expected one, if it was given, before the ``.part`` file is moved to its
+destination. The digest of a file downloaded from the start is computed from the chunks as they're written, so files
+are only read back from disk to check the digests of resumed downloads and of files that were already there.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Mapping, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import requests
+from tqdm import tqdm
+
+from .utils import get_sha256
+
+__all__ = [
+    'DownloadReport',
+    'download_file',
+    'download_files',
+]
+
+log = logging.getLogger(__name__)
+
+#: The number of files downloaded at the same time
+DEFAULT_MAX_WORKERS = 4
+
+#: The number of bytes read from a response and written to disk at a time
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 2 ** 20
+
+DownloadReport = NamedTuple('DownloadReport', [
+    ('url', str),
+    ('path', str),
+    ('downloaded', int),  # the number of bytes transferred, which is 0 if the file was already there
+    ('resumed_from', int),  # the number of bytes that were already downloaded by an earlier attempt
+    ('seconds', float),
+    ('sha256', Optional[str]),  # the SHA-256 hex digest, if it was computed while downloading or had to be checked
+])
+
+
+def _get_file_name(url: str) -> str:
+    return os.path.basename(urlparse(url).path)
+
+
+def _check_sha256(path: str, expected_sha256: Optional[str], sha256: Optional[str] = None) -> Optional[str]:
+    """Check the SHA-256 digest of a file, if one is expected.
+
+    :param path: The path to the file
+    :param expected_sha256: The expected SHA-256 hex digest of the file
+    :param sha256: The digest of the file, if it's already known. Otherwise, the file is only hashed if a digest is
+     expected.
+    """
+    if sha256 is None:
+        if expected_sha256 is None:
+            return
+        sha256 = get_sha256(path)
+
+    if expected_sha256 is not None and sha256 != expected_sha256.lower():
+        raise ValueError('SHA-256 of {} is {} but expected {}'.format(path, sha256, expected_sha256))
+    return sha256
+
+
+def _get_validator(response: requests.Response) -> Optional[str]:
+    """Get the validator of the file in a response to send as the ``If-Range`` header when resuming its download."""
+    etag = response.headers.get('ETag')
+    # Weak entity tags can't be used for range requests
+    if etag is not None and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+def _read_validator(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return
+    with open(path) as file:
+        return file.read().strip() or None
+
+
+def _write_validator(path: str, validator: Optional[str]) -> None:
+    if validator is None:
+        _remove(path)
+        return
+    with open(path, 'w') as file:
+        file.write(validator)
+
+
+def _remove(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _get_content_length(url: str, timeout: float) -> Optional[int]:
+    """Get the size of a file from the ``Content-Length`` header of a ``HEAD`` request, if the server gives it."""
+    response = requests.head(url, allow_redirects=True, timeout=timeout)
+    if not response.ok:
+        return
+    content_length = response.headers.get('Content-Length')
+    return int(content_length) if content_length is not None else None
+
+
+def download_file(url: str, path: str, expected_sha256: Optional[str] = None, force_download: bool = False,
+                  chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE, position: Optional[int] = None,
+                  timeout: float = 60.0) -> DownloadReport:
+    """Download a file, resuming an earlier attempt if there is one.
+
+    :param url: The URL of the file
+    :param path: The path where the file is saved
+    :param expected_sha256: The expected SHA-256 hex digest of the file. If the digest doesn't match, the partial
+     download is removed and a :class:`ValueError` is raised.
+    :param force_download: If true, download the file even if it already exists
+    :param chunk_size: The number of bytes to read and write at a time
+    :param position: The line of the terminal on which to show the progress bar
+    :param timeout: The number of seconds to wait for the server before giving up
+    """
+    start = time.time()
+
+    if os.path.exists(path) and not force_download:
+        log.info('already downloaded %s to %s', url, path)
+        return DownloadReport(url, path, 0, 0, time.time() - start, _check_sha256(path, expected_sha256))
+
+    if not urlparse(url).scheme and os.path.exists(url):
+        if not os.path.exists(path) or not os.path.samefile(url, path):
+            log.info('copying %s to %s', url, path)
+            shutil.copyfile(url, path)
+        return DownloadReport(url, path, os.path.getsize(path), 0, time.time() - start,
+                              _check_sha256(path, expected_sha256))
+
+    part_path = path + '.part'
+    validator_path = part_path + '.validator'
+
+    resumed_from, validator = 0, None
+    if os.path.exists(part_path):
+        validator = _read_validator(validator_path)
+        if validator is None:
+            log.info('restarting download of %s since %s can not be checked against the server', url, part_path)
+        else:
+            resumed_from = os.path.getsize(part_path)
+
+    headers = {'Range': 'bytes={}-'.format(resumed_from), 'If-Range': validator} if resumed_from else {}
+    response = requests.get(url, headers=headers, stream=True, timeout=timeout)
+
+    downloaded, digest = 0, None
+    if resumed_from and response.status_code == 416 and resumed_from == _get_content_length(url, timeout):
+        # The server has nothing past what was already downloaded, which is the whole file
+        log.info('%s was already completely downloaded to %s', url, part_path)
+        response.close()
+    else:
+        # A server that doesn't support If-Range could still send a range of a file that changed
+        if resumed_from and (
+            response.status_code == 416 or
+            (response.status_code == 206 and _get_validator(response) != validator)
+        ):
+            log.info('restarting download of %s since %s is not part of the file on the server', url, part_path)
+            response.close()
+            response = requests.get(url, stream=True, timeout=timeout)
+
+        response.raise_for_status()
+
+        if resumed_from and response.status_code == 206:
+            log.info('resuming download of %s from byte %d', url, resumed_from)
+            mode = 'ab'
+        else:
+            resumed_from = 0
+            mode = 'wb'
+            digest = hashlib.sha256()
+            _write_validator(validator_path, _get_validator(response))
+
+        content_length = response.headers.get('Content-Length')
+        total = resumed_from + int(content_length) if content_length is not None else None
+
+        with open(part_path, mode) as file, tqdm(total=total, initial=resumed_from, unit='B', unit_scale=True,
+                                                 desc=_get_file_name(url), position=position, leave=False) as progress:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+                downloaded += len(chunk)
+                progress.update(len(chunk))
+
+        if total is not None and os.path.getsize(part_path) != total:
+            raise IOError('download of {} was incomplete: got {} of {} bytes'.format(
+                url, os.path.getsize(part_path), total))
+
+    try:
+        sha256 = _check_sha256(part_path, expected_sha256, sha256=(digest.hexdigest() if digest is not None else None))
+    except ValueError:
+        os.remove(part_path)
+        _remove(validator_path)
+        raise
+
+    os.replace(part_path, path)
+    _remove(validator_path)
+
+    return DownloadReport(url, path, downloaded, resumed_from, time.time() - start, sha256)
+
+
+def download_files(urls: Iterable[str], directory: str, max_workers: int = DEFAULT_MAX_WORKERS,
+                   force_download: bool = False,
+                   expected_sha256s: Optional[Mapping[str, str]] = None) -> List[DownloadReport]:
+    """Download files in parallel to a directory.
+
+    :param urls: The URLs of the files
+    :param directory: The directory where the files are saved, with the same names as in their URLs
+    :param max_workers: The number of files to download at the same time
+    :param force_download: If true, download the files even if they already exist
+    :param expected_sha256s: The expected SHA-256 hex digests of the files, by file name
+    """
+    expected_sha256s = expected_sha256s or {}
+    urls = list(urls)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                download_file,
+                url,
+                os.path.join(directory, _get_file_name(url)),
+                expected_sha256=expected_sha256s.get(_get_file_name(url)),
+                force_download=force_download,
+                position=position,
+            )
+            for position, url in enumerate(urls)
+        ]
+        reports = [future.result() for future in futures]
+
+    for report in reports:
+        if not report.downloaded:
+            continue
+        log.info(
+            'downloaded %.1f MB of %s in %.1f seconds (%.1f MB/s)',
+            report.downloaded / 2 ** 20,
+            report.url,
+            report.seconds,
+            report.downloaded / 2 ** 20 / report.seconds if report.seconds else 0.0,
+        )
+
+    return reports
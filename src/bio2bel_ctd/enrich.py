@@ -1,17 +1,27 @@
 # -*- coding: utf-8 -*-
 
 from .manager import Manager
+from .registry import get_manager
 
 __all__ = [
     'enrich_chemicals',
 ]
 
 
-def enrich_chemicals(graph, connection=None):
+def enrich_chemicals(graph, connection=None, stats=None, filters=None):
     """Enriches chemicals in the graph
 
+    A connection string is looked up in the process-wide registry of managers, so calling this many times with the same
+    one reuses its engine and connection pool. See :mod:`bio2bel_ctd.registry`.
+
     :param pybel.BELGraph graph: A BEL graph
     :type connection: str or bio2bel_ctd.Manager
+    :param Optional[bio2bel_ctd.stats.TranslationStats] stats: If given, the translation of the interactions is
+     recorded in it
+    :param Optional[bio2bel_ctd.filters.InteractionFilter] filters: If given, only the interactions that meet its
+     conditions are added
+    :return: The number of nodes that were (``hit``) and weren't (``miss``) found, by namespace
+    :rtype: dict[str,dict[str,int]]
     """
-    m = Manager.ensure(connection=connection)
-    m.enrich_chemicals(graph)
+    m = connection if isinstance(connection, Manager) else get_manager(connection)
+    return m.enrich_chemicals(graph, stats=stats, filters=filters)
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import copy
 import logging
-from typing import Set
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
 
 from pybel import BELGraph
 from pybel.constants import DECREASES, INCREASES, REGULATES
@@ -9,28 +12,24 @@ from pybel.dsl import (
     CentralDogma, abundance as abundance_dsl, activity, complex_abundance as complex_abundance_dsl, fragment,
     gene as gene_dsl, gmod, pmod, protein as protein_dsl, reaction, rna as rna_dsl, translocation,
 )
-from .constants import MODULE_NAME
+from .constants import DSL_CACHE_SIZE, MODULE_NAME
 from .models import ChemGeneIxn
+from .stats import TranslationStats
 
 log = logging.getLogger('bio2bel_ctd')
 
 
-def get_dsl_chemical(ixn: ChemGeneIxn) -> abundance_dsl:
-    """Return a PyBEL DSL object for the chemical from the interaction."""
+@lru_cache(maxsize=DSL_CACHE_SIZE)
+def _get_dsl_chemical(chemical_id, chemical_name) -> abundance_dsl:
     return abundance_dsl(
         namespace='mesh',
-        name=str(ixn.chemical.chemical_name),
-        identifier=str(ixn.chemical.chemical_id)
+        name=str(chemical_name),
+        identifier=str(chemical_id)
     )
 
 
-def get_dsl_gene(ixn: ChemGeneIxn) -> CentralDogma:
-    """Return a PyBEL DSL object for the gene from the interaction."""
-    gene_forms = list(ixn.gene_forms)
-
-    # do checking here too?
-    gene_form = gene_forms[0].gene_form
-
+@lru_cache(maxsize=DSL_CACHE_SIZE)
+def _get_dsl_gene(gene_id, gene_symbol, gene_form: str) -> CentralDogma:
     if gene_form == 'gene':
         dsl = gene_dsl
     elif gene_form == 'mRNA':
@@ -42,11 +41,58 @@ def get_dsl_gene(ixn: ChemGeneIxn) -> CentralDogma:
 
     return dsl(
         namespace='ncbigene',
-        name=str(ixn.gene.gene_symbol),
-        identifier=str(ixn.gene.gene_id)
+        name=str(gene_symbol),
+        identifier=str(gene_id)
     )
 
 
+def get_dsl_chemical(ixn: ChemGeneIxn) -> abundance_dsl:
+    """Return a PyBEL DSL object for the chemical from the interaction.
+
+    The DSL objects are memoized, and a copy is returned since graphs keep the DSL objects of their nodes as node data.
+    """
+    chemical = ixn.chemical
+    return copy.copy(_get_dsl_chemical(chemical.chemical_id, chemical.chemical_name))
+
+
+def get_dsl_gene(ixn: ChemGeneIxn) -> CentralDogma:
+    """Return a PyBEL DSL object for the gene from the interaction.
+
+    The DSL objects are memoized, and a copy is returned since graphs keep the DSL objects of their nodes as node data.
+    """
+    gene_forms = list(ixn.gene_forms)
+
+    # do checking here too?
+    gene_form = gene_forms[0].gene_form
+
+    gene = ixn.gene
+    return copy.copy(_get_dsl_gene(gene.gene_id, gene.gene_symbol, gene_form))
+
+
+def get_dsl_cache_info() -> Mapping[str, Mapping[str, float]]:
+    """Get the hits, misses, size, maximum size, and hit rate of the memoized chemical and gene DSL constructors."""
+    rv = {}
+
+    for key, function in (('chemical', _get_dsl_chemical), ('gene', _get_dsl_gene)):
+        info = function.cache_info()
+        lookups = info.hits + info.misses
+        rv[key] = dict(
+            hits=info.hits,
+            misses=info.misses,
+            size=info.currsize,
+            maxsize=info.maxsize,
+            hit_rate=(info.hits / lookups if lookups else 0.0),
+        )
+
+    return rv
+
+
+def clear_dsl_cache() -> None:
+    """Clear the memoized chemical and gene DSL objects."""
+    _get_dsl_chemical.cache_clear()
+    _get_dsl_gene.cache_clear()
+
+
 def _ixn_is_changes_entity(ixn: ChemGeneIxn, interaction_action: str, gene_form: str):
     """
     :param ixn: A chemical-gene interaction
@@ -54,15 +100,7 @@ def _ixn_is_changes_entity(ixn: ChemGeneIxn, interaction_action: str, gene_form:
     :param gene_form:
     :rtype: bool
     """
-    actions = list(ixn.interaction_actions)
-    forms = list(ixn.gene_forms)
-
-    return (
-            len(actions) == 1 and
-            actions[0].interaction_action == interaction_action and
-            len(forms) == 1 and
-            forms[0].gene_form == gene_form
-    )
+    return get_interaction_signature(ixn) == ((interaction_action,), (gene_form,))
 
 
 def _ixn_is_changes_gene(ixn: ChemGeneIxn, interaction_action: str) -> bool:
@@ -553,67 +591,104 @@ def add_ixn_increases_chemical_synthesis(graph: BELGraph, ixn: ChemGeneIxn):
     ]
 
 
-def add_chemical_gene_interaction(graph, ixn: ChemGeneIxn):
-    """Adds a chemical-gene interaction to the BEL graph
+#: The signature of an interaction: its sorted interaction actions and its sorted gene forms
+InteractionSignature = Tuple[Tuple[str, ...], Tuple[str, ...]]
 
-    :param pybel.BELGraph graph: A BEL graph
-    :param pyctd.manager.models.ChemGeneIxn ixn: A chemical-gene interaction
+#: A function that adds an interaction to a BEL graph
+InteractionHandler = Callable[[BELGraph, ChemGeneIxn], Optional[Iterable[str]]]
+
+
+def get_interaction_signature(ixn: ChemGeneIxn) -> InteractionSignature:
+    """Get the signature of an interaction, which is used to look up its handler in :data:`INTERACTION_HANDLERS`.
+
+    :param ixn: A chemical-gene interaction
     """
-    if ixn_is_increases_mrna(ixn) or ixn_is_increases_protein(ixn):
-        return add_ixn_increases_expression(graph, ixn)
+    return (
+        tuple(sorted(action.interaction_action for action in ixn.interaction_actions)),
+        tuple(sorted(gene_form.gene_form for gene_form in ixn.gene_forms)),
+    )
 
-    if ixn_is_decreases_mrna(ixn) or ixn_is_decreases_protein(ixn):
-        return add_ixn_decreases_expression(graph, ixn)
 
-    if ixn_is_regulates_mrna(ixn) or ixn_is_regulates_protein(ixn):
-        return add_ixn_regulates_expression(graph, ixn)
+#: Handlers for chemical-gene interactions, keyed by their signatures
+INTERACTION_HANDLERS = {}  # type: Dict[InteractionSignature, InteractionHandler]
 
-    if ixn_is_increases_activity(ixn):
-        return add_ixn_increases_activity(graph, ixn)
 
-    if ixn_is_decreases_activity(ixn):
-        return add_ixn_decreases_activity(graph, ixn)
+def register_interaction_handler(interaction_actions: Iterable[str], gene_forms: Iterable[str],
+                                 handler: InteractionHandler) -> None:
+    """Register the handler for interactions with exactly the given interaction actions and gene forms.
+
+    :param interaction_actions: The interaction actions of the interaction, like ``increases^expression``
+    :param gene_forms: The gene forms of the interaction, like ``protein``
+    :param handler: A function that takes a BEL graph and an interaction and adds it
+    """
+    INTERACTION_HANDLERS[tuple(sorted(interaction_actions)), tuple(sorted(gene_forms))] = handler
+
 
-    if ixn_is_increases_phosphorylation(ixn):
-        return add_ixn_increases_phosphorylation(graph, ixn)
+for _gene_form in ('mRNA', 'protein'):
+    register_interaction_handler(['increases^expression'], [_gene_form], add_ixn_increases_expression)
+    register_interaction_handler(['decreases^expression'], [_gene_form], add_ixn_decreases_expression)
+    register_interaction_handler(['affects^expression'], [_gene_form], add_ixn_regulates_expression)
 
-    if ixn_is_decreases_phosphorylation(ixn):
-        return add_ixn_decreases_phosphorylation(graph, ixn)
+for _interaction_action, _handler in [
+    ('increases^activity', add_ixn_increases_activity),
+    ('decreases^activity', add_ixn_decreases_activity),
+    ('increases^phosphorylation', add_ixn_increases_phosphorylation),
+    ('decreases^phosphorylation', add_ixn_decreases_phosphorylation),
+    ('increases^hydroxylation', add_ixn_increases_hydroxylation),
+    ('decreases^hydroxylation', add_ixn_decreases_hydroxylation),
+    ('increases^oxidation', add_ixn_increases_oxidation),
+    ('decreases^oxidation', add_ixn_decreases_oxidation),
+    ('affects^binding', add_ixn_binding),
+    ('affects^localization', add_ixn_affect_localization),
+    ('increases^cleavage', add_ixn_increases_cleavage),
+    ('increases^chemical synthesis', add_ixn_increases_chemical_synthesis),
+]:
+    register_interaction_handler([_interaction_action], ['protein'], _handler)
 
-    if ixn_is_increases_hydroxylation(ixn):
-        return add_ixn_increases_hydroxylation(graph, ixn)
+for _interaction_action, _handler in [
+    ('increases^methylation', add_ixn_increases_methylation),
+    ('decreases^methylation', add_ixn_decreases_methylation),
+    ('affects^methylation', add_ixn_regulates_methylation),
+]:
+    register_interaction_handler([_interaction_action], ['gene'], _handler)
 
-    if ixn_is_decreases_hydroxylation(ixn):
-        return add_ixn_decreases_hydroxylation(graph, ixn)
 
-    if _ixn_is_changes_protein(ixn, 'increases^oxidation'):
-        return add_ixn_increases_oxidation(graph, ixn)
+def get_interaction_handler(ixn: ChemGeneIxn) -> Optional[InteractionHandler]:
+    """Get the handler for a chemical-gene interaction from :data:`INTERACTION_HANDLERS`, if one exists.
 
-    if _ixn_is_changes_protein(ixn, 'decreases^oxidation'):
-        return add_ixn_decreases_oxidation(graph, ixn)
+    :param ixn: A chemical-gene interaction
+    """
+    return INTERACTION_HANDLERS.get(get_interaction_signature(ixn))
 
-    if _ixn_is_changes_gene(ixn, 'increases^methylation'):
-        return add_ixn_increases_methylation(graph, ixn)
 
-    if _ixn_is_changes_gene(ixn, 'decreases^methylation'):
-        return add_ixn_decreases_methylation(graph, ixn)
+def add_chemical_gene_interaction(graph, ixn: ChemGeneIxn, stats: Optional[TranslationStats] = None):
+    """Adds a chemical-gene interaction to the BEL graph
 
-    if _ixn_is_changes_gene(ixn, 'affects^methylation'):
-        return add_ixn_regulates_methylation(graph, ixn)
+    The relationships of the interaction are only read once to build its signature, which is then used to look up
+    the handler in :data:`INTERACTION_HANDLERS`.
 
-    if ixn_is_binding(ixn):
-        return add_ixn_binding(graph, ixn)
+    :param pybel.BELGraph graph: A BEL graph
+    :param pyctd.manager.models.ChemGeneIxn ixn: A chemical-gene interaction
+    :param stats: If given, the call of the handler and its time, or the signature of the interaction if it has no
+     handler, are recorded in it
+    """
+    signature = get_interaction_signature(ixn)
+    handler = INTERACTION_HANDLERS.get(signature)
 
-    if _ixn_is_changes_protein(ixn, 'affects^localization'):
-        return add_ixn_affect_localization(graph, ixn)
+    if handler is not None:
+        if stats is None:
+            return handler(graph, ixn)
 
-    if _ixn_is_changes_protein(ixn, 'increases^cleavage'):
-        return add_ixn_increases_cleavage(graph, ixn)
+        start = time.perf_counter()
+        rv = handler(graph, ixn)
+        stats.add_call(handler.__name__, len(rv) if rv else 0, time.perf_counter() - start)
+        return rv
 
-    if _ixn_is_changes_protein(ixn, 'increases^chemical synthesis'):
-        return add_ixn_increases_chemical_synthesis(graph, ixn)
+    if stats is not None:
+        stats.add_unmapped(signature)
 
-    if len(list(ixn.interaction_actions)) > 1:
+    interaction_actions, _ = signature
+    if len(interaction_actions) > 1:
         return
 
     log.debug('did not map (%d) %s', ixn.id, ixn.interaction)
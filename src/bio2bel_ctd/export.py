@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""Write chemicals, genes, and chemical-gene interactions to tab-separated or JSON Lines files.
+
+The rows are given in chunks, like the ones from :meth:`bio2bel_ctd.Manager.iter_chunks`, and each chunk is converted
+and written with a single call, so a whole table can be exported in constant memory without a write for every row.
+"""
+
+import json
+from typing import Any, Callable, Iterable, List, Mapping, Optional, TextIO
+
+__all__ = [
+    'EXPORT_FORMATS',
+    'export_chunks',
+]
+
+#: The formats the rows can be written in
+EXPORT_FORMATS = ['tsv', 'jsonl']
+
+
+def _format_tsv_value(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '|'.join(map(str, value))
+    return str(value).replace('\t', ' ').replace('\r', ' ').replace('\n', ' ')
+
+
+def _format_tsv(row: Mapping[str, Any], columns: List[str]) -> str:
+    return '\t'.join(_format_tsv_value(row[column]) for column in columns) + '\n'
+
+
+def _format_jsonl(row: Mapping[str, Any]) -> str:
+    return json.dumps(row, sort_keys=True) + '\n'
+
+
+def export_chunks(chunks: Iterable[List], to_json: Callable[[Any], Mapping[str, Any]], file: TextIO,
+                  fmt: str = 'tsv', columns: Optional[List[str]] = None) -> int:
+    """Write chunks of rows to a file.
+
+    :param chunks: Lists of chemicals, genes, or chemical-gene interactions
+    :param to_json: A function to convert each row to a dictionary, like the ones in
+     :mod:`bio2bel_ctd.serialization`
+    :param file: A file opened for writing text
+    :param fmt: Either ``tsv``, which writes a header followed by tab-separated values with lists joined by ``|``, or
+     ``jsonl``, which writes a JSON object on each line
+    :param columns: The columns of the TSV file. Defaults to the keys of the first row.
+    :return: The number of rows that were written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError('unknown export format: {}'.format(fmt))
+
+    count = 0
+
+    for chunk in chunks:
+        rows = [to_json(row) for row in chunk]
+        if not rows:
+            continue
+
+        if fmt == 'jsonl':
+            file.write(''.join(_format_jsonl(row) for row in rows))
+        else:
+            if columns is None:
+                columns = list(rows[0])
+            if count == 0:
+                file.write('\t'.join(columns) + '\n')
+            file.write(''.join(_format_tsv(row, columns) for row in rows))
+
+        count += len(rows)
+
+    return count
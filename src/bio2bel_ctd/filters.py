@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""Filters on the chemical-gene interactions that are converted to BEL.
+
+An :class:`InteractionFilter` is compiled into criteria on the query of the interactions, so the ones it excludes are
+never loaded from the database or translated. It can be given to :meth:`bio2bel_ctd.Manager.to_bel` and to the
+enrichment methods of the managers like:
+
+.. code-block:: python
+
+    >>> from bio2bel_ctd import Manager
+    >>> from bio2bel_ctd.filters import InteractionFilter
+    >>> manager = Manager()
+    >>> filters = InteractionFilter(organism_ids=[9606], interaction_actions=['increases^expression'])
+    >>> graph = manager.to_bel(filters=filters)
+
+The criteria on the interaction actions, gene forms, and PubMed identifiers are correlated subqueries on the association
+tables, which use the indexes on their foreign keys from :mod:`bio2bel_ctd.indexes`.
+"""
+
+import hashlib
+import json
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, select
+
+from .models import ChemGeneIxn, ChemGeneIxnGeneForm, ChemGeneIxnInteractionAction, ChemGeneIxnPubmed, Chemical, Gene
+
+__all__ = [
+    'InteractionFilter',
+]
+
+
+def _to_frozenset(values: Optional[Iterable], convert=str) -> Optional[frozenset]:
+    if values is None:
+        return
+    if isinstance(values, (str, int)):
+        values = [values]
+    return frozenset(convert(value) for value in values)
+
+
+class InteractionFilter:
+    """Restricts the chemical-gene interactions to ones that meet all of the given conditions.
+
+    Each condition that isn't given doesn't restrict the interactions.
+    """
+
+    def __init__(self, organism_ids: Optional[Iterable[int]] = None,
+                 interaction_actions: Optional[Iterable[str]] = None, gene_forms: Optional[Iterable[str]] = None,
+                 chemical_ids: Optional[Iterable[str]] = None, gene_ids: Optional[Iterable[int]] = None,
+                 min_pubmeds: Optional[int] = None):
+        """
+        :param organism_ids: NCBI Taxonomy identifiers of the organisms, like ``9606`` for human
+        :param interaction_actions: Interaction actions, like ``increases^expression``. An interaction needs to have at
+         least one of them.
+        :param gene_forms: Gene forms, like ``mRNA`` or ``protein``. An interaction needs to have at least one of them.
+        :param chemical_ids: MeSH identifiers of the chemicals
+        :param gene_ids: Entrez Gene identifiers of the genes
+        :param min_pubmeds: The minimum number of PubMed identifiers supporting an interaction
+        """
+        self.organism_ids = _to_frozenset(organism_ids, int)
+        self.interaction_actions = _to_frozenset(interaction_actions)
+        self.gene_forms = _to_frozenset(gene_forms)
+        self.chemical_ids = _to_frozenset(chemical_ids)
+        self.gene_ids = _to_frozenset(gene_ids, int)
+        self.min_pubmeds = min_pubmeds
+
+    def _get_values(self):
+        return [
+            ('organism_ids', self.organism_ids),
+            ('interaction_actions', self.interaction_actions),
+            ('gene_forms', self.gene_forms),
+            ('chemical_ids', self.chemical_ids),
+            ('gene_ids', self.gene_ids),
+            ('min_pubmeds', self.min_pubmeds),
+        ]
+
+    def __bool__(self) -> bool:
+        """Check if the filter restricts the interactions at all."""
+        return any(value is not None for _, value in self._get_values())
+
+    def __repr__(self) -> str:
+        return 'InteractionFilter({})'.format(', '.join(
+            '{}={!r}'.format(name, sorted(value) if isinstance(value, frozenset) else value)
+            for name, value in self._get_values()
+            if value is not None
+        ))
+
+    def get_key(self) -> str:
+        """Get a key that's the same for filters with the same conditions, like for naming cached graphs."""
+        data = {
+            name: (sorted(value) if isinstance(value, frozenset) else value)
+            for name, value in self._get_values()
+            if value is not None
+        }
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def get_criteria(self) -> List:
+        """Get the criteria on :class:`ChemGeneIxn` for the conditions, to give to a query's ``filter`` or a
+        statement's ``where``.
+        """
+        criteria = []
+
+        if self.organism_ids is not None:
+            criteria.append(ChemGeneIxn.organism_id.in_(sorted(self.organism_ids)))
+
+        if self.interaction_actions is not None:
+            criteria.append(ChemGeneIxn.interaction_actions.any(
+                ChemGeneIxnInteractionAction.interaction_action.in_(sorted(self.interaction_actions))
+            ))
+
+        if self.gene_forms is not None:
+            criteria.append(ChemGeneIxn.gene_forms.any(ChemGeneIxnGeneForm.gene_form.in_(sorted(self.gene_forms))))
+
+        if self.chemical_ids is not None:
+            criteria.append(ChemGeneIxn.chemical.has(Chemical.chemical_id.in_(sorted(self.chemical_ids))))
+
+        if self.gene_ids is not None:
+            criteria.append(ChemGeneIxn.gene.has(Gene.gene_id.in_(sorted(self.gene_ids))))
+
+        if self.min_pubmeds is not None and 0 < self.min_pubmeds:
+            pubmed_count = select(func.count(ChemGeneIxnPubmed.id)) \
+                .where(ChemGeneIxnPubmed.chem_gene_ixn__id == ChemGeneIxn.id) \
+                .scalar_subquery()
+            criteria.append(pubmed_count >= self.min_pubmeds)
+
+        return criteria
+
+    def apply(self, query):
+        """Restrict a query over :class:`ChemGeneIxn` to the interactions that meet the conditions.
+
+        :param sqlalchemy.orm.Query query: A query over chemical-gene interactions
+        :rtype: sqlalchemy.orm.Query
+        """
+        criteria = self.get_criteria()
+        return query.filter(*criteria) if criteria else query
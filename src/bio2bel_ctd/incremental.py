@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for only reimporting the CTD tables whose files changed since they were last imported.
+
+The fingerprint of each file (its size, modification time, and SHA-256 digest) is stored in the
+:class:`bio2bel_ctd.models.SourceFile` table after its table is imported. A table needs to be reimported if its file
+has a different fingerprint, or if it references a vocabulary table (chemicals, genes, diseases, or pathways) that needs
+to be reimported, since its foreign keys are resolved from the positions of the rows in the vocabulary's file.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Set
+
+from pyctd.manager import table_conf
+from pyctd.manager.table import Table
+from sqlalchemy.orm import Session
+
+from .models import SourceFile
+from .utils import get_sha256
+
+__all__ = [
+    'Fingerprint',
+    'get_fingerprint',
+    'get_dependent_tables',
+    'get_changed_tables',
+    'store_fingerprints',
+]
+
+log = logging.getLogger(__name__)
+
+Fingerprint = NamedTuple('Fingerprint', [
+    ('size', int),
+    ('mtime', float),
+    ('sha256', str),
+])
+
+
+def get_fingerprint(path: str, previous: Optional[SourceFile] = None) -> Fingerprint:
+    """Get the fingerprint of a file.
+
+    :param path: The path to the file
+    :param previous: The fingerprint stored the last time the file was imported. If the file's size and modification
+     time haven't changed, its digest is reused instead of hashing the whole file again.
+    """
+    stat = os.stat(path)
+
+    if previous is not None and previous.size == stat.st_size and previous.mtime == stat.st_mtime:
+        return Fingerprint(stat.st_size, stat.st_mtime, previous.sha256)
+
+    return Fingerprint(stat.st_size, stat.st_mtime, get_sha256(path))
+
+
+def _get_domains(table: Table) -> Set[str]:
+    """Get the names of the vocabulary tables referenced by a table."""
+    if table.model in table_conf.models_to_map:
+        return set()
+
+    return {
+        model.table_suffix
+        for model in table_conf.models_to_map
+        if model.table_suffix + '_id' in table.columns_in_db
+    }
+
+
+def get_dependent_tables(tables: Iterable[Table], table_names: Iterable[str]) -> Set[str]:
+    """Get the names of the given tables and of all tables that reference them.
+
+    :param tables: The PyCTD configurations of all tables
+    :param table_names: The names of the tables that changed
+    """
+    table_names = set(table_names)
+
+    return table_names | {
+        table.name
+        for table in tables
+        if _get_domains(table) & table_names
+    }
+
+
+def get_changed_tables(session: Session, tables: Iterable[Table], data_dir: str) -> List[str]:
+    """Get the names of the tables whose files changed since they were last imported.
+
+    The sizes and modification times of files that were only touched are updated in their stored fingerprints without
+    changing when they were imported, so they aren't hashed again the next time.
+
+    :param session: A database session
+    :param tables: The PyCTD configurations of the tables to check
+    :param data_dir: The directory containing the CTD files
+    """
+    source_files = {
+        source_file.table_name: source_file
+        for source_file in session.query(SourceFile)
+    }
+
+    changed = []
+    for table in tables:
+        previous = source_files.get(table.name)
+        path = os.path.join(data_dir, table.file_name)
+
+        if previous is None or previous.file_name != table.file_name:
+            log.info('%s has not been imported from %s', table.name, table.file_name)
+            changed.append(table.name)
+            continue
+
+        fingerprint = get_fingerprint(path, previous=previous)
+        if fingerprint.sha256 != previous.sha256:
+            log.info('%s changed since %s was imported on %s', table.file_name, table.name, previous.imported)
+            changed.append(table.name)
+        elif fingerprint.size != previous.size or fingerprint.mtime != previous.mtime:
+            log.debug('%s was touched, but its contents did not change', table.file_name)
+            previous.size = fingerprint.size
+            previous.mtime = fingerprint.mtime
+
+    session.commit()
+
+    return changed
+
+
+def store_fingerprints(session: Session, tables: Iterable[Table], data_dir: str) -> None:
+    """Store the fingerprints of the files of the tables that were just imported.
+
+    :param session: A database session
+    :param tables: The PyCTD configurations of the tables that were imported
+    :param data_dir: The directory containing the CTD files
+    """
+    for table in tables:
+        source_file = session.query(SourceFile).filter(SourceFile.table_name == table.name).one_or_none()
+
+        previous = source_file if source_file is not None and source_file.file_name == table.file_name else None
+        fingerprint = get_fingerprint(os.path.join(data_dir, table.file_name), previous=previous)
+
+        if source_file is None:
+            source_file = SourceFile(table_name=table.name)
+            session.add(source_file)
+
+        source_file.file_name = table.file_name
+        source_file.size = fingerprint.size
+        source_file.mtime = fingerprint.mtime
+        source_file.sha256 = fingerprint.sha256
+        source_file.imported = datetime.utcnow()
+
+    session.commit()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""The indexes needed by the queries of :class:`bio2bel_ctd.Manager`.
+
+The lookups of chemicals and genes filter on their identifiers and the interactions are loaded with their gene forms,
+interaction actions, and PubMed identifiers through the foreign keys of the association tables. PyCTD only indexes
+some of these columns, so the missing indexes are declared here, with the same naming convention as the ones declared
+by PyCTD.
+
+Because they're declared on the tables, they're dropped before a bulk load and recreated after it with the other
+indexes (see :mod:`bio2bel_ctd.bulk`). :func:`create_indexes` creates the ones that are missing, like in a database that
+was populated before they were declared.
+"""
+
+import logging
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Connectable
+from sqlalchemy.exc import SQLAlchemyError
+
+from .models import ChemGeneIxn, ChemGeneIxnGeneForm, ChemGeneIxnInteractionAction, ChemGeneIxnPubmed, Chemical, Gene
+
+__all__ = [
+    'MANAGED_INDEXES',
+    'IndexReport',
+    'create_indexes',
+    'drop_indexes',
+    'get_index_reports',
+]
+
+log = logging.getLogger(__name__)
+
+#: The columns the queries of the manager filter on, by model
+INDEXED_COLUMNS = [
+    (Chemical, ['chemical_id']),
+    (Chemical, ['cas_rn']),
+    (Gene, ['gene_id']),
+    (ChemGeneIxn, ['chemical__id']),
+    (ChemGeneIxn, ['gene__id']),
+    (ChemGeneIxnGeneForm, ['chem_gene_ixn__id']),
+    (ChemGeneIxnInteractionAction, ['chem_gene_ixn__id']),
+    (ChemGeneIxnPubmed, ['chem_gene_ixn__id']),
+]
+
+IndexReport = NamedTuple('IndexReport', [
+    ('name', str),
+    ('table', str),
+    ('columns', List[str]),
+    ('exists', bool),
+    ('size', Optional[int]),
+])
+
+
+def _get_index(table, column_names: List[str]) -> Index:
+    """Get the index of a table on the given columns, declaring it if PyCTD doesn't already."""
+    for index in table.indexes:
+        if [column.name for column in index.columns] == column_names:
+            return index
+
+    name = 'ix_{}_{}'.format(table.name, '_'.join(column_names))
+    return Index(name, *(table.c[column_name] for column_name in column_names))
+
+
+#: The indexes needed by the queries of the manager
+MANAGED_INDEXES = [
+    _get_index(model.__table__, column_names)
+    for model, column_names in INDEXED_COLUMNS
+]
+
+
+def _get_existing_indexes(connection: Connectable, table_name: str) -> Optional[set]:
+    """Get the names of the indexes of a table, or none if the table doesn't exist."""
+    inspector = inspect(connection)
+    if table_name not in inspector.get_table_names():
+        return
+
+    return {index['name'] for index in inspector.get_indexes(table_name)}
+
+
+def create_indexes(connection: Connectable, indexes: Optional[Iterable[Index]] = None) -> List[str]:
+    """Create the managed indexes that don't exist yet.
+
+    :param connection: A database connection or engine
+    :param indexes: The indexes to create. Defaults to :data:`MANAGED_INDEXES`.
+    :return: The names of the indexes that were created
+    """
+    created = []
+
+    for index in (MANAGED_INDEXES if indexes is None else indexes):
+        existing = _get_existing_indexes(connection, index.table.name)
+        if existing is None or index.name in existing:
+            continue
+
+        log.info('creating index %s on %s', index.name, index.table.name)
+        index.create(bind=connection)
+        created.append(index.name)
+
+    return created
+
+
+def drop_indexes(connection: Connectable, indexes: Optional[Iterable[Index]] = None) -> List[Index]:
+    """Drop the managed indexes that exist, like before loading a lot of rows.
+
+    :param connection: A database connection or engine
+    :param indexes: The indexes to drop. Defaults to :data:`MANAGED_INDEXES`.
+    :return: The indexes that were dropped, so they can be given to :func:`create_indexes` afterwards
+    """
+    dropped = []
+
+    for index in (MANAGED_INDEXES if indexes is None else indexes):
+        existing = _get_existing_indexes(connection, index.table.name)
+        if existing is None or index.name not in existing:
+            continue
+
+        index.drop(bind=connection)
+        dropped.append(index)
+
+    return dropped
+
+
+def _get_index_size(connection: Connectable, name: str) -> Optional[int]:
+    """Get the number of bytes an index takes up, if the database can tell."""
+    dialect = connection.dialect.name
+
+    if dialect == 'postgresql':
+        statement = text('SELECT pg_relation_size(CAST(:name AS regclass))')
+    elif dialect == 'sqlite':
+        # Needs SQLite to be compiled with the dbstat virtual table
+        statement = text('SELECT SUM(pgsize) FROM dbstat WHERE name = :name')
+    else:
+        return
+
+    try:
+        return connection.execute(statement, {'name': name}).scalar()
+    except SQLAlchemyError:
+        log.debug('could not get the size of index %s', name)
+        return
+
+
+def get_index_reports(connection: Connectable) -> List[IndexReport]:
+    """Check whether each managed index exists and how big it is.
+
+    :param connection: A database connection or engine
+    """
+    reports = []
+
+    for index in MANAGED_INDEXES:
+        existing = _get_existing_indexes(connection, index.table.name)
+        exists = existing is not None and index.name in existing
+
+        reports.append(IndexReport(
+            name=index.name,
+            table=index.table.name,
+            columns=[column.name for column in index.columns],
+            exists=exists,
+            size=(_get_index_size(connection, index.name) if exists else None),
+        ))
+
+    return reports
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+"""An in-memory index for resolving chemicals by their MeSH identifiers, names, and CAS Registry Numbers."""
+
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple
+
+from pybel import BELGraph
+from pybel.constants import IDENTIFIER, NAME, NAMESPACE
+
+__all__ = [
+    'MESH_NAMESPACES',
+    'CAS_NAMESPACES',
+    'CHEMICAL_NAMESPACES',
+    'ENTREZ_NAMESPACES',
+    'ChemicalLookupIndex',
+    'get_graph_identifiers',
+    'get_entrez_gene_ids',
+    'resolve_graph_chemicals',
+]
+
+#: The namespaces of MeSH chemicals. Nodes in these namespaces may be referenced by identifier or by name.
+MESH_NAMESPACES = {'MESH', 'MESHC'}
+
+#: The namespaces of CAS Registry Numbers
+CAS_NAMESPACES = {'CAS', 'CASRN'}
+
+#: All namespaces that can be resolved to chemicals in the CTD
+CHEMICAL_NAMESPACES = MESH_NAMESPACES | CAS_NAMESPACES
+
+#: The namespaces of Entrez Gene identifiers that are looked up in the CTD
+ENTREZ_NAMESPACES = {'EG', 'EGID', 'ENTREZ'}
+
+
+def _normalize_mesh_id(mesh_id: str) -> str:
+    """Remove the ``MESH:`` prefix from a MeSH identifier, since the CTD files aren't consistent about it."""
+    if mesh_id.startswith('MESH:'):
+        return mesh_id[len('MESH:'):]
+    return mesh_id
+
+
+def _normalize_name(name: str) -> str:
+    return name.strip().casefold()
+
+
+class ChemicalLookupIndex:
+    """Maps MeSH identifiers, chemical names, and CAS Registry Numbers to the database identifiers of chemicals."""
+
+    def __init__(self):
+        self.mesh_ids = {}
+        self.names = {}
+        self.cas_rns = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Hashable, str, str, Optional[str]]]) -> 'ChemicalLookupIndex':
+        """Build an index from rows of (database identifier, MeSH identifier, name, CAS Registry Number)."""
+        index = cls()
+        for row in rows:
+            index.add(*row)
+        return index
+
+    def add(self, chemical_pk: Hashable, mesh_id: Optional[str], name: Optional[str], cas_rn: Optional[str]) -> None:
+        """Add a chemical to the index.
+
+        :param chemical_pk: The database identifier of the chemical, or any other key to resolve it to
+        :param mesh_id: The MeSH identifier of the chemical
+        :param name: The name of the chemical
+        :param cas_rn: The CAS Registry Number of the chemical
+        """
+        if mesh_id:
+            self.mesh_ids[_normalize_mesh_id(mesh_id)] = chemical_pk
+        if name:
+            self.names.setdefault(_normalize_name(name), chemical_pk)
+        if cas_rn:
+            self.cas_rns[cas_rn.strip()] = chemical_pk
+
+    def __len__(self) -> int:
+        return len(self.mesh_ids)
+
+    def get_by_mesh_id(self, mesh_id: str) -> Optional[Hashable]:
+        """Get the database identifier of a chemical by its MeSH identifier, with or without the ``MESH:`` prefix."""
+        return self.mesh_ids.get(_normalize_mesh_id(mesh_id))
+
+    def get_by_name(self, name: str) -> Optional[Hashable]:
+        """Get the database identifier of a chemical by its name, ignoring case."""
+        return self.names.get(_normalize_name(name))
+
+    def get_by_cas(self, cas_rn: str) -> Optional[Hashable]:
+        """Get the database identifier of a chemical by its CAS Registry Number."""
+        return self.cas_rns.get(cas_rn.strip())
+
+    def resolve(self, namespace: str, identifier: Optional[str] = None,
+                name: Optional[str] = None) -> Optional[Hashable]:
+        """Get the database identifier of the chemical referenced by a BEL node, if it exists.
+
+        A MeSH node without an identifier is first looked up by name. Its name is then tried as a MeSH identifier, since
+        older BEL documents put the identifier there.
+
+        :param namespace: The namespace of the node
+        :param identifier: The identifier of the node
+        :param name: The name of the node
+        """
+        if namespace in MESH_NAMESPACES:
+            if identifier is not None:
+                return self.get_by_mesh_id(identifier)
+            if name is not None:
+                chemical_pk = self.get_by_name(name)
+                if chemical_pk is None:
+                    chemical_pk = self.get_by_mesh_id(name)
+                return chemical_pk
+
+        elif namespace in CAS_NAMESPACES:
+            cas_rn = identifier if identifier is not None else name
+            if cas_rn is not None:
+                return self.get_by_cas(cas_rn)
+
+
+def get_graph_identifiers(graph: BELGraph, namespaces: Iterable[str]) -> List[str]:
+    """Get the distinct identifiers (or names, when a node has no identifier) of nodes in the given namespaces.
+
+    :param graph: A BEL graph
+    :param namespaces: The namespaces of the nodes
+    """
+    identifiers = []
+    seen = set()
+
+    for _, data in graph.nodes(data=True):
+        if data.get(NAMESPACE) not in namespaces:
+            continue
+
+        identifier = data.get(IDENTIFIER)
+        if identifier is None:
+            identifier = data.get(NAME)
+        if identifier is None:
+            raise KeyError
+
+        if identifier not in seen:
+            seen.add(identifier)
+            identifiers.append(identifier)
+
+    return identifiers
+
+
+def get_entrez_gene_ids(identifiers: Iterable) -> List[int]:
+    """Convert Entrez Gene identifiers, like the ones from :func:`get_graph_identifiers`, to the integers the CTD
+    stores them as.
+
+    Identifiers that aren't numbers can't be in the CTD, so they're skipped instead of being compared with the integer
+    column, which fails on PostgreSQL.
+
+    :param identifiers: Entrez Gene identifiers, as strings or integers
+    """
+    return [int(identifier) for identifier in identifiers if str(identifier).strip().isdigit()]
+
+
+def resolve_graph_chemicals(graph: BELGraph,
+                            index: ChemicalLookupIndex) -> Tuple[Mapping[str, Mapping[str, int]], Set[Hashable]]:
+    """Resolve the MeSH and CAS nodes in a graph to chemicals.
+
+    :param graph: A BEL graph
+    :param index: An index of the chemicals
+    :return: The number of nodes that were (``hit``) and weren't (``miss``) found, by namespace, and the keys of the
+     chemicals that were found
+    """
+    counts = defaultdict(Counter)  # type: Dict[str, Counter]
+    chemical_keys = set()
+
+    for _, data in graph.nodes(data=True):
+        namespace = data.get(NAMESPACE)
+        if namespace not in CHEMICAL_NAMESPACES:
+            continue
+
+        identifier = data.get(IDENTIFIER)
+        name = data.get(NAME)
+
+        if identifier is None and name is None:
+            raise KeyError
+
+        chemical_key = index.resolve(namespace, identifier=identifier, name=name)
+
+        if chemical_key is None:
+            counts[namespace]['miss'] += 1
+        else:
+            counts[namespace]['hit'] += 1
+            chemical_keys.add(chemical_key)
+
+    return {
+        namespace: dict(hit=counter['hit'], miss=counter['miss'])
+        for namespace, counter in counts.items()
+    }, chemical_keys
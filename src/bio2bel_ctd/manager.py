@@ -2,8 +2,14 @@
 
 """Bio2BEL CTD Manager."""
 
+import hashlib
+import json
 import logging
-from typing import List, Mapping, Optional
+import multiprocessing
+import time
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
 import pyctd
 import pyctd.manager
@@ -11,7 +17,9 @@ import pyctd.manager.database
 from pyctd.manager.database import DbManager
 from pyctd.manager.query import QueryManager
 from pyctd.manager.table import get_table_configurations
+from sqlalchemy import func
 from sqlalchemy.ext.declarative import DeclarativeMeta
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
 from tqdm import tqdm
 
 import bio2bel_mesh
@@ -21,10 +29,27 @@ from bio2bel.manager.bel_manager import BELManagerMixin
 from bio2bel.manager.flask_manager import FlaskMixin
 from bio2bel.utils import get_connection
 from pybel import BELGraph
-from pybel.constants import IDENTIFIER, NAME, NAMESPACE
-from .constants import DATA_DIR, MODULE_NAME
+from pybel.struct import left_full_join
+from .bel_cache import clear_bel_cache, load_cached_graph, store_cached_graph
+from .bulk import DEFAULT_BULK_BATCH_SIZE, add_populated_dependent_tables, clear_tables, iter_batches, load_tables
+from .constants import (
+    BEL_CACHE_DIR, DATA_DIR, DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE, DEFAULT_ROW_GROUP_SIZE,
+    INTERACTION_INDEX_DIR, MODULE_NAME,
+)
+from .csr import InteractionIndex, build_interaction_index
+from .download import DEFAULT_MAX_WORKERS, DownloadReport, download_files
 from .enrichment_utils import add_chemical_gene_interaction
-from .models import Base, ChemGeneIxn, Chemical, Disease, Gene, Pathway
+from .filters import InteractionFilter
+from .indexes import create_indexes, drop_indexes
+from .incremental import get_changed_tables, get_dependent_tables, store_fingerprints
+from .lookup import (
+    ENTREZ_NAMESPACES, ChemicalLookupIndex, get_entrez_gene_ids, get_graph_identifiers, resolve_graph_chemicals,
+)
+from .models import Base, ChemGeneIxn, Chemical, Disease, Gene, Pathway, SourceFile, TableCount
+from .stats import TranslationStats
+from .subgraph_cache import (
+    DEFAULT_EDGE_BUNDLE_CACHE_BYTES, EdgeBundle, EdgeBundleCache, apply_edge_bundle, get_edge_bundle,
+)
 
 __all__ = [
     'Manager'
@@ -32,6 +57,15 @@ __all__ = [
 
 log = logging.getLogger(__name__)
 
+#: The models whose rows are counted in the summary of the database, with their keys in the summary
+SUMMARY_MODELS = [
+    ('chemicals', Chemical),
+    ('genes', Gene),
+    ('chemical_gene_interactions', ChemGeneIxn),
+    ('diseases', Disease),
+    ('pathways', Pathway),
+]
+
 
 def _get_connection_string(connection):
     return get_connection(module_name=MODULE_NAME, connection=connection)
@@ -46,6 +80,17 @@ _exclude_tables = {
 }
 
 
+def get_interaction_load_options():
+    """Get the loader options that batch-load everything needed to convert an interaction to BEL."""
+    return (
+        joinedload(ChemGeneIxn.chemical),
+        joinedload(ChemGeneIxn.gene),
+        selectinload(ChemGeneIxn.gene_forms),
+        selectinload(ChemGeneIxn.interaction_actions),
+        selectinload(ChemGeneIxn.pubmed_ids),
+    )
+
+
 class _PyCTDManager(QueryManager, DbManager):
     # Override the directory in which data gets stored
     pyctd_data_dir = DATA_DIR
@@ -58,6 +103,64 @@ def _get_urls():
     ]
 
 
+def _is_shared_database(url) -> bool:
+    """Check if other processes that connect with a database URL see the same database.
+
+    That's not the case for in-memory SQLite databases, which belong to the connection that made them.
+
+    :param sqlalchemy.engine.url.URL url: The URL of a database
+    """
+    if url.get_backend_name() != 'sqlite':
+        return True
+
+    database = url.database or ''
+    return (
+        database not in ('', ':memory:') and
+        not database.startswith('file::memory:') and
+        url.query.get('mode') != 'memory'
+    )
+
+
+def _get_id_ranges(lower: int, upper: int, number: int) -> List[Tuple[int, int]]:
+    """Split the closed interval of identifiers [lower, upper] into at most the given number of half-open ranges."""
+    step = max(1, -(-(upper - lower + 1) // number))
+    return [
+        (start, min(start + step, upper + 1))
+        for start in range(lower, upper + 1, step)
+    ]
+
+
+def _shard_to_bel(args) -> Tuple[BELGraph, int, Optional[TranslationStats]]:
+    """Build the part of the CTD BEL graph for the interactions in a range of database identifiers.
+
+    This is run in a worker process by :meth:`Manager.to_bel`, so it opens its own connection to the database.
+
+    :return: A partial BEL graph, the number of interactions that were converted, and the statistics of their
+     translation if they were asked for
+    """
+    manager_cls, connection, lower, upper, chunk_size, collect_stats, filters = args
+
+    stats = TranslationStats() if collect_stats else None
+
+    manager = manager_cls(connection=connection)
+    graph = BELGraph(name='CTD', version='1.0.0')
+
+    query = manager.session.query(ChemGeneIxn).filter(ChemGeneIxn.id >= lower, ChemGeneIxn.id < upper)
+    if filters is not None:
+        query = filters.apply(query)
+
+    count = 0
+    for chunk in manager.iter_chemical_gene_interaction_chunks(query=query, chunk_size=chunk_size):
+        for chem_gene_ixn in chunk:
+            add_chemical_gene_interaction(graph, chem_gene_ixn, stats=stats)
+        count += len(chunk)
+
+    manager.session.close()
+    manager.engine.dispose()
+
+    return graph, count, stats
+
+
 class Manager(AbstractManager, BELManagerMixin, FlaskMixin, _PyCTDManager):
     """Bio2BEL manager for the CTD."""
 
@@ -66,32 +169,122 @@ class Manager(AbstractManager, BELManagerMixin, FlaskMixin, _PyCTDManager):
     # Compensate for some weird structuring of PyCTD code
     tables = get_table_configurations()
 
+    #: The directory where the BEL graphs built by :meth:`to_bel` are cached
+    bel_cache_dir = BEL_CACHE_DIR
+
+    _chemical_lookup_index = None
+
+    #: An index used to look up the interactions of chemicals and genes instead of the database. See
+    #: :meth:`load_interaction_index`.
+    interaction_index = None  # type: Optional[InteractionIndex]
+
+    #: A cache of the BEL translations of the interactions of chemicals and genes. See :meth:`use_edge_bundle_cache`.
+    edge_bundle_cache = None  # type: Optional[EdgeBundleCache]
+
+    #: The number of seconds for which the version of the database is trusted before it's checked again. This is how
+    #: long the edge bundle cache can go without a query.
+    database_version_ttl = 60.0
+
+    _database_version = None
+    _database_version_checked = None
+
     @property
     def _base(self) -> DeclarativeMeta:
         return Base
 
     def is_populated(self) -> bool:
-        """Check if the database is already populated."""
-        return 0 < self.count_chemical_gene_interactions()
+        """Check if the database is already populated, by checking if there's any chemical-gene interaction."""
+        return self.session.query(self.session.query(ChemGeneIxn.id).exists()).scalar()
 
-    def populate(self, urls=None, force_download=False, only_tables=None, exclude_tables=None) -> None:
+    def populate(self, urls=None, force_download=False, only_tables=None, exclude_tables=None, bulk=True,
+                 batch_size=DEFAULT_BULK_BATCH_SIZE, incremental=False, max_workers=DEFAULT_MAX_WORKERS) -> None:
         """Updates the CTD database
 
         1. downloads all files from CTD
-        2. drops all tables in database
-        3. creates all tables in database
-        4. import all data from CTD files
+        2. creates all tables in database
+        3. import all data from CTD files, replacing what was there
+        4. creates the indexes in :data:`bio2bel_ctd.indexes.MANAGED_INDEXES` that are missing
+        5. stores the fingerprints of the files in :class:`bio2bel_ctd.models.SourceFile`
 
         :param iter[str] urls: An iterable of URL strings
         :param bool force_download: force method to download
+        :param bool bulk: If true, load the tables with :func:`bio2bel_ctd.bulk.load_tables`. Otherwise, use PyCTD's
+         slower import, which appends to the tables.
+        :param int batch_size: The number of rows to load at a time with the bulk loader
+        :param bool incremental: If true, only import the tables whose files changed since they were last imported and
+         the tables that depend on them. See :mod:`bio2bel_ctd.incremental`.
+        :param int max_workers: The number of files to download at the same time
         """
         if not urls:
             urls = _get_urls()
 
         log.info('downloading CTD database from %s', urls)
-        self.download_urls(urls=urls, force_download=force_download)
-        log.info('importing tables')
-        self.import_tables(only_tables=only_tables, exclude_tables=(exclude_tables or _exclude_tables))
+        self.download_urls(urls=urls, force_download=force_download, max_workers=max_workers)
+
+        exclude_tables = exclude_tables or _exclude_tables
+        available_tables = [
+            table
+            for table in self.tables
+            if table.name not in exclude_tables
+        ]
+        tables = [
+            table
+            for table in available_tables
+            if only_tables is None or table.name in only_tables
+        ]
+
+        self.create_all()
+
+        if incremental:
+            changed_tables = get_changed_tables(self.session, tables, self.pyctd_data_dir)
+            table_names = get_dependent_tables(tables, changed_tables)
+            tables = [table for table in tables if table.name in table_names]
+
+            if not tables:
+                log.info('no CTD files changed since the last import')
+                return
+
+        log.info('importing tables: %s', ', '.join(table.name for table in tables))
+        if bulk:
+            counts = load_tables(self.engine, available_tables, data_dir=self.pyctd_data_dir,
+                                 only_tables={table.name for table in tables}, batch_size=batch_size)
+            tables = [table for table in available_tables if table.name in counts]
+        else:
+            if incremental:
+                tables = add_populated_dependent_tables(self.engine, available_tables, tables)
+                clear_tables(self.engine, tables)
+            # The managed indexes are built once after the import instead of being updated with every row
+            drop_indexes(self.engine)
+            self.import_tables(only_tables={table.name for table in tables})
+
+        create_indexes(self.engine)
+
+        store_fingerprints(self.session, tables, self.pyctd_data_dir)
+        self.update_summary()
+        self._chemical_lookup_index = None
+        self.interaction_index = None
+        self._database_version = None
+        clear_bel_cache(directory=self.bel_cache_dir)
+        if self.edge_bundle_cache is not None:
+            self.edge_bundle_cache.clear()
+
+    @classmethod
+    def download_urls(cls, urls: Iterable[str], force_download: bool = False, max_workers: int = DEFAULT_MAX_WORKERS,
+                      expected_sha256s: Optional[Mapping[str, str]] = None) -> List[DownloadReport]:
+        """Download the CTD files in parallel to the data directory, resuming interrupted downloads.
+
+        :param urls: The URLs of the CTD files
+        :param force_download: If true, download the files even if they already exist
+        :param max_workers: The number of files to download at the same time
+        :param expected_sha256s: The expected SHA-256 hex digests of the files, by file name
+        """
+        return download_files(
+            urls,
+            cls.pyctd_data_dir,
+            max_workers=max_workers,
+            force_download=force_download,
+            expected_sha256s=expected_sha256s,
+        )
 
     def count_genes(self) -> int:
         """Count the genes in the database."""
@@ -113,6 +306,220 @@ class Manager(AbstractManager, BELManagerMixin, FlaskMixin, _PyCTDManager):
         """Count the chemical-gene interactions in the database."""
         return self._count_model(ChemGeneIxn)
 
+    def get_page(self, model, after: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE, options=()) -> List:
+        """Get a page of the rows of a model in the order of their database identifiers.
+
+        Pages are found by database identifier rather than with ``OFFSET``, so a deep page is as fast to get as the
+        first one.
+
+        :param model: A model, like :class:`Chemical`
+        :param after: The database identifier of the last row of the previous page. Defaults to the first page.
+        :param limit: The number of rows in the page
+        :param options: Loader options for the query, like :func:`get_interaction_load_options`
+        """
+        query = self.session.query(model)
+
+        if after is not None:
+            query = query.filter(model.id > after)
+
+        return query.options(*options).order_by(model.id).limit(limit).all()
+
+    def _get_by_values(self, model, column, values: Iterable, batch_size: int) -> Dict:
+        """Get the rows of a model whose column has one of the values, with a query for each batch of them."""
+        rv = {}
+
+        for batch in iter_batches(sorted(set(values)), batch_size):
+            for row in self.session.query(model).filter(column.in_(batch)):
+                rv[getattr(row, column.key)] = row
+
+        return rv
+
+    def get_chemicals_by_mesh(self, mesh_ids: Iterable[str],
+                              batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Chemical]:
+        """Get the chemicals that exist for many MeSH identifiers, with a query for each batch of them.
+
+        :param mesh_ids: MeSH identifiers of chemicals
+        :param batch_size: The number of MeSH identifiers to look up in each query
+        :return: The chemicals that were found, by their MeSH identifiers
+        """
+        return self._get_by_values(Chemical, Chemical.chemical_id, mesh_ids, batch_size)
+
+    def get_chemicals_by_cas(self, cas_rns: Iterable[str],
+                             batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Chemical]:
+        """Get the chemicals that exist for many CAS Registry Numbers, with a query for each batch of them.
+
+        :param cas_rns: CAS Registry Numbers
+        :param batch_size: The number of CAS Registry Numbers to look up in each query
+        :return: The chemicals that were found, by their CAS Registry Numbers
+        """
+        return self._get_by_values(Chemical, Chemical.cas_rn, cas_rns, batch_size)
+
+    def get_genes_by_entrez_id(self, entrez_ids: Iterable[str],
+                               batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[int, Gene]:
+        """Get the genes that exist for many Entrez Gene identifiers, with a query for each batch of them.
+
+        :param entrez_ids: Entrez Gene identifiers of genes. Ones that aren't numbers can't be in the CTD, so they're
+         skipped.
+        :param batch_size: The number of Entrez Gene identifiers to look up in each query
+        :return: The genes that were found, by their Entrez Gene identifiers
+        """
+        return self._get_by_values(Gene, Gene.gene_id, get_entrez_gene_ids(entrez_ids), batch_size)
+
+    def _count_interactions_by(self, column, pks: Iterable[int], batch_size: int) -> Dict[int, int]:
+        """Count the interactions for each of the values of a foreign key, with a grouped query for each batch."""
+        rv = {}
+
+        for batch in iter_batches(sorted(set(pks)), batch_size):
+            query = self.session.query(column, func.count(ChemGeneIxn.id)) \
+                .filter(column.in_(batch)) \
+                .group_by(column)
+            rv.update(query)
+
+        return rv
+
+    def count_chemical_interactions(self, chemical_pks: Iterable[int],
+                                    batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[int, int]:
+        """Count the chemical-gene interactions of many chemicals with a grouped query for each batch of them.
+
+        :param chemical_pks: The database identifiers of chemicals
+        :param batch_size: The number of chemicals to count in each query
+        :return: The number of interactions of each chemical with any, by database identifier
+        """
+        return self._count_interactions_by(ChemGeneIxn.chemical__id, chemical_pks, batch_size)
+
+    def count_gene_interactions(self, gene_pks: Iterable[int], batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[int, int]:
+        """Count the chemical-gene interactions of many genes with a grouped query for each batch of them.
+
+        :param gene_pks: The database identifiers of genes
+        :param batch_size: The number of genes to count in each query
+        :return: The number of interactions of each gene with any, by database identifier
+        """
+        return self._count_interactions_by(ChemGeneIxn.gene__id, gene_pks, batch_size)
+
+    def iter_chemical_gene_interaction_chunks(self, query: Optional[Query] = None,
+                                              chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                              session: Optional[Session] = None) -> Iterable[List[ChemGeneIxn]]:
+        """Iterate over chunks of chemical-gene interactions with all of their related entities batch-loaded.
+
+        Chunks are paged by primary key rather than with ``OFFSET``, so each one is a range scan on the primary key
+        index. The session is cleared once a chunk has been consumed, so the interactions from a chunk should not be
+        used after the next one has been requested.
+
+        :param query: A query over :class:`ChemGeneIxn` to restrict the interactions. Defaults to all interactions.
+        :param chunk_size: The number of interactions to load at a time
+        :param session: The session to load the interactions in, which is cleared after each chunk. Defaults to the
+         manager's session, so pass a dedicated one when other code might be using the manager's session meanwhile.
+        """
+        return self.iter_chunks(ChemGeneIxn, query=query, chunk_size=chunk_size, options=get_interaction_load_options(),
+                                session=session)
+
+    def iter_chunks(self, model, query: Optional[Query] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    options=(), session: Optional[Session] = None) -> Iterable[List]:
+        """Iterate over chunks of the rows of a model in the order of their database identifiers.
+
+        Chunks are paged by primary key rather than with ``OFFSET``, so each one is a range scan on the primary key
+        index. The session is cleared once a chunk has been consumed, so the rows from a chunk should not be used after
+        the next one has been requested.
+
+        :param model: A model, like :class:`Chemical`
+        :param query: A query over the model to restrict the rows. Defaults to all rows.
+        :param chunk_size: The number of rows to load at a time
+        :param options: Loader options for the query, like :func:`get_interaction_load_options`
+        :param session: The session to load the rows in, which is cleared after each chunk. Defaults to the manager's
+         session.
+        """
+        if session is None:
+            session = self.session
+
+        if query is None:
+            query = session.query(model)
+        else:
+            query = query.with_session(session)
+
+        query = query.options(*options).order_by(model.id)
+
+        last_id = None
+        while True:
+            chunk_query = query if last_id is None else query.filter(model.id > last_id)
+            chunk = chunk_query.limit(chunk_size).all()
+
+            if not chunk:
+                return
+
+            last_id = chunk[-1].id
+            yield chunk
+            session.expunge_all()
+
+    def _iter_interactions_by_chemical(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterable[ChemGeneIxn]:
+        """Iterate over the chemical-gene interactions sorted by the MeSH identifiers of their chemicals.
+
+        The interactions for each batch of chemicals are loaded with their related entities in a constant number of
+        queries. The session is cleared after each batch, so an interaction should not be used after the next one has
+        been requested.
+
+        :param batch_size: The number of chemicals whose interactions are loaded at a time
+        """
+        chemical_pks = [chemical_pk for chemical_pk, in self.session.query(Chemical.id).order_by(Chemical.chemical_id)]
+
+        for batch in iter_batches(chemical_pks, batch_size):
+            positions = {chemical_pk: position for position, chemical_pk in enumerate(batch)}
+
+            interactions = self.session.query(ChemGeneIxn) \
+                .filter(ChemGeneIxn.chemical__id.in_(batch)) \
+                .options(*get_interaction_load_options()) \
+                .all()
+            interactions.sort(key=lambda ixn: (positions[ixn.chemical__id], ixn.id))
+
+            yield from interactions
+            self.session.expunge_all()
+
+    def export_columnar(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                        row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+        """Export the chemical-gene interactions to a Parquet file for enrichment without the database.
+
+        Each row has an interaction's chemical, gene, organism, text, gene forms, interaction actions, and PubMed
+        identifiers. The rows are sorted by the MeSH identifiers of the chemicals so lookups by chemical only read the
+        row groups that can contain them. Read it with :class:`bio2bel_ctd.columnar.ColumnarBackend`.
+
+        .. note:: This needs :mod:`pyarrow`, which is installed with ``pip install bio2bel_ctd[columnar]``.
+
+        :param path: The path of the Parquet file
+        :param batch_size: The number of chemicals whose interactions are loaded from the database at a time
+        :param row_group_size: The number of interactions in each row group
+        :return: The number of interactions that were exported
+        """
+        from .columnar import write_columnar
+
+        return write_columnar(
+            self._iter_interactions_by_chemical(batch_size=batch_size),
+            path,
+            row_group_size=row_group_size,
+        )
+
+    def build_interaction_index(self, directory: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Build a memory-mapped index of the chemical-gene interactions. See :mod:`bio2bel_ctd.csr`.
+
+        :param directory: The directory where the index is saved. Defaults to :data:`INTERACTION_INDEX_DIR`.
+        :param chunk_size: The number of interactions to load from the database at a time
+        :return: The number of interactions in the index
+        """
+        interactions = (
+            ixn
+            for chunk in self.iter_chemical_gene_interaction_chunks(chunk_size=chunk_size)
+            for ixn in chunk
+        )
+        return build_interaction_index(interactions, directory or INTERACTION_INDEX_DIR)
+
+    def load_interaction_index(self, directory: Optional[str] = None) -> InteractionIndex:
+        """Use a memory-mapped interaction index in :meth:`enrich_graph_chemical` and :meth:`enrich_graph_gene`.
+
+        The index is dropped when the database is populated again, since it would be out of date.
+
+        :param directory: The directory where the index was saved. Defaults to :data:`INTERACTION_INDEX_DIR`.
+        """
+        self.interaction_index = InteractionIndex.load(directory or INTERACTION_INDEX_DIR)
+        return self.interaction_index
+
     def count_pathways(self) -> int:
         """Count the pathways in the database."""
         return self._count_model(Pathway)
@@ -121,15 +528,45 @@ class Manager(AbstractManager, BELManagerMixin, FlaskMixin, _PyCTDManager):
         """Count the diseases in the database."""
         return self._count_model(Disease)
 
-    def summarize(self) -> Mapping[str, int]:
-        """Return a summary dictionary of the database."""
-        return dict(
-            chemicals=self.count_chemicals(),
-            genes=self.count_genes(),
-            chemical_gene_interactions=self.count_chemical_gene_interactions(),
-            diseases=self.count_diseases(),
-            pathways=self.count_pathways(),
+    def summarize(self, exact: bool = False) -> Mapping[str, int]:
+        """Return a summary dictionary of the database.
+
+        :param exact: If true, count the rows of the tables instead of using the counts stored by :meth:`populate`.
+         The counts are also made if they weren't stored, like for a database populated with an older version.
+        """
+        if not exact:
+            summary = {
+                table_count.name: table_count.count
+                for table_count in self.session.query(TableCount)
+            }
+            if all(name in summary for name, _ in SUMMARY_MODELS):
+                return {name: summary[name] for name, _ in SUMMARY_MODELS}
+
+        return self._count_summary()
+
+    def _count_summary(self) -> Mapping[str, int]:
+        """Count the rows of the tables in the summary with a single query of scalar subqueries."""
+        query = self.session.query(*(
+            self.session.query(func.count(model.id)).label(name)
+            for name, model in SUMMARY_MODELS
+        ))
+        return dict(zip((name for name, _ in SUMMARY_MODELS), query.one()))
+
+    def update_summary(self) -> Mapping[str, int]:
+        """Count the rows of the tables in the summary and store the counts for :meth:`summarize`.
+
+        This is done by :meth:`populate`, so it's only needed after the tables are changed some other way.
+        """
+        summary = self._count_summary()
+
+        self.session.query(TableCount).delete()
+        self.session.add_all(
+            TableCount(name=name, count=count)
+            for name, count in summary.items()
         )
+        self.session.commit()
+
+        return summary
 
     def get_chemical_by_mesh(self, mesh_id: str) -> Optional[Chemical]:
         """Get a chemical by its MeSH identifier, if it exists.
@@ -161,90 +598,398 @@ class Manager(AbstractManager, BELManagerMixin, FlaskMixin, _PyCTDManager):
         """
         return self.session.query(ChemGeneIxn).filter(ChemGeneIxn.id == ixn_id).one_or_none()
 
-    def enrich_graph_chemical(self, graph: BELGraph, mesh_id: str) -> None:
+    def enrich_graph_chemical(self, graph: BELGraph, mesh_id: str, stats: Optional[TranslationStats] = None,
+                              filters: Optional[InteractionFilter] = None) -> None:
         """Enrich the BEL graph with chemical-gene interactions for the given chemical.
 
+        If an interaction index was loaded with :meth:`load_interaction_index`, the interactions are read from it
+        instead of the database, unless they're filtered. If the edge bundle cache is enabled with
+        :meth:`use_edge_bundle_cache`, the nodes and edges are copied from it when the chemical was already looked up
+        with the same filters.
+
         :param graph: A BEL graph
         :param mesh_id: A MeSH identifier of a chemical
+        :param stats: If given, the translation of the interactions is recorded in it. Interactions whose translations
+         are copied from the edge bundle cache aren't recorded.
+        :param filters: If given, only the interactions that meet its conditions are added
         """
+        self._enrich_graph_cached(graph, ('chemical', mesh_id), self._add_chemical_interactions, mesh_id, stats,
+                                  filters=filters)
+
+    def _add_chemical_interactions(self, graph: BELGraph, mesh_id: str, stats: Optional[TranslationStats] = None,
+                                   filters: Optional[InteractionFilter] = None) -> None:
+        if filters:
+            chemical_ids = self.session.query(Chemical.id).filter(Chemical.chemical_id == mesh_id)
+            self._add_interactions(graph, ChemGeneIxn.chemical__id.in_(chemical_ids), stats=stats, filters=filters)
+            return
+
+        if self.interaction_index is not None:
+            for ixn in self.interaction_index.iter_chemical_interactions(mesh_id):
+                add_chemical_gene_interaction(graph, ixn, stats=stats)
+            return
+
         chemical = self.get_chemical_by_mesh(mesh_id)
         if chemical is None:
             return
 
         for ixn in chemical.gene_interactions:
-            add_chemical_gene_interaction(graph, ixn)
+            add_chemical_gene_interaction(graph, ixn, stats=stats)
 
-    def enrich_graph_gene(self, graph: BELGraph, entrez_id: str) -> None:
+    def enrich_graph_gene(self, graph: BELGraph, entrez_id: str, stats: Optional[TranslationStats] = None,
+                          filters: Optional[InteractionFilter] = None) -> None:
         """Enrich the BEL graph with chemical-gene interactions for the given gene.
 
+        If an interaction index was loaded with :meth:`load_interaction_index`, the interactions are read from it
+        instead of the database, unless they're filtered. If the edge bundle cache is enabled with
+        :meth:`use_edge_bundle_cache`, the nodes and edges are copied from it when the gene was already looked up with
+        the same filters.
+
         :param graph: A BEL graph
         :param entrez_id: An Entrez Gene identifier of a gene
+        :param stats: If given, the translation of the interactions is recorded in it. Interactions whose translations
+         are copied from the edge bundle cache aren't recorded.
+        :param filters: If given, only the interactions that meet its conditions are added
         """
+        self._enrich_graph_cached(graph, ('gene', str(entrez_id)), self._add_gene_interactions, entrez_id, stats,
+                                  filters=filters)
+
+    def _add_gene_interactions(self, graph: BELGraph, entrez_id: str, stats: Optional[TranslationStats] = None,
+                               filters: Optional[InteractionFilter] = None) -> None:
+        if filters:
+            gene_ids = self.session.query(Gene.id).filter(Gene.gene_id == entrez_id)
+            self._add_interactions(graph, ChemGeneIxn.gene__id.in_(gene_ids), stats=stats, filters=filters)
+            return
+
+        if self.interaction_index is not None:
+            for ixn in self.interaction_index.iter_gene_interactions(entrez_id):
+                add_chemical_gene_interaction(graph, ixn, stats=stats)
+            return
+
         gene = self.get_gene_by_entrez_id(entrez_id)
         if gene is None:
             return
 
         for ixn in gene.chemical_interactions:
-            add_chemical_gene_interaction(graph, ixn)
+            add_chemical_gene_interaction(graph, ixn, stats=stats)
+
+    def use_edge_bundle_cache(self, max_bytes: int = DEFAULT_EDGE_BUNDLE_CACHE_BYTES) -> EdgeBundleCache:
+        """Cache the BEL of the interactions looked up by :meth:`enrich_graph_chemical` and :meth:`enrich_graph_gene`.
+
+        See :mod:`bio2bel_ctd.subgraph_cache`.
+
+        :param max_bytes: The maximum approximate number of bytes of translations to keep
+        """
+        self.edge_bundle_cache = EdgeBundleCache(max_bytes=max_bytes)
+        return self.edge_bundle_cache
 
-    def enrich_graph_genes(self, graph: BELGraph) -> None:
+    def _get_cached_database_version(self) -> str:
+        """Get the version of the database, only querying it if it wasn't checked in the last few seconds."""
+        now = time.monotonic()
+
+        if self._database_version is None or self.database_version_ttl < now - self._database_version_checked:
+            self._database_version = self.get_database_version()
+            self._database_version_checked = now
+
+        return self._database_version
+
+    def _enrich_graph_cached(self, graph: BELGraph, key, add_interactions, identifier: str,
+                             stats: Optional[TranslationStats] = None,
+                             filters: Optional[InteractionFilter] = None) -> None:
+        """Add the interactions of a chemical or gene to the graph, using the edge bundle cache if it's enabled."""
+        if self.edge_bundle_cache is None:
+            add_interactions(graph, identifier, stats=stats, filters=filters)
+            return
+
+        if filters:
+            key = key + (filters.get_key(),)
+
+        version = self._get_cached_database_version()
+
+        bundle = self.edge_bundle_cache.get(key, version=version)
+        if bundle is None:
+            subgraph = BELGraph()
+            add_interactions(subgraph, identifier, stats=stats, filters=filters)
+            bundle = get_edge_bundle(subgraph)
+            self.edge_bundle_cache.put(key, bundle, version=version)
+
+        apply_edge_bundle(graph, bundle)
+
+    def enrich_graph_genes(self, graph: BELGraph, batch_size: int = DEFAULT_BATCH_SIZE,
+                           stats: Optional[TranslationStats] = None,
+                           filters: Optional[InteractionFilter] = None) -> None:
         """Enrich the BEL graph with chemical-gene interactions for all Entrez genes.
 
+        The Entrez Gene identifiers are collected from the graph up front, then the interactions for each batch of
+        them are loaded with their related entities in a constant number of queries.
+
         :param graph: A BEL graph
+        :param batch_size: The number of Entrez Gene identifiers to look up in each query
+        :param stats: If given, the translation of the interactions is recorded in it
+        :param filters: If given, only the interactions that meet its conditions are added
         """
-        for gene_node, data in graph.nodes(data=True):
-            namespace = data.get(NAMESPACE)
-            if namespace not in {'EG', 'EGID', 'ENTREZ'}:
-                continue
+        entrez_ids = get_entrez_gene_ids(get_graph_identifiers(graph, ENTREZ_NAMESPACES))
+
+        for batch in iter_batches(entrez_ids, batch_size):
+            gene_ids = self.session.query(Gene.id).filter(Gene.gene_id.in_(batch))
+            self._add_interactions(graph, ChemGeneIxn.gene__id.in_(gene_ids), stats=stats, filters=filters)
+
+    def _add_interactions(self, graph: BELGraph, criterion, stats: Optional[TranslationStats] = None,
+                          filters: Optional[InteractionFilter] = None) -> None:
+        """Add the interactions matching the criterion to the graph, batch-loading their related entities."""
+        query = self.session.query(ChemGeneIxn) \
+            .filter(criterion) \
+            .options(*get_interaction_load_options())
 
-            identifier = data.get(IDENTIFIER)
-            name = data.get(NAME)
+        if filters is not None:
+            query = filters.apply(query)
 
-            if identifier is not None:
-                self.enrich_graph_gene(graph, identifier)
-            elif name is not None:
-                self.enrich_graph_gene(graph, name)
-            else:
-                raise KeyError
+        for ixn in query:
+            add_chemical_gene_interaction(graph, ixn, stats=stats)
 
-    def enrich_chemicals(self, graph: BELGraph) -> None:
+    def get_chemical_lookup_index(self) -> ChemicalLookupIndex:
+        """Get an index for resolving chemicals by MeSH identifier, name, and CAS Registry Number.
+
+        The index is built from the chemical table once and kept until the database is populated again.
+        """
+        if self._chemical_lookup_index is None:
+            query = self.session.query(Chemical.id, Chemical.chemical_id, Chemical.chemical_name, Chemical.cas_rn)
+            self._chemical_lookup_index = ChemicalLookupIndex.from_rows(query.yield_per(DEFAULT_CHUNK_SIZE))
+
+        return self._chemical_lookup_index
+
+    def enrich_chemicals(self, graph: BELGraph, batch_size: int = DEFAULT_BATCH_SIZE,
+                         stats: Optional[TranslationStats] = None,
+                         filters: Optional[InteractionFilter] = None) -> Mapping[str, Mapping[str, int]]:
         """Find chemicals that can be mapped and enriched with the CTD.
 
+        MeSH nodes are resolved by their identifiers or their names and CAS nodes by their CAS Registry Numbers using
+        :meth:`get_chemical_lookup_index`. Then, the interactions for each batch of chemicals are loaded with their
+        related entities in a constant number of queries.
+
         :param pybel.BELGraph graph: A BEL graph
+        :param batch_size: The number of chemicals to look up in each query
+        :param stats: If given, the translation of the interactions is recorded in it
+        :param filters: If given, only the interactions that meet its conditions are added. The hits and misses are
+         still counted over all chemicals.
+        :return: The number of nodes that were (``hit``) and weren't (``miss``) found, by namespace
         """
-        for chemical_node, data in graph.nodes(data=True):
-            namespace = data.get(NAMESPACE)
-            if namespace not in {'MESHC', 'MESH'}:
-                continue
+        counts, chemical_pks = resolve_graph_chemicals(graph, self.get_chemical_lookup_index())
 
-            identifier = data.get(IDENTIFIER)
-            name = data.get(NAME)
+        for batch in iter_batches(sorted(chemical_pks), batch_size):
+            self._add_interactions(graph, ChemGeneIxn.chemical__id.in_(batch), stats=stats, filters=filters)
 
-            if identifier is not None:
-                self.enrich_graph_chemical(graph, identifier)
-            elif name is not None:
-                self.enrich_graph_chemical(graph, name)
-            else:
-                raise KeyError
+        return counts
 
-    def to_bel(self) -> BELGraph:
+    def _get_interaction_bundles(self, column, pks: Iterable[int], bundles: Dict[int, EdgeBundle], batch_size: int,
+                                 stats: Optional[TranslationStats] = None,
+                                 filters: Optional[InteractionFilter] = None) -> Dict[int, List[int]]:
+        """Translate the interactions of chemicals or genes to edge bundles, skipping the ones already in the bundles.
+
+        :return: The database identifiers of the interactions, by the value of the column
+        """
+        ixn_ids = defaultdict(list)
+
+        for batch in iter_batches(sorted(pks), batch_size):
+            query = self.session.query(ChemGeneIxn) \
+                .filter(column.in_(batch)) \
+                .options(*get_interaction_load_options())
+
+            if filters is not None:
+                query = filters.apply(query)
+
+            for ixn in query:
+                ixn_ids[getattr(ixn, column.key)].append(ixn.id)
+
+                if ixn.id not in bundles:
+                    subgraph = BELGraph()
+                    add_chemical_gene_interaction(subgraph, ixn, stats=stats)
+                    bundles[ixn.id] = get_edge_bundle(subgraph)
+
+        return ixn_ids
+
+    def enrich_many(self, graphs: Iterable[BELGraph], batch_size: int = DEFAULT_BATCH_SIZE,
+                    stats: Optional[TranslationStats] = None,
+                    filters: Optional[InteractionFilter] = None) -> List[Mapping[str, Mapping[str, int]]]:
+        """Enrich many BEL graphs with the chemical-gene interactions of their chemicals and Entrez genes.
+
+        This adds the same nodes and edges as :meth:`enrich_chemicals` followed by :meth:`enrich_graph_genes` on each
+        graph, but the chemicals and genes of all graphs are resolved first. Then, the interactions of the distinct ones
+        are loaded and translated to BEL once and copied into each graph that references them, so the work grows with
+        the number of distinct chemicals and genes instead of the number of nodes in all graphs.
+
+        :param graphs: BEL graphs
+        :param batch_size: The number of chemicals or genes to look up in each query
+        :param stats: If given, the translation of the interactions is recorded in it. Each interaction is recorded
+         once, however many graphs it's added to.
+        :param filters: If given, only the interactions that meet its conditions are added
+        :return: The number of nodes that were (``hit``) and weren't (``miss``) found, by namespace, for each graph
+        """
+        graphs = list(graphs)
+        index = self.get_chemical_lookup_index()
+
+        counts, graph_chemical_pks, graph_entrez_ids = [], [], []
+        for graph in graphs:
+            graph_counts, chemical_pks = resolve_graph_chemicals(graph, index)
+            counts.append(graph_counts)
+            graph_chemical_pks.append(chemical_pks)
+            graph_entrez_ids.append(get_graph_identifiers(graph, ENTREZ_NAMESPACES))
+
+        genes = self.get_genes_by_entrez_id(set(chain.from_iterable(graph_entrez_ids)), batch_size=batch_size)
+        graph_gene_pks = [
+            {
+                genes[int(entrez_id)].id
+                for entrez_id in entrez_ids
+                if str(entrez_id).strip().isdigit() and int(entrez_id) in genes
+            }
+            for entrez_ids in graph_entrez_ids
+        ]
+
+        bundles = {}  # type: Dict[int, EdgeBundle]
+        chemical_ixn_ids = self._get_interaction_bundles(
+            ChemGeneIxn.chemical__id, set().union(*graph_chemical_pks), bundles, batch_size,
+            stats=stats, filters=filters,
+        )
+        gene_ixn_ids = self._get_interaction_bundles(
+            ChemGeneIxn.gene__id, set().union(*graph_gene_pks), bundles, batch_size,
+            stats=stats, filters=filters,
+        )
+        log.debug('translated %d interactions for %d graphs', len(bundles), len(graphs))
+
+        for graph, chemical_pks, gene_pks in zip(graphs, graph_chemical_pks, graph_gene_pks):
+            ixn_ids = set()
+            for chemical_pk in chemical_pks:
+                ixn_ids.update(chemical_ixn_ids.get(chemical_pk, ()))
+            for gene_pk in gene_pks:
+                ixn_ids.update(gene_ixn_ids.get(gene_pk, ()))
+
+            for ixn_id in sorted(ixn_ids):
+                apply_edge_bundle(graph, bundles[ixn_id])
+
+        return counts
+
+    def _add_interactions_serial(self, graph: BELGraph, progress: tqdm, chunk_size: int,
+                                 stats: Optional[TranslationStats] = None,
+                                 filters: Optional[InteractionFilter] = None) -> None:
+        query = None if filters is None else filters.apply(self.session.query(ChemGeneIxn))
+
+        for chunk in self.iter_chemical_gene_interaction_chunks(query=query, chunk_size=chunk_size):
+            for chem_gene_ixn in chunk:
+                add_chemical_gene_interaction(graph, chem_gene_ixn, stats=stats)
+            progress.update(len(chunk))
+
+    def _add_interactions_parallel(self, graph: BELGraph, progress: tqdm, chunk_size: int, workers: int,
+                                   stats: Optional[TranslationStats] = None,
+                                   filters: Optional[InteractionFilter] = None) -> None:
+        query = self.session.query(func.min(ChemGeneIxn.id), func.max(ChemGeneIxn.id))
+        if filters is not None:
+            query = filters.apply(query)
+
+        lower, upper = query.one()
+        if lower is None:
+            return
+
+        # Use several shards per worker so a slow range doesn't leave the other workers idle
+        id_ranges = _get_id_ranges(lower, upper, 4 * workers)
+        arguments = [
+            (type(self), self.connection, shard_lower, shard_upper, chunk_size, stats is not None, filters)
+            for shard_lower, shard_upper in id_ranges
+        ]
+
+        # Don't let the worker processes inherit the pooled connections of this one
+        self.session.close()
+        self.engine.dispose()
+
+        with multiprocessing.Pool(workers) as pool:
+            # imap yields the shards in order, so the merge is the same no matter which worker finishes first
+            for part, count, part_stats in pool.imap(_shard_to_bel, arguments):
+                left_full_join(graph, part)
+                progress.update(count)
+                if stats is not None:
+                    stats.update(part_stats)
+
+    def get_database_version(self) -> str:
+        """Get a version of the contents of the database, which changes whenever it's populated.
+
+        The version is a digest of the number of rows in the main tables and the time the last table was imported.
+        """
+        imported = self.session.query(func.max(SourceFile.imported)).scalar()
+
+        content = dict(self.summarize(), imported=(imported.isoformat() if imported is not None else None))
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def to_bel(self, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None, use_cache: bool = False,
+               stats: Optional[TranslationStats] = None, filters: Optional[InteractionFilter] = None) -> BELGraph:
         """Convert all possible aspects of the database to BEL.
 
+        Interactions are streamed from the database in chunks with
+        :meth:`iter_chemical_gene_interaction_chunks`, so memory use does not grow with the size of the CTD release.
+
+        If more than one worker is given, the interaction identifiers are split into ranges that are converted to
+        partial BEL graphs by a pool of processes, each with its own connection to the database. The parts are merged
+        in the order of their ranges, so the result has the same nodes and edges as the conversion in a single process.
+        An in-memory SQLite database can't be opened by other processes, so it's always converted in this one.
+
         .. warning:: Not complete!
 
         To do:
 
         - add namespaces
-        - use cursors
-        - multiprocessing
+
+        :param chunk_size: The number of interactions to load from the database at a time
+        :param workers: The number of processes to use. Defaults to converting in this process.
+        :param use_cache: If true, load the graph from :attr:`bel_cache_dir` if it was already built from the current
+         version of the database, and otherwise cache it there after it's built. See :mod:`bio2bel_ctd.bel_cache`.
+         Defaults to building the graph without touching the cache.
+        :param stats: If given, the translation of the interactions is recorded in it. Then, the graph is always built
+         instead of being loaded from the cache, so there's something to record.
+        :param filters: If given, only the interactions that meet its conditions are loaded and converted. The graph is
+         cached separately for each set of conditions.
         """
+        if not use_cache:
+            return self._to_bel(chunk_size=chunk_size, workers=workers, stats=stats, filters=filters)
+
+        version = self.get_database_version()
+        variant = filters.get_key() if filters else None
+
+        if stats is None:
+            graph = load_cached_graph(version, directory=self.bel_cache_dir, variant=variant)
+            if graph is not None:
+                return graph
+
+        graph = self._to_bel(chunk_size=chunk_size, workers=workers, stats=stats, filters=filters)
+        store_cached_graph(graph, version, directory=self.bel_cache_dir, variant=variant)
+
+        return graph
+
+    def _to_bel(self, chunk_size: int, workers: Optional[int], stats: Optional[TranslationStats] = None,
+                filters: Optional[InteractionFilter] = None) -> BELGraph:
         graph = BELGraph(name='CTD', version='1.0.0')
 
         mesh_manager = bio2bel_mesh.Manager(engine=self.engine, session=self.session)
         mesh_manager.add_namespace_to_graph(graph)
 
-        for chem_gene_ixn in tqdm(self.list_chemical_gene_interactions(),
-                                  total=self.count_chemical_gene_interactions()):
-            add_chemical_gene_interaction(graph, chem_gene_ixn)
+        if filters:
+            total = filters.apply(self.session.query(func.count(ChemGeneIxn.id))).scalar()
+        else:
+            total = self.count_chemical_gene_interactions()
+
+        progress = tqdm(total=total, unit='ixn', unit_scale=True)
+        if workers is not None and 1 < workers and not _is_shared_database(self.engine.url):
+            log.warning('converting in this process since worker processes can not open the in-memory database')
+            workers = None
+
+        if workers is not None and 1 < workers:
+            self._add_interactions_parallel(graph, progress, chunk_size=chunk_size, workers=workers, stats=stats,
+                                            filters=filters)
+        else:
+            self._add_interactions_serial(graph, progress, chunk_size=chunk_size, stats=stats, filters=filters)
+        progress.close()
 
         return graph
+
+    def clear_bel_cache(self) -> int:
+        """Remove the BEL graphs cached by :meth:`to_bel`.
+
+        :return: The number of cached graphs that were removed
+        """
+        return clear_bel_cache(directory=self.bel_cache_dir)
@@ -1,13 +1,55 @@
 # -*- coding: utf-8 -*-
 
-from pyctd.manager.models import Action, Base, ChemGeneIxn, Chemical, Disease, Gene, Pathway
+from datetime import datetime
+
+from pyctd.manager.models import (
+    Action, Base, ChemGeneIxn, ChemGeneIxnGeneForm, ChemGeneIxnInteractionAction, ChemGeneIxnPubmed, Chemical, Disease,
+    Gene, Pathway,
+)
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, String
 
 __all__ = [
     'Action',
     'Base',
     'Chemical',
     'ChemGeneIxn',
+    'ChemGeneIxnGeneForm',
+    'ChemGeneIxnInteractionAction',
+    'ChemGeneIxnPubmed',
     'Disease',
     'Gene',
     'Pathway',
+    'SourceFile',
+    'TableCount',
 ]
+
+
+class SourceFile(Base):
+    """The fingerprint of the CTD file a table was last imported from."""
+
+    __tablename__ = 'bio2bel_ctd_source_file'
+    id = Column(Integer, primary_key=True)
+
+    table_name = Column(String(255), nullable=False, unique=True, index=True)  #: name of the table without prefix
+    file_name = Column(String(255), nullable=False)
+    size = Column(BigInteger, nullable=False)  #: size of the file in bytes
+    mtime = Column(Float, nullable=False)  #: modification time of the file
+    sha256 = Column(String(64), nullable=False)  #: SHA-256 hex digest of the file's contents
+    imported = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return '{} ({})'.format(self.table_name, self.file_name)
+
+
+class TableCount(Base):
+    """The number of rows in a table, stored after it's populated so summaries don't need to count them again."""
+
+    __tablename__ = 'bio2bel_ctd_table_count'
+    id = Column(Integer, primary_key=True)
+
+    name = Column(String(255), nullable=False, unique=True, index=True)  #: key in the summary, like ``chemicals``
+    count = Column(BigInteger, nullable=False)
+    updated = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return '{}: {}'.format(self.name, self.count)
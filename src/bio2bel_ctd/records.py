@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""Lightweight stand-ins for chemical-gene interactions that aren't backed by the database.
+
+The functions in :mod:`bio2bel_ctd.enrichment_utils` only read a handful of attributes from a
+:class:`pyctd.manager.models.ChemGeneIxn` and its related entities. These named tuples have the same attributes, so
+interactions read from somewhere other than the database, like a columnar snapshot, can be added to BEL graphs with
+the same handlers.
+"""
+
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+__all__ = [
+    'ChemicalRecord',
+    'GeneRecord',
+    'GeneFormRecord',
+    'InteractionActionRecord',
+    'PubmedRecord',
+    'InteractionRecord',
+    'make_interaction_record',
+]
+
+ChemicalRecord = NamedTuple('ChemicalRecord', [
+    ('chemical_id', str),
+    ('chemical_name', str),
+])
+
+GeneRecord = NamedTuple('GeneRecord', [
+    ('gene_id', int),
+    ('gene_symbol', str),
+])
+
+GeneFormRecord = NamedTuple('GeneFormRecord', [
+    ('gene_form', str),
+])
+
+InteractionActionRecord = NamedTuple('InteractionActionRecord', [
+    ('interaction_action', str),
+])
+
+PubmedRecord = NamedTuple('PubmedRecord', [
+    ('pubmed_id', int),
+])
+
+InteractionRecord = NamedTuple('InteractionRecord', [
+    ('id', int),
+    ('interaction', str),
+    ('organism_id', Optional[int]),
+    ('chemical', ChemicalRecord),
+    ('gene', GeneRecord),
+    ('gene_forms', Sequence[GeneFormRecord]),
+    ('interaction_actions', Sequence[InteractionActionRecord]),
+    ('pubmed_ids', Sequence[PubmedRecord]),
+])
+
+
+def make_interaction_record(ixn_id: int, interaction: str, organism_id: Optional[int], chemical_id: str,
+                            chemical_name: str, gene_id: int, gene_symbol: str, gene_forms: Iterable[str],
+                            interaction_actions: Iterable[str], pubmed_ids: Iterable[int]) -> InteractionRecord:
+    """Build an interaction record from flat values, like a row of a columnar snapshot.
+
+    :param ixn_id: The database identifier of the interaction
+    :param interaction: The text of the interaction, which is used as its evidence
+    :param organism_id: The NCBI Taxonomy identifier of the organism in which the interaction was observed
+    :param chemical_id: The MeSH identifier of the chemical
+    :param chemical_name: The name of the chemical
+    :param gene_id: The Entrez Gene identifier of the gene
+    :param gene_symbol: The symbol of the gene
+    :param gene_forms: The gene forms of the interaction, like ``protein``
+    :param interaction_actions: The interaction actions of the interaction, like ``increases^expression``
+    :param pubmed_ids: The PubMed identifiers of the articles supporting the interaction
+    """
+    return InteractionRecord(
+        id=ixn_id,
+        interaction=interaction,
+        organism_id=organism_id,
+        chemical=ChemicalRecord(chemical_id, chemical_name),
+        gene=GeneRecord(gene_id, gene_symbol),
+        gene_forms=[GeneFormRecord(gene_form) for gene_form in gene_forms],
+        interaction_actions=[InteractionActionRecord(action) for action in interaction_actions],
+        pubmed_ids=[PubmedRecord(pubmed_id) for pubmed_id in pubmed_ids],
+    )
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""A process-wide registry of managers, so repeated calls with the same connection string share one engine.
+
+Building a :class:`bio2bel_ctd.Manager` from a connection string creates a new engine with its own connection pool.
+:func:`get_manager` builds one manager for each connection string and returns it again on later calls, so functions
+like :func:`bio2bel_ctd.enrich_chemicals` can be called many times without reconnecting.
+
+- The managers' sessions are scoped to threads, so each thread that uses a manager gets its own session.
+- Connection pools can't be shared with forked processes, so a process that was forked from one that used the registry
+  starts with an empty registry and builds its own engines.
+- :func:`dispose_managers` closes the sessions and connection pools of all managers, like when a worker shuts down.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from bio2bel.utils import get_connection
+from .constants import MODULE_NAME
+from .manager import Manager
+
+__all__ = [
+    'configure_pool',
+    'get_manager',
+    'dispose_managers',
+]
+
+log = logging.getLogger(__name__)
+
+#: The keyword arguments for :func:`sqlalchemy.create_engine` that size the connection pools of new engines
+_pool_options = dict(
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+)  # type: Dict[str, Any]
+
+_lock = threading.Lock()
+_managers = {}  # type: Dict[str, Manager]
+_pid = os.getpid()
+
+#: Managers inherited from a parent process. They're kept referenced so their connections, which are shared with the
+#: parent, aren't closed from this process when they're garbage collected.
+_inherited = []  # type: List[Manager]
+
+
+def configure_pool(pool_size: Optional[int] = None, max_overflow: Optional[int] = None,
+                   pool_recycle: Optional[int] = None, pool_pre_ping: Optional[bool] = None) -> None:
+    """Configure the connection pools of the engines that the registry builds from now on.
+
+    :param pool_size: The number of connections kept open in each pool
+    :param max_overflow: The number of connections that can be opened beyond the pool size at busy times
+    :param pool_recycle: The number of seconds after which connections are replaced, for databases that drop idle
+     connections
+    :param pool_pre_ping: If true, check connections are alive before using them
+    """
+    for key, value in (('pool_size', pool_size), ('max_overflow', max_overflow), ('pool_recycle', pool_recycle),
+                       ('pool_pre_ping', pool_pre_ping)):
+        if value is not None:
+            _pool_options[key] = value
+
+
+def _forget_inherited_managers() -> None:
+    """Start over with an empty registry in a forked process, without touching the parent's connections."""
+    global _pid
+
+    _pid = os.getpid()
+
+    for manager in _managers.values():
+        try:
+            manager.engine.dispose(close=False)
+        except TypeError:  # SQLAlchemy before 1.4.33 can't dispose without closing, so keep the pool around instead
+            pass
+        _inherited.append(manager)
+
+    _managers.clear()
+
+
+def _after_fork_in_child() -> None:
+    global _lock
+
+    # Another thread might have held the lock when the process was forked, and it doesn't exist in the child
+    _lock = threading.Lock()
+    _forget_inherited_managers()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _build_manager(connection: str) -> Manager:
+    """Build a manager with a pooled engine and thread-scoped sessions."""
+    options = dict(_pool_options)
+
+    # SQLite doesn't use a queue pool, so it doesn't take its sizes
+    if make_url(connection).get_backend_name() == 'sqlite':
+        options.pop('pool_size', None)
+        options.pop('max_overflow', None)
+
+    engine = create_engine(connection, **options)
+    session = scoped_session(sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+
+    return Manager(engine=engine, session=session)
+
+
+def get_manager(connection: Optional[str] = None) -> Manager:
+    """Get the manager for a connection string, building it if this process doesn't have one yet.
+
+    :param connection: A connection string. Defaults to the one from the Bio2BEL configuration.
+    """
+    connection = get_connection(module_name=MODULE_NAME, connection=connection)
+
+    with _lock:
+        if _pid != os.getpid():  # for platforms that can't run a function after forking
+            _forget_inherited_managers()
+
+        manager = _managers.get(connection)
+        if manager is None:
+            log.debug('building a manager for a %s database', make_url(connection).get_backend_name())
+            manager = _managers[connection] = _build_manager(connection)
+
+    return manager
+
+
+def dispose_managers() -> None:
+    """Close the sessions and connection pools of all managers in the registry and empty it."""
+    with _lock:
+        for manager in _managers.values():
+            manager.session.remove()
+            manager.engine.dispose()
+
+        _managers.clear()
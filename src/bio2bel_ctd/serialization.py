@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""Convert chemicals, genes, and chemical-gene interactions to JSON-serializable dictionaries.
+
+These are shared by the JSON API in :mod:`bio2bel_ctd.web` and the exports of the command line interface, so a row
+looks the same wherever it comes from.
+"""
+
+from typing import Any, Mapping, Optional
+
+__all__ = [
+    'chemical_to_json',
+    'gene_to_json',
+    'interaction_to_json',
+]
+
+
+def chemical_to_json(chemical) -> Mapping[str, Any]:
+    """Convert a chemical to a dictionary.
+
+    :param pyctd.manager.models.Chemical chemical: A chemical
+    """
+    return dict(
+        id=chemical.id,
+        mesh_id=chemical.chemical_id,
+        name=chemical.chemical_name,
+        cas_rn=chemical.cas_rn,
+    )
+
+
+def gene_to_json(gene) -> Mapping[str, Any]:
+    """Convert a gene to a dictionary.
+
+    :param pyctd.manager.models.Gene gene: A gene
+    """
+    return dict(
+        id=gene.id,
+        entrez_id=gene.gene_id,
+        symbol=gene.gene_symbol,
+        name=gene.gene_name,
+    )
+
+
+def _get_optional(entity, attribute: str) -> Optional[Any]:
+    return None if entity is None else getattr(entity, attribute)
+
+
+def interaction_to_json(ixn) -> Mapping[str, Any]:
+    """Convert a chemical-gene interaction to a dictionary.
+
+    The interaction should have its related entities loaded, like with
+    :func:`bio2bel_ctd.manager.get_interaction_load_options`, so this doesn't make more queries.
+
+    :param pyctd.manager.models.ChemGeneIxn ixn: A chemical-gene interaction
+    """
+    return dict(
+        id=ixn.id,
+        chemical_mesh_id=_get_optional(ixn.chemical, 'chemical_id'),
+        chemical_name=_get_optional(ixn.chemical, 'chemical_name'),
+        gene_entrez_id=_get_optional(ixn.gene, 'gene_id'),
+        gene_symbol=_get_optional(ixn.gene, 'gene_symbol'),
+        organism_id=ixn.organism_id,
+        interaction=ixn.interaction,
+        interaction_actions=[action.interaction_action for action in ixn.interaction_actions],
+        gene_forms=[gene_form.gene_form for gene_form in ixn.gene_forms],
+        pubmed_ids=[pubmed.pubmed_id for pubmed in ixn.pubmed_ids],
+    )
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Opt-in statistics about the translation of chemical-gene interactions to BEL.
+
+Pass a :class:`TranslationStats` as the ``stats`` argument of :meth:`bio2bel_ctd.Manager.to_bel` or of the enrichment
+functions to count, for each interaction handler, how often it was called, how many edges it added, and how long it
+took, as well as how many interactions of each signature couldn't be translated.
+"""
+
+import json
+from collections import Counter, defaultdict
+from typing import Any, Dict, Mapping, Tuple
+
+__all__ = [
+    'TranslationStats',
+]
+
+
+def _format_signature(signature: Tuple[Tuple[str, ...], Tuple[str, ...]]) -> str:
+    interaction_actions, gene_forms = signature
+    return '{} [{}]'.format('|'.join(interaction_actions), '|'.join(gene_forms))
+
+
+class TranslationStats:
+    """Counts calls, edges, and time for each interaction handler and the interactions that weren't translated."""
+
+    def __init__(self):
+        self.calls = Counter()  # type: Counter
+        self.edges = Counter()  # type: Counter
+        self.seconds = defaultdict(float)  # type: Dict[str, float]
+        self.unmapped = Counter()  # type: Counter
+
+    def add_call(self, handler_name: str, edges: int, seconds: float) -> None:
+        """Record a call of an interaction handler.
+
+        :param handler_name: The name of the handler, like ``add_ixn_increases_expression``
+        :param edges: The number of edges the handler added
+        :param seconds: The time the handler took
+        """
+        self.calls[handler_name] += 1
+        self.edges[handler_name] += edges
+        self.seconds[handler_name] += seconds
+
+    def add_unmapped(self, signature: Tuple[Tuple[str, ...], Tuple[str, ...]]) -> None:
+        """Record an interaction that had no handler.
+
+        :param signature: The interaction actions and gene forms of the interaction
+        """
+        self.unmapped[signature] += 1
+
+    def update(self, other: 'TranslationStats') -> None:
+        """Add the counts of other statistics to these, like ones collected in another process."""
+        self.calls.update(other.calls)
+        self.edges.update(other.edges)
+        for handler_name, seconds in other.seconds.items():
+            self.seconds[handler_name] += seconds
+        self.unmapped.update(other.unmapped)
+
+    def to_dict(self) -> Mapping[str, Any]:
+        """Summarize the statistics, with the handlers sorted by time and the unmapped signatures by count."""
+        return dict(
+            handlers=[
+                dict(
+                    handler=handler_name,
+                    calls=self.calls[handler_name],
+                    edges=self.edges[handler_name],
+                    seconds=self.seconds[handler_name],
+                )
+                for handler_name in sorted(self.calls, key=self.seconds.__getitem__, reverse=True)
+            ],
+            unmapped=[
+                dict(
+                    signature=_format_signature(signature),
+                    interaction_actions=list(signature[0]),
+                    gene_forms=list(signature[1]),
+                    count=count,
+                )
+                for signature, count in self.unmapped.most_common()
+            ],
+            translated=sum(self.calls.values()),
+            untranslated=sum(self.unmapped.values()),
+        )
+
+    def to_json(self, **kwargs) -> str:
+        """Summarize the statistics as JSON.
+
+        :param kwargs: Keyword arguments to pass to :func:`json.dumps`, like ``indent``
+        """
+        return json.dumps(self.to_dict(), **kwargs)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""A bounded cache of the BEL translations of the interactions of chemicals and genes.
+
+Enriching a graph with a chemical or a gene normally means querying its interactions and translating each of them to
+BEL again. With this cache, the nodes and edges that the interactions add are captured once in an :class:`EdgeBundle`
+and copied into the graphs that are enriched with the same chemical or gene later, without touching the database.
+
+The cache is bounded by the approximate number of bytes its bundles take up, which is estimated from the size of
+their pickles, and evicts the least recently used bundles first. It's keyed on the version of the database, so it
+starts over when the database changes.
+"""
+
+import copy
+import logging
+import pickle
+from collections import OrderedDict
+from typing import Any, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+
+from pybel import BELGraph
+
+__all__ = [
+    'EdgeBundle',
+    'get_edge_bundle',
+    'apply_edge_bundle',
+    'EdgeBundleCache',
+]
+
+log = logging.getLogger(__name__)
+
+#: The default maximum number of bytes of edge bundles kept in a cache
+DEFAULT_EDGE_BUNDLE_CACHE_BYTES = 2 ** 28
+
+EdgeBundle = NamedTuple('EdgeBundle', [
+    ('nodes', List[Tuple[Any, Mapping]]),
+    ('edges', List[Tuple[Any, Any, Any, Mapping]]),
+])
+
+
+def get_edge_bundle(graph: BELGraph) -> EdgeBundle:
+    """Capture the nodes and edges of a graph.
+
+    :param graph: A BEL graph, usually one to which only the interactions of a single chemical or gene were added
+    """
+    return EdgeBundle(
+        nodes=list(graph.nodes(data=True)),
+        edges=list(graph.edges(keys=True, data=True)),
+    )
+
+
+def apply_edge_bundle(graph: BELGraph, bundle: EdgeBundle) -> None:
+    """Add the nodes and edges of a bundle to a graph.
+
+    The data of the nodes and edges are copied, so the graph can be modified without changing the bundle.
+
+    :param graph: A BEL graph
+    :param bundle: The nodes and edges to add
+    """
+    graph.add_nodes_from(
+        (node, copy.deepcopy(data))
+        for node, data in bundle.nodes
+    )
+    graph.add_edges_from(
+        (u, v, key, copy.deepcopy(data))
+        for u, v, key, data in bundle.edges
+    )
+
+
+class EdgeBundleCache:
+    """A least-recently-used cache of edge bundles with a bound on their total size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_EDGE_BUNDLE_CACHE_BYTES):
+        """
+        :param max_bytes: The maximum approximate number of bytes of the bundles in the cache
+        """
+        self.max_bytes = max_bytes
+        self.version = None
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._bundles = OrderedDict()  # type: OrderedDict
+
+    def __len__(self) -> int:
+        return len(self._bundles)
+
+    def _check_version(self, version: Optional[str]) -> None:
+        if version != self.version:
+            if self._bundles:
+                log.info('database version changed from %s to %s. clearing edge bundle cache', self.version, version)
+            self.clear()
+            self.version = version
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Optional[EdgeBundle]:
+        """Get the bundle for a key, if it's cached for the given version of the database.
+
+        :param key: The key of the bundle, like ``('chemical', 'D004052')``
+        :param version: The version of the database. If it differs from the version of the cached bundles, they're
+         all dropped.
+        """
+        self._check_version(version)
+
+        entry = self._bundles.get(key)
+        if entry is None:
+            self.misses += 1
+            return
+
+        self._bundles.move_to_end(key)
+        self.hits += 1
+        bundle, _ = entry
+        return bundle
+
+    def put(self, key: Hashable, bundle: EdgeBundle, version: Optional[str] = None) -> None:
+        """Cache the bundle for a key, evicting the least recently used bundles if the cache is too big.
+
+        Bundles that are bigger than the whole cache aren't kept.
+
+        :param key: The key of the bundle
+        :param bundle: The nodes and edges to cache
+        :param version: The version of the database from which the bundle was built
+        """
+        self._check_version(version)
+
+        size = len(pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            log.debug('not caching edge bundle for %s since its %d bytes are more than the cache', key, size)
+            return
+
+        self._discard(key)
+        self._bundles[key] = bundle, size
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._bundles.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._bundles.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        """Remove all bundles from the cache."""
+        self._bundles.clear()
+        self.size = 0
+
+    def get_info(self) -> Mapping[str, float]:
+        """Get the hits, misses, evictions, number of bundles, size, maximum size, and hit rate of the cache."""
+        lookups = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            bundles=len(self._bundles),
+            bytes=self.size,
+            max_bytes=self.max_bytes,
+            hit_rate=(self.hits / lookups if lookups else 0.0),
+        )
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for Bio2BEL CTD."""
+
+import hashlib
+
+__all__ = [
+    'get_sha256',
+]
+
+
+def get_sha256(path: str, block_size: int = 2 ** 20) -> str:
+    """Get the SHA-256 hex digest of a file, reading it in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
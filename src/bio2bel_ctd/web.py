@@ -6,14 +6,33 @@ use the web extra like:
 .. source-code:: sh
 
     pip install bio2bel_ctd[web]
+
+Besides the admin interface, the application has a JSON API under ``/api``:
+
+- ``GET /api/chemical``, ``GET /api/gene``, and ``GET /api/interaction`` list the rows in pages of ``?limit=`` rows.
+  The next page is requested with ``?after=`` and the ``next`` value of the previous page, so deep pages are as fast
+  as the first one.
+- ``GET /api/chemical/<mesh_id>``, ``GET /api/gene/<entrez_id>``, and ``GET /api/interaction/<id>`` get single rows.
+- ``POST /api/lookup`` looks up many chemicals and genes at once from a JSON body like
+  ``{"chemicals": ["D004052"], "genes": ["368"]}``.
+- ``GET /api/chemical/<mesh_id>/interactions`` and ``GET /api/gene/<entrez_id>/interactions`` stream all interactions
+  of a chemical or gene as newline-delimited JSON, loading them from the database in chunks.
 """
 
+import json
+
 import flask_admin
-from flask import Flask
+from flask import Blueprint, Flask, Response, abort, jsonify, request, stream_with_context
 from flask_admin.contrib.sqla import ModelView
+from sqlalchemy.orm import Session
 
-from bio2bel_ctd.manager import Manager
+from bio2bel_ctd.constants import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE
+from bio2bel_ctd.manager import Manager, get_interaction_load_options
 from bio2bel_ctd.models import *
+from bio2bel_ctd.serialization import chemical_to_json, gene_to_json, interaction_to_json
+
+#: The maximum number of rows in a page of the JSON API
+MAX_PAGE_SIZE = 1000
 
 
 def add_admin(app, session, **kwargs):
@@ -35,6 +54,128 @@ def add_admin(app, session, **kwargs):
     return admin
 
 
+def _get_page(manager, model, to_json, options=()):
+    """Get a page of rows as a JSON response, using the ``after`` and ``limit`` query parameters."""
+    after = request.args.get('after', type=int)
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+    rows = manager.get_page(model, after=after, limit=limit, options=options)
+
+    return jsonify(
+        results=[to_json(row) for row in rows],
+        next=(rows[-1].id if len(rows) == limit else None),
+    )
+
+
+def _stream_interactions(manager, query):
+    """Stream the interactions from a query as newline-delimited JSON, loading them in chunks.
+
+    The chunks are loaded in a dedicated session, since the session is cleared after each chunk and the manager's
+    session is shared with the other requests.
+    """
+    chunk_size = request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+
+    def generate():
+        session = Session(bind=manager.engine)
+        try:
+            chunks = manager.iter_chemical_gene_interaction_chunks(query=query, chunk_size=chunk_size, session=session)
+            for chunk in chunks:
+                for ixn in chunk:
+                    yield json.dumps(interaction_to_json(ixn)) + '\n'
+        finally:
+            session.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def get_api_blueprint(manager):
+    """Build a blueprint with the JSON API
+
+    :param bio2bel_ctd.Manager manager: A manager
+    :rtype: flask.Blueprint
+    """
+    api = Blueprint('api', __name__)
+
+    @api.route('/chemical')
+    def list_chemicals():
+        return _get_page(manager, Chemical, chemical_to_json)
+
+    @api.route('/chemical/<mesh_id>')
+    def get_chemical(mesh_id):
+        chemical = manager.get_chemical_by_mesh(mesh_id)
+        if chemical is None:
+            abort(404)
+        return jsonify(chemical_to_json(chemical))
+
+    @api.route('/chemical/<mesh_id>/interactions')
+    def stream_chemical_interactions(mesh_id):
+        chemical = manager.get_chemical_by_mesh(mesh_id)
+        if chemical is None:
+            abort(404)
+        query = manager.session.query(ChemGeneIxn).filter(ChemGeneIxn.chemical__id == chemical.id)
+        return _stream_interactions(manager, query)
+
+    @api.route('/gene')
+    def list_genes():
+        return _get_page(manager, Gene, gene_to_json)
+
+    @api.route('/gene/<int:entrez_id>')
+    def get_gene(entrez_id):
+        gene = manager.get_gene_by_entrez_id(entrez_id)
+        if gene is None:
+            abort(404)
+        return jsonify(gene_to_json(gene))
+
+    @api.route('/gene/<int:entrez_id>/interactions')
+    def stream_gene_interactions(entrez_id):
+        gene = manager.get_gene_by_entrez_id(entrez_id)
+        if gene is None:
+            abort(404)
+        query = manager.session.query(ChemGeneIxn).filter(ChemGeneIxn.gene__id == gene.id)
+        return _stream_interactions(manager, query)
+
+    @api.route('/interaction')
+    def list_interactions():
+        return _get_page(manager, ChemGeneIxn, interaction_to_json, options=get_interaction_load_options())
+
+    @api.route('/interaction/<int:ixn_id>')
+    def get_interaction(ixn_id):
+        ixn = manager.get_interaction_by_id(ixn_id)
+        if ixn is None:
+            abort(404)
+        return jsonify(interaction_to_json(ixn))
+
+    @api.route('/lookup', methods=['POST'])
+    def lookup():
+        """Look up chemicals by MeSH identifiers and genes by Entrez Gene identifiers, giving null for missing ones"""
+        data = request.get_json(force=True, silent=True)
+        if not isinstance(data, dict):
+            abort(400)
+
+        mesh_ids = [str(mesh_id) for mesh_id in data.get('chemicals', [])]
+        entrez_ids = [str(entrez_id) for entrez_id in data.get('genes', [])]
+
+        chemicals = manager.get_chemicals_by_mesh(mesh_ids)
+        genes = manager.get_genes_by_entrez_id(entrez_ids)
+
+        return jsonify(
+            chemicals={
+                mesh_id: (chemical_to_json(chemicals[mesh_id]) if mesh_id in chemicals else None)
+                for mesh_id in mesh_ids
+            },
+            genes={
+                entrez_id: (
+                    gene_to_json(genes[int(entrez_id)])
+                    if entrez_id.strip().isdigit() and int(entrez_id) in genes else
+                    None
+                )
+                for entrez_id in entrez_ids
+            },
+        )
+
+    return api
+
+
 def get_app(connection=None, url=None):
     """Creates a Flask application
 
@@ -45,6 +186,7 @@ def get_app(connection=None, url=None):
     app = Flask(__name__)
     manager = Manager.ensure(connection=connection)
     add_admin(app, manager.session, url=url)
+    app.register_blueprint(get_api_blueprint(manager), url_prefix='/api')
     return app
 
 
@@ -2,9 +2,16 @@
 
 import logging
 import os
+import shutil
+import tempfile
+from collections import namedtuple
+from unittest import mock
 
 from bio2bel.testing import AbstractTemporaryCacheClassMixin
 from bio2bel_ctd import Manager
+from bio2bel_ctd.enrichment_utils import INTERACTION_HANDLERS, get_dsl_chemical
+from pybel.constants import DECREASES
+from pybel.dsl import rna
 
 log = logging.getLogger(__name__)
 
@@ -38,9 +45,96 @@ class _TestManager(Manager):
 class TemporaryCacheClassMixin(AbstractTemporaryCacheClassMixin):
     Manager = _TestManager
 
+    @classmethod
+    def setUpClass(cls):
+        # The manager is made and populated by the superclass, so the BEL cache directory is patched on its class. The
+        # class itself is kept, so managers can still be pickled to send them to worker processes.
+        cls.bel_cache_dir = tempfile.mkdtemp()
+        cls._bel_cache_dir_patcher = mock.patch.object(cls.Manager, 'bel_cache_dir', cls.bel_cache_dir)
+        cls._bel_cache_dir_patcher.start()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._bel_cache_dir_patcher.stop()
+        shutil.rmtree(cls.bel_cache_dir, ignore_errors=True)
+
 
 class PopulatedDatabaseMixin(TemporaryCacheClassMixin):
 
     @classmethod
     def populate(cls):
         cls.manager.populate(urls=_urls, only_tables=_only_tables)
+
+
+class LegacyPopulatedDatabaseMixin(TemporaryCacheClassMixin):
+    """Populates the database with PyCTD's import instead of the bulk loader."""
+
+    @classmethod
+    def populate(cls):
+        cls.manager.populate(urls=_urls, only_tables=_only_tables, bulk=False)
+
+
+#: The signatures of the interactions in the test data, whose placeholder interaction actions and gene forms don't have
+#: handlers
+FIXTURE_SIGNATURES = [
+    (('InteractionActions{}'.format(ixn_id),), ('GeneForm{}_1'.format(gene_id), 'GeneForm{}_2'.format(gene_id)))
+    for ixn_id, gene_id in [(1, 1), (2, 2), (3, 3), (4, 1), (5, 2), (6, 3)]
+]
+
+
+def add_fixture_interaction(graph, ixn):
+    """Add an interaction from the test data as if it decreased the expression of the gene's mRNA."""
+    gene = ixn.gene
+    return {
+        graph.add_qualified_edge(
+            get_dsl_chemical(ixn),
+            rna(namespace='ncbigene', name=str(gene.gene_symbol), identifier=str(gene.gene_id)),
+            DECREASES,
+            evidence=ixn.interaction,
+            citation=str(reference.pubmed_id),
+            annotations={
+                'Species': str(ixn.organism_id),
+            }
+        )
+        for reference in ixn.pubmed_ids
+    }
+
+
+class MappedInteractionsMixin:
+    """Registers :func:`add_fixture_interaction` for the interactions in the test data, so they're translated to BEL.
+
+    Put it before the database mixin in the bases of a test case.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for signature in FIXTURE_SIGNATURES:
+            INTERACTION_HANDLERS[signature] = add_fixture_interaction
+
+    def tearDown(self):
+        for signature in FIXTURE_SIGNATURES:
+            INTERACTION_HANDLERS.pop(signature, None)
+        super().tearDown()
+
+
+MockInteraction = namedtuple('MockInteraction', [
+    'id', 'interaction', 'interaction_actions', 'gene_forms', 'chemical', 'gene',
+])
+MockAction = namedtuple('MockAction', ['interaction_action'])
+MockGeneForm = namedtuple('MockGeneForm', ['gene_form'])
+MockChemical = namedtuple('MockChemical', ['chemical_id', 'chemical_name'])
+MockGene = namedtuple('MockGene', ['gene_id', 'gene_symbol'])
+
+
+def make_interaction(interaction_actions, gene_forms, chemical=None, gene=None):
+    """Make a stand-in for a chemical-gene interaction with the given interaction actions and gene forms."""
+    return MockInteraction(
+        id=1,
+        interaction='',
+        interaction_actions=[MockAction(interaction_action) for interaction_action in interaction_actions],
+        gene_forms=[MockGeneForm(gene_form) for gene_form in gene_forms],
+        chemical=chemical,
+        gene=gene,
+    )
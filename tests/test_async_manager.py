@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""Test the asyncio manager gives the same lookups and graph edits as the manager."""
+
+import asyncio
+import unittest
+
+from pybel import BELGraph
+from pybel.dsl import abundance, rna
+from tests.constants import MappedInteractionsMixin, PopulatedDatabaseMixin
+
+try:
+    import aiosqlite  # noqa: F401
+    from bio2bel_ctd.async_manager import AsyncManager
+except ImportError:
+    AsyncManager = None
+
+
+def _get_edges(graph):
+    return set(graph.edges(keys=True))
+
+
+@unittest.skipIf(AsyncManager is None, 'SQLAlchemy 1.4 or aiosqlite is not installed')
+class TestAsyncManager(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Test the asyncio manager against aiosqlite."""
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.async_manager = AsyncManager.from_manager(self.manager)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.async_manager.dispose())
+        self.loop.close()
+        super().tearDown()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_lookups(self):
+        self.assertTrue(self.run_async(self.async_manager.is_populated()))
+
+        chemical = self.run_async(self.async_manager.get_chemical_by_mesh('ChemicalID2'))
+        self.assertIsNotNone(chemical)
+        self.assertEqual('ChemicalName2', chemical.chemical_name)
+        self.assertIsNone(self.run_async(self.async_manager.get_chemical_by_mesh('missing')))
+
+        gene = self.run_async(self.async_manager.get_gene_by_entrez_id(3))
+        self.assertEqual('GeneSymbol3', gene.gene_symbol)
+        self.assertEqual(gene.id, self.run_async(self.async_manager.get_gene_by_entrez_id('3')).id)
+        self.assertIsNone(self.run_async(self.async_manager.get_gene_by_entrez_id('GeneSymbol3')))
+
+        ixn = self.run_async(self.async_manager.get_interaction_by_id(6))
+        self.assertEqual({11, 12}, {reference.pubmed_id for reference in ixn.pubmed_ids})
+
+    def test_enrich_graph_chemical(self):
+        graph, async_graph = BELGraph(), BELGraph()
+        self.manager.enrich_graph_chemical(graph, 'ChemicalID2')
+        self.run_async(self.async_manager.enrich_graph_chemical(async_graph, 'ChemicalID2'))
+
+        # Interactions 2, 5, and 6 are added with an edge for each of their two PubMed identifiers
+        self.assertEqual(6, async_graph.number_of_edges())
+        self.assertEqual(set(graph), set(async_graph))
+        self.assertEqual(_get_edges(graph), _get_edges(async_graph))
+
+    def test_enrich_graph_genes(self):
+        """Test the identifiers and names of gene nodes, which are strings, are looked up like the manager does."""
+        nodes = [
+            rna(namespace='ENTREZ', name='GeneSymbol1', identifier='1'),
+            rna(namespace='ENTREZ', name='GeneSymbol3', identifier='3'),
+            rna(namespace='ENTREZ', name='GeneSymbol2'),
+        ]
+
+        graph, async_graph = BELGraph(), BELGraph()
+        for node in nodes:
+            graph.add_node_from_data(node)
+            async_graph.add_node_from_data(node)
+
+        self.manager.enrich_graph_genes(graph, batch_size=1)
+        self.run_async(self.async_manager.enrich_graph_genes(async_graph, batch_size=1))
+
+        # Genes 1 and 3 have two interactions each, which each have two PubMed identifiers
+        self.assertEqual(8, async_graph.number_of_edges())
+        self.assertEqual(set(graph), set(async_graph))
+        self.assertEqual(_get_edges(graph), _get_edges(async_graph))
+
+        edges = _get_edges(async_graph)
+        self.run_async(self.async_manager.enrich_graph_gene(async_graph, 'GeneSymbol2'))
+        self.assertEqual(edges, _get_edges(async_graph))
+
+    def test_concurrent_enrichment(self):
+        """Test concurrent requests give the same graphs as the manager."""
+        nodes = [
+            abundance(namespace='MESH', identifier='ChemicalID2'),
+            abundance(namespace='CAS', name='CasRN1'),
+            rna(namespace='ENTREZ', name='GeneSymbol3', identifier='3'),
+        ]
+
+        graphs, async_graphs = [], []
+        for _ in range(4):
+            for graphs_list in (graphs, async_graphs):
+                graph = BELGraph()
+                for node in nodes:
+                    graph.add_node_from_data(node)
+                graphs_list.append(graph)
+
+        for graph in graphs:
+            self.manager.enrich_chemicals(graph)
+            self.manager.enrich_graph_genes(graph)
+
+        async def enrich(graph):
+            counts = await self.async_manager.enrich_chemicals(graph)
+            await self.async_manager.enrich_graph_genes(graph)
+            return counts
+
+        async def enrich_all():
+            return await asyncio.gather(*(enrich(graph) for graph in async_graphs))
+
+        results = self.run_async(enrich_all())
+
+        for counts in results:
+            self.assertEqual({'MESH': {'hit': 1, 'miss': 0}, 'CAS': {'hit': 1, 'miss': 0}}, counts)
+
+        for graph, async_graph in zip(graphs, async_graphs):
+            # Chemicals 1 and 2 and gene 3 are in all six interactions, which each have two PubMed identifiers
+            self.assertEqual(12, async_graph.number_of_edges())
+            self.assertEqual(set(graph), set(async_graph))
+            self.assertEqual(_get_edges(graph), _get_edges(async_graph))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""Test the on-disk cache of the BEL graph."""
+
+import os
+import tempfile
+import unittest
+
+from bio2bel_ctd.bel_cache import clear_bel_cache, get_bel_cache_path, load_cached_graph, store_cached_graph
+from pybel import BELGraph
+from pybel.dsl import abundance
+from tests.constants import PopulatedDatabaseMixin, _urls
+
+
+class TestBELCache(unittest.TestCase):
+    """Test storing and loading cached BEL graphs."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cache(self):
+        self.assertIsNone(load_cached_graph('v1', directory=self.directory.name))
+
+        graph = BELGraph(name='CTD', version='1.0.0')
+        graph.add_node_from_data(abundance(namespace='MESH', identifier='D004052'))
+        store_cached_graph(graph, 'v1', directory=self.directory.name)
+
+        cached_graph = load_cached_graph('v1', directory=self.directory.name)
+        self.assertIsNotNone(cached_graph)
+        self.assertEqual(1, cached_graph.number_of_nodes())
+        self.assertIsNone(load_cached_graph('v2', directory=self.directory.name))
+
+        # Caching a graph for a new version replaces the old one
+        store_cached_graph(graph, 'v2', directory=self.directory.name)
+        self.assertFalse(os.path.exists(get_bel_cache_path('v1', directory=self.directory.name)))
+
+        self.assertEqual(1, clear_bel_cache(directory=self.directory.name))
+        self.assertIsNone(load_cached_graph('v2', directory=self.directory.name))
+
+    def test_variants(self):
+        """Test variants of the graph for the same version are kept, and the ones for other versions are replaced."""
+        graph = BELGraph(name='CTD', version='1.0.0')
+        graph.add_node_from_data(abundance(namespace='MESH', identifier='D004052'))
+        variant_graph = BELGraph(name='CTD', version='1.0.0')
+
+        store_cached_graph(graph, 'v1', directory=self.directory.name)
+        store_cached_graph(variant_graph, 'v1', directory=self.directory.name, variant='filtered')
+        self.assertEqual(1, load_cached_graph('v1', directory=self.directory.name).number_of_nodes())
+        self.assertEqual(
+            0,
+            load_cached_graph('v1', directory=self.directory.name, variant='filtered').number_of_nodes(),
+        )
+
+        store_cached_graph(graph, 'v2', directory=self.directory.name, variant='filtered')
+        self.assertIsNone(load_cached_graph('v1', directory=self.directory.name))
+        self.assertIsNone(load_cached_graph('v1', directory=self.directory.name, variant='filtered'))
+        self.assertIsNotNone(load_cached_graph('v2', directory=self.directory.name, variant='filtered'))
+
+
+class TestDatabaseVersion(PopulatedDatabaseMixin):
+    """Test the version of the database that keys the cache."""
+
+    def test_version(self):
+        version = self.manager.get_database_version()
+        self.assertEqual(version, self.manager.get_database_version())
+
+        self.manager.populate(urls=_urls, only_tables=['chemical'])
+        self.assertNotEqual(version, self.manager.get_database_version())
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""Test streaming rows from the CTD files for the bulk loader."""
+
+import gzip
+import os
+import tempfile
+import unittest
+
+from bio2bel_ctd.bulk import iter_batches, iter_rows
+from tests.constants import chemicals_url
+
+
+class TestIterRows(unittest.TestCase):
+    """Test reading rows straight from gzipped CTD files."""
+
+    def test_gzipped(self):
+        rows = list(iter_rows(chemicals_url))
+        self.assertEqual(3, len(rows))
+        self.assertTrue(all(row[0] for row in rows))
+
+    def test_comments_and_missing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.tsv.gz')
+            with gzip.open(path, 'wt', encoding='utf-8') as file:
+                file.write('# a comment\n#\nA\t\tC\r\n\nD\tE\n')
+
+            self.assertEqual([['A', None, 'C'], ['D', 'E']], list(iter_rows(path)))
+
+    def test_batches(self):
+        self.assertEqual([[0, 1], [2, 3], [4]], list(iter_batches(range(5), 2)))
+        self.assertEqual([], list(iter_batches([], 2)))
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""Test exporting the chemical-gene interactions to a columnar snapshot and enriching from it."""
+
+import os
+import tempfile
+import unittest
+
+from pybel import BELGraph
+from pybel.dsl import abundance
+from bio2bel_ctd.models import ChemGeneIxn
+from tests.constants import MappedInteractionsMixin, PopulatedDatabaseMixin
+
+try:
+    from bio2bel_ctd.columnar import ColumnarBackend
+except ImportError:
+    ColumnarBackend = None
+
+
+@unittest.skipIf(ColumnarBackend is None, 'pyarrow is not installed')
+class TestColumnar(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Test the columnar snapshot."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'ctd.parquet')
+        self.count = self.manager.export_columnar(self.path, batch_size=2, row_group_size=2)
+        self.backend = ColumnarBackend(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_export(self):
+        self.assertEqual(6, self.count)
+        self.assertEqual(6, self.backend.count_chemical_gene_interactions())
+
+    def test_interactions_by_chemical(self):
+        interactions = list(self.backend.iter_interactions(chemical_ids=['ChemicalID2']))
+        self.assertEqual({2, 5, 6}, {ixn.id for ixn in interactions})
+
+        ixn = next(ixn for ixn in interactions if ixn.id == 6)
+        self.assertEqual('ChemicalName2', ixn.chemical.chemical_name)
+        self.assertEqual(3, ixn.gene.gene_id)
+        self.assertEqual('GeneSymbol3', ixn.gene.gene_symbol)
+        self.assertEqual({11, 12}, {pubmed.pubmed_id for pubmed in ixn.pubmed_ids})
+        self.assertEqual({'GeneForm3_1', 'GeneForm3_2'}, {gene_form.gene_form for gene_form in ixn.gene_forms})
+
+    def test_interactions_by_gene(self):
+        interactions = self.backend.iter_interactions(gene_ids=[3])
+        self.assertEqual({3, 6}, {ixn.id for ixn in interactions})
+
+        self.assertEqual([], list(self.backend.iter_interactions(chemical_ids=[])))
+
+    def make_graph(self):
+        graph = BELGraph()
+        graph.add_node_from_data(abundance(namespace='MESH', identifier='ChemicalID2'))
+        graph.add_node_from_data(abundance(namespace='CAS', name='CasRN1'))
+        graph.add_node_from_data(abundance(namespace='MESH', identifier='missing'))
+        return graph
+
+    def test_enrich_chemicals(self):
+        """Test enriching from the snapshot adds the same edges as enriching from the database."""
+        graph = self.make_graph()
+        self.assertEqual(
+            {'MESH': {'hit': 1, 'miss': 1}, 'CAS': {'hit': 1, 'miss': 0}},
+            self.backend.enrich_chemicals(graph),
+        )
+
+        database_graph = self.make_graph()
+        self.manager.enrich_chemicals(database_graph)
+
+        # Interactions 2, 5, and 6 of ChemicalID2 and 1 and 4 of CasRN1, which each have two PubMed identifiers
+        self.assertEqual(10, graph.number_of_edges())
+        self.assertEqual(set(database_graph), set(graph))
+        self.assertEqual(set(database_graph.edges(keys=True)), set(graph.edges(keys=True)))
+
+
+@unittest.skipIf(ColumnarBackend is None, 'pyarrow is not installed')
+class TestMissingGene(PopulatedDatabaseMixin):
+    """Test exporting a columnar snapshot when an interaction is missing its gene."""
+
+    def test_export(self):
+        self.manager.session.add(ChemGeneIxn(id=7, chemical__id=1, interaction='Interaction7'))
+        self.manager.session.commit()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ctd.parquet')
+            self.assertEqual(6, self.manager.export_columnar(path))
+            self.assertEqual(6, ColumnarBackend(path).count_chemical_gene_interactions())
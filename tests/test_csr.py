@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""Test the memory-mapped interaction index."""
+
+import tempfile
+
+from bio2bel_ctd.csr import InteractionIndex
+from bio2bel_ctd.models import ChemGeneIxn
+from pybel import BELGraph
+from sqlalchemy import event
+from tests.constants import MappedInteractionsMixin, PopulatedDatabaseMixin
+
+
+class TestInteractionIndex(PopulatedDatabaseMixin):
+    """Test building and reading the memory-mapped interaction index."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.count = self.manager.build_interaction_index(self.directory.name, chunk_size=4)
+        self.index = InteractionIndex.load(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_build(self):
+        self.assertEqual(6, self.count)
+        self.assertEqual(6, len(self.index))
+
+    def test_chemical(self):
+        interactions = list(self.index.iter_chemical_interactions('ChemicalID2'))
+        self.assertEqual({2, 5, 6}, {ixn.id for ixn in interactions})
+
+        ixn = next(ixn for ixn in interactions if ixn.id == 6)
+        self.assertEqual('Interaction6', ixn.interaction)
+        self.assertEqual('ChemicalName2', ixn.chemical.chemical_name)
+        self.assertEqual(3, ixn.gene.gene_id)
+        self.assertEqual('GeneSymbol3', ixn.gene.gene_symbol)
+        self.assertEqual([11, 12], sorted(pubmed.pubmed_id for pubmed in ixn.pubmed_ids))
+        self.assertEqual(['GeneForm3_1', 'GeneForm3_2'], sorted(gene_form.gene_form for gene_form in ixn.gene_forms))
+        self.assertEqual(['InteractionActions6'], [action.interaction_action for action in ixn.interaction_actions])
+
+        self.assertEqual([], list(self.index.iter_chemical_interactions('missing')))
+
+    def test_gene(self):
+        self.assertEqual({3, 6}, {ixn.id for ixn in self.index.iter_gene_interactions('3')})
+        self.assertEqual([], list(self.index.iter_gene_interactions('4')))
+        self.assertEqual([], list(self.index.iter_gene_interactions('not a number')))
+
+
+class TestMissingChemical(PopulatedDatabaseMixin):
+    """Test building the interaction index when an interaction is missing its chemical."""
+
+    def test_build(self):
+        self.manager.session.add(ChemGeneIxn(id=7, gene__id=3, interaction='Interaction7'))
+        self.manager.session.commit()
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(6, self.manager.build_interaction_index(directory))
+            index = InteractionIndex.load(directory)
+
+            self.assertEqual(6, len(index))
+            self.assertEqual({3, 6}, {ixn.id for ixn in index.iter_gene_interactions('3')})
+
+
+class TestIndexEnrichment(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Test enriching graphs from the interaction index instead of the database."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.manager.build_interaction_index(self.directory.name)
+
+    def tearDown(self):
+        self.manager.interaction_index = None
+        self.directory.cleanup()
+        super().tearDown()
+
+    def enrich(self):
+        graph = BELGraph()
+        self.manager.enrich_graph_chemical(graph, 'ChemicalID2')
+        self.manager.enrich_graph_gene(graph, '1')
+        self.manager.enrich_graph_gene(graph, '3')
+        self.manager.enrich_graph_gene(graph, 'not a number')
+        return graph
+
+    def test_same_as_database(self):
+        """Test the index adds the same nodes and edges as the database, without querying it."""
+        graph = self.enrich()
+
+        self.manager.load_interaction_index(self.directory.name)
+
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.manager.engine, 'before_cursor_execute', log_statement)
+        self.addCleanup(event.remove, self.manager.engine, 'before_cursor_execute', log_statement)
+
+        index_graph = self.enrich()
+        self.assertEqual([], statements)
+
+        # Chemical 2 and genes 1 and 3 are in all six interactions, which each have two PubMed identifiers
+        self.assertEqual(12, graph.number_of_edges())
+        self.assertEqual(set(graph), set(index_graph))
+        self.assertEqual(set(graph.edges(keys=True)), set(index_graph.edges(keys=True)))
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""Test parallel, resumable downloads against a local HTTP server."""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from bio2bel_ctd.download import download_file, download_files
+from tests.constants import chemical_gene_interactions_url, chemicals_url, genes_url
+
+test_files = {
+    os.path.basename(path): open(path, 'rb').read()
+    for path in (chemicals_url, genes_url, chemical_gene_interactions_url)
+}
+
+
+def get_etag(content):
+    return '"{}"'.format(hashlib.sha256(content).hexdigest())
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves the test files, with support for ``Range: bytes=<start>-`` and ``If-Range`` headers."""
+
+    def do_HEAD(self):
+        content = test_files.get(self.path.lstrip('/'))
+        if content is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', get_etag(content))
+        self.end_headers()
+
+    def do_GET(self):
+        content = test_files.get(self.path.lstrip('/'))
+        if content is None:
+            self.send_error(404)
+            return
+
+        start = 0
+        match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if match and self.headers.get('If-Range', get_etag(content)) == get_etag(content):
+            start = int(match.group(1))
+            if start >= len(content):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, len(content) - 1, len(content)))
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Length', str(len(content) - start))
+        self.send_header('ETag', get_etag(content))
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownload(unittest.TestCase):
+    """Test downloading files from a local HTTP server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('localhost', 0), RangeRequestHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = 'http://localhost:{}/'.format(cls.server.server_port)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.name = os.path.basename(chemical_gene_interactions_url)
+        self.content = test_files[self.name]
+        self.path = os.path.join(self.directory.name, self.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_downloaded(self, path, content):
+        self.assertTrue(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + '.part'))
+        self.assertFalse(os.path.exists(path + '.part.validator'))
+        with open(path, 'rb') as file:
+            self.assertEqual(content, file.read())
+
+    def write_part(self, content, validator=None):
+        with open(self.path + '.part', 'wb') as file:
+            file.write(content)
+        if validator is not None:
+            with open(self.path + '.part.validator', 'w') as file:
+                file.write(validator)
+
+    def test_download(self):
+        report = download_file(self.base_url + self.name, self.path)
+        self.assert_downloaded(self.path, self.content)
+        self.assertEqual(len(self.content), report.downloaded)
+        self.assertEqual(0, report.resumed_from)
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), report.sha256)
+
+    def test_download_not_read_back(self):
+        """Test the digest of a downloaded file is computed while it's written instead of reading it again."""
+        with mock.patch('bio2bel_ctd.download.get_sha256') as get_sha256:
+            report = download_file(self.base_url + self.name, self.path,
+                                   expected_sha256=hashlib.sha256(self.content).hexdigest())
+        get_sha256.assert_not_called()
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), report.sha256)
+
+    def test_copy(self):
+        """Test a local file is only hashed after it's copied if a digest is expected."""
+        with mock.patch('bio2bel_ctd.download.get_sha256') as get_sha256:
+            report = download_file(chemical_gene_interactions_url, self.path)
+        get_sha256.assert_not_called()
+        self.assertIsNone(report.sha256)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(self.content, file.read())
+
+        os.remove(self.path)
+        with self.assertRaises(ValueError):
+            download_file(chemical_gene_interactions_url, self.path, expected_sha256='0' * 64)
+
+    def test_resume(self):
+        half = len(self.content) // 2
+        self.write_part(self.content[:half], get_etag(self.content))
+
+        report = download_file(self.base_url + self.name, self.path)
+        self.assert_downloaded(self.path, self.content)
+        self.assertEqual(half, report.resumed_from)
+        self.assertEqual(len(self.content) - half, report.downloaded)
+
+    def test_resume_without_validator(self):
+        """Test a partial download that can't be checked against the file on the server is started over."""
+        self.write_part(self.content[:len(self.content) // 2])
+
+        report = download_file(self.base_url + self.name, self.path)
+        self.assert_downloaded(self.path, self.content)
+        self.assertEqual(0, report.resumed_from)
+        self.assertEqual(len(self.content), report.downloaded)
+
+    def test_resume_changed(self):
+        """Test a partial download of a file that has changed on the server since is started over."""
+        self.write_part(b'outdated', get_etag(b'outdated content'))
+
+        report = download_file(self.base_url + self.name, self.path)
+        self.assert_downloaded(self.path, self.content)
+        self.assertEqual(0, report.resumed_from)
+        self.assertEqual(len(self.content), report.downloaded)
+
+    def test_resume_complete(self):
+        self.write_part(self.content, get_etag(self.content))
+
+        report = download_file(self.base_url + self.name, self.path)
+        self.assert_downloaded(self.path, self.content)
+        self.assertEqual(0, report.downloaded)
+
+    def test_resume_too_long(self):
+        """Test a partial download that's longer than the file on the server is started over."""
+        self.write_part(self.content + b'extra', get_etag(self.content))
+
+        report = download_file(self.base_url + self.name, self.path)
+        self.assert_downloaded(self.path, self.content)
+        self.assertEqual(0, report.resumed_from)
+        self.assertEqual(len(self.content), report.downloaded)
+
+    def test_checksum(self):
+        download_file(self.base_url + self.name, self.path, expected_sha256=hashlib.sha256(self.content).hexdigest())
+        self.assert_downloaded(self.path, self.content)
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(ValueError):
+            download_file(self.base_url + self.name, self.path, expected_sha256='0' * 64)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        self.assertFalse(os.path.exists(self.path + '.part.validator'))
+
+    def test_download_files(self):
+        reports = download_files([self.base_url + name for name in test_files], self.directory.name, max_workers=2)
+        self.assertEqual(len(test_files), len(reports))
+        for name, content in test_files.items():
+            self.assert_downloaded(os.path.join(self.directory.name, name), content)
+
+        reports = download_files([self.base_url + name for name in test_files], self.directory.name, max_workers=2)
+        self.assertTrue(all(0 == report.downloaded for report in reports))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Test the memoized chemical and gene DSL constructors."""
+
+import unittest
+
+from bio2bel_ctd.enrichment_utils import clear_dsl_cache, get_dsl_cache_info, get_dsl_chemical, get_dsl_gene
+from pybel import BELGraph
+from tests.constants import MockChemical, MockGene, make_interaction
+
+
+def make_chemical_interaction(chemical_id):
+    return make_interaction(
+        ['decreases^expression'],
+        ['mRNA'],
+        chemical=MockChemical('ChemicalID{}'.format(chemical_id), 'ChemicalName{}'.format(chemical_id)),
+        gene=MockGene(chemical_id, 'GeneSymbol{}'.format(chemical_id)),
+    )
+
+
+class TestDSLCache(unittest.TestCase):
+    """Test the cache of the chemical and gene DSL objects."""
+
+    def setUp(self):
+        clear_dsl_cache()
+
+    def tearDown(self):
+        clear_dsl_cache()
+
+    def test_hits(self):
+        """Test translating the same chemicals and genes again uses the cache, until it's cleared."""
+        interactions = [make_chemical_interaction(1), make_chemical_interaction(2)]
+        for _ in range(3):
+            for ixn in interactions:
+                get_dsl_chemical(ixn)
+                get_dsl_gene(ixn)
+
+        info = get_dsl_cache_info()
+        for key in ('chemical', 'gene'):
+            self.assertEqual(2, info[key]['misses'])
+            self.assertEqual(4, info[key]['hits'])
+            self.assertEqual(2, info[key]['size'])
+            self.assertAlmostEqual(2 / 3, info[key]['hit_rate'])
+
+        clear_dsl_cache()
+
+        info = get_dsl_cache_info()
+        for key in ('chemical', 'gene'):
+            self.assertEqual(0, info[key]['hits'])
+            self.assertEqual(0, info[key]['misses'])
+            self.assertEqual(0, info[key]['size'])
+            self.assertEqual(0.0, info[key]['hit_rate'])
+
+    def test_maxsize(self):
+        """Test the cache doesn't grow past its maximum size."""
+        maxsize = get_dsl_cache_info()['chemical']['maxsize']
+
+        for chemical_id in range(maxsize + 10):
+            get_dsl_chemical(make_chemical_interaction(chemical_id))
+
+        info = get_dsl_cache_info()['chemical']
+        self.assertEqual(maxsize + 10, info['misses'])
+        self.assertEqual(maxsize, info['size'])
+
+    def test_node_data(self):
+        """Test changing the data of a node in one graph doesn't change it in other graphs with the same node."""
+        ixn = make_chemical_interaction(1)
+
+        graph, other_graph = BELGraph(), BELGraph()
+        node = graph.add_node_from_data(get_dsl_chemical(ixn))
+        other_node = other_graph.add_node_from_data(get_dsl_chemical(ixn))
+        self.assertEqual(1, get_dsl_cache_info()['chemical']['hits'])
+
+        graph.node[node]['label'] = 'changed'
+
+        self.assertNotIn('label', other_graph.node[other_node])
+        self.assertNotIn('label', get_dsl_chemical(ixn))
@@ -14,7 +14,7 @@ from pybel.constants import (
     RELATION, SUBJECT,
 )
 from pybel.dsl import abundance, rna
-from tests.constants import PopulatedDatabaseMixin
+from tests.constants import MappedInteractionsMixin, PopulatedDatabaseMixin
 
 ex_mesh_name = abundance(namespace='MESH', name='Diethylnitrosamine')
 ex_mesh_id = abundance(namespace='MESH', identifier='D004052')
@@ -88,5 +88,76 @@ class TestEnrichment(PopulatedDatabaseMixin):
         self.help_test_graph(graph, c_tuple)
 
 
+class TestEnrichMany(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Tests enriching many graphs at once."""
+
+    def test_same_as_enriching_each(self):
+        """Test enriching many graphs adds the same nodes and edges as enriching each of them."""
+        node_lists = [
+            [abundance(namespace='MESH', identifier='ChemicalID2')],
+            [
+                abundance(namespace='MESH', identifier='ChemicalID2'),
+                rna(namespace='ENTREZ', name='GeneSymbol3', identifier='3'),
+            ],
+            [
+                rna(namespace='ENTREZ', name='GeneSymbol3', identifier='3'),
+                abundance(namespace='MESH', identifier='missing'),
+            ],
+            [],
+        ]
+
+        graphs = []
+        for nodes in node_lists:
+            graph = BELGraph()
+            for node in nodes:
+                graph.add_node_from_data(node)
+            graphs.append(graph)
+
+        counts = self.manager.enrich_many(graphs)
+        self.assertEqual(len(graphs), len(counts))
+
+        for nodes, graph, graph_counts in zip(node_lists, graphs, counts):
+            expected = BELGraph()
+            for node in nodes:
+                expected.add_node_from_data(node)
+
+            self.assertEqual(self.manager.enrich_chemicals(expected), graph_counts)
+            self.manager.enrich_graph_genes(expected)
+
+            self.assertEqual(set(expected), set(graph))
+            self.assertEqual(set(expected.edges(keys=True)), set(graph.edges(keys=True)))
+
+        # Each interaction is added with an edge for each of its two PubMed identifiers
+        self.assertEqual(6, graphs[0].number_of_edges(), msg='interactions 2, 5, and 6 of ChemicalID2')
+        self.assertEqual(8, graphs[1].number_of_edges(), msg='interaction 3 of gene 3 is added too')
+        self.assertEqual(4, graphs[2].number_of_edges(), msg='interactions 3 and 6 of gene 3')
+        self.assertEqual(0, graphs[3].number_of_edges())
+
+
+class TestEnrichGenes(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Tests enriching the genes of a graph in batches."""
+
+    def make_graph(self):
+        graph = BELGraph()
+        for gene_id in ('1', '2', '3', '42'):
+            graph.add_node_from_data(rna(namespace='ENTREZ', name='GeneSymbol' + gene_id, identifier=gene_id))
+        # Names that aren't numbers can't be Entrez Gene identifiers in the CTD, so they're skipped
+        graph.add_node_from_data(rna(namespace='ENTREZ', name='GeneSymbol1'))
+        return graph
+
+    def test_batches(self):
+        """Test looking up one gene at a time adds the same nodes and edges as looking up all of them at once."""
+        graph = self.make_graph()
+        self.manager.enrich_graph_genes(graph)
+
+        batched_graph = self.make_graph()
+        self.manager.enrich_graph_genes(batched_graph, batch_size=1)
+
+        # Genes 1, 2, and 3 have two interactions each, which each have two PubMed identifiers
+        self.assertEqual(12, graph.number_of_edges())
+        self.assertEqual(set(graph), set(batched_graph))
+        self.assertEqual(set(graph.edges(keys=True)), set(batched_graph.edges(keys=True)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Test writing rows to tab-separated and JSON Lines files."""
+
+import io
+import json
+import unittest
+
+from bio2bel_ctd.export import export_chunks
+
+
+def _identity(row):
+    return row
+
+
+class TestExport(unittest.TestCase):
+    """Test writing chunks of rows."""
+
+    def setUp(self):
+        self.chunks = [
+            [dict(id=1, name='a\tb', pubmed_ids=[1, 2]), dict(id=2, name=None, pubmed_ids=[])],
+            [],
+            [dict(id=3, name='c', pubmed_ids=[3])],
+        ]
+
+    def test_tsv(self):
+        file = io.StringIO()
+        self.assertEqual(3, export_chunks(self.chunks, _identity, file))
+        self.assertEqual(
+            'id\tname\tpubmed_ids\n1\ta b\t1|2\n2\t\t\n3\tc\t3\n',
+            file.getvalue()
+        )
+
+    def test_jsonl(self):
+        file = io.StringIO()
+        self.assertEqual(3, export_chunks(self.chunks, _identity, file, fmt='jsonl'))
+        rows = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual([1, 2, 3], [row['id'] for row in rows])
+        self.assertEqual([1, 2], rows[0]['pubmed_ids'])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_chunks(self.chunks, _identity, io.StringIO(), fmt='xml')
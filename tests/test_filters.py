@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""Test the filters on chemical-gene interactions are compiled into the queries."""
+
+import unittest
+
+from bio2bel_ctd.filters import InteractionFilter
+from bio2bel_ctd.models import ChemGeneIxn
+from bio2bel_ctd.stats import TranslationStats
+from pybel import BELGraph
+from pybel.dsl import abundance
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestInteractionFilter(unittest.TestCase):
+    """Test the conditions of filters."""
+
+    def test_empty(self):
+        self.assertFalse(InteractionFilter())
+        self.assertEqual([], InteractionFilter().get_criteria())
+
+    def test_key(self):
+        self.assertTrue(InteractionFilter(organism_ids=[9606]))
+        self.assertEqual(
+            InteractionFilter(organism_ids=[9606, 10090], gene_forms='protein').get_key(),
+            InteractionFilter(organism_ids=['10090', 9606], gene_forms=['protein']).get_key(),
+        )
+        self.assertNotEqual(
+            InteractionFilter(organism_ids=[9606]).get_key(),
+            InteractionFilter(organism_ids=[9606], min_pubmeds=2).get_key(),
+        )
+
+
+class TestFilteredQueries(PopulatedDatabaseMixin):
+    """Test filters restrict the interactions that are loaded."""
+
+    def get_ids(self, filters):
+        query = filters.apply(self.manager.session.query(ChemGeneIxn.id)).order_by(ChemGeneIxn.id)
+        return [ixn_id for ixn_id, in query]
+
+    def test_conditions(self):
+        self.assertEqual([1, 2, 3, 4, 5, 6], self.get_ids(InteractionFilter()))
+        self.assertEqual([2, 6], self.get_ids(InteractionFilter(organism_ids=[2, 6])))
+        self.assertEqual([5], self.get_ids(InteractionFilter(interaction_actions=['InteractionActions5'])))
+        self.assertEqual([3, 6], self.get_ids(InteractionFilter(gene_forms=['GeneForm3_2'])))
+        self.assertEqual([2, 5, 6], self.get_ids(InteractionFilter(chemical_ids=['ChemicalID2'])))
+        self.assertEqual([6], self.get_ids(InteractionFilter(chemical_ids=['ChemicalID2'], gene_ids=[3])))
+        self.assertEqual([1, 2, 3, 4, 5, 6], self.get_ids(InteractionFilter(min_pubmeds=2)))
+        self.assertEqual([], self.get_ids(InteractionFilter(min_pubmeds=3)))
+
+    def test_enrich(self):
+        graph = BELGraph()
+        graph.add_node_from_data(abundance(namespace='MESH', identifier='ChemicalID2'))
+
+        stats = TranslationStats()
+        self.manager.enrich_chemicals(graph, stats=stats, filters=InteractionFilter(organism_ids=[2, 6]))
+
+        # The fixture's interaction actions don't have handlers, so each translated interaction is unmapped
+        self.assertEqual(2, sum(stats.unmapped.values()))
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+"""Test the indexes needed by the queries of the manager."""
+
+from bio2bel_ctd.indexes import MANAGED_INDEXES, create_indexes, drop_indexes, get_index_reports
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestIndexes(PopulatedDatabaseMixin):
+    """Test the managed indexes are created after populating and can be rebuilt."""
+
+    def test_reports(self):
+        reports = get_index_reports(self.manager.engine)
+        self.assertEqual(len(MANAGED_INDEXES), len(reports))
+        self.assertTrue(all(report.exists for report in reports))
+
+        names = {report.name for report in reports}
+        self.assertIn('ix_pyctd_gene_gene_id', names)
+        self.assertIn('ix_pyctd_chem_gene_ixn__pubmed_id_chem_gene_ixn__id', names)
+
+    def test_rebuild(self):
+        dropped = drop_indexes(self.manager.engine, MANAGED_INDEXES[2:3])
+        self.assertEqual(['ix_pyctd_gene_gene_id'], [index.name for index in dropped])
+        self.assertFalse(get_index_reports(self.manager.engine)[2].exists)
+
+        self.assertEqual(['ix_pyctd_gene_gene_id'], create_indexes(self.manager.engine))
+        self.assertEqual([], create_indexes(self.manager.engine))
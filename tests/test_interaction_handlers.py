@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Test the lookup of interaction handlers by interaction signatures."""
+
+import unittest
+
+from bio2bel_ctd.enrichment_utils import (
+    INTERACTION_HANDLERS, add_ixn_binding, add_ixn_increases_expression, add_ixn_regulates_methylation,
+    get_interaction_handler, get_interaction_signature, register_interaction_handler,
+)
+from tests.constants import make_interaction
+
+
+class TestInteractionHandlers(unittest.TestCase):
+    """Test the lookup of interaction handlers."""
+
+    def test_signature(self):
+        ixn = make_interaction(['increases^activity', 'affects^binding'], ['protein'])
+        self.assertEqual(
+            (('affects^binding', 'increases^activity'), ('protein',)),
+            get_interaction_signature(ixn)
+        )
+
+    def test_lookup(self):
+        self.assertIs(
+            add_ixn_increases_expression,
+            get_interaction_handler(make_interaction(['increases^expression'], ['mRNA']))
+        )
+        self.assertIs(
+            add_ixn_increases_expression,
+            get_interaction_handler(make_interaction(['increases^expression'], ['protein']))
+        )
+        self.assertIs(
+            add_ixn_regulates_methylation,
+            get_interaction_handler(make_interaction(['affects^methylation'], ['gene']))
+        )
+        self.assertIsNone(get_interaction_handler(make_interaction(['affects^methylation'], ['protein'])))
+        self.assertIsNone(get_interaction_handler(make_interaction(['affects^binding', 'increases^activity'], [])))
+
+    def test_register(self):
+        signature = (('affects^binding', 'increases^activity'), ('protein',))
+        self.assertNotIn(signature, INTERACTION_HANDLERS)
+
+        register_interaction_handler(['increases^activity', 'affects^binding'], ['protein'], add_ixn_binding)
+        try:
+            ixn = make_interaction(['affects^binding', 'increases^activity'], ['protein'])
+            self.assertIs(add_ixn_binding, get_interaction_handler(ixn))
+        finally:
+            del INTERACTION_HANDLERS[signature]
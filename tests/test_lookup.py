@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Test the chemical lookup index."""
+
+import unittest
+
+from bio2bel_ctd.lookup import ChemicalLookupIndex, get_entrez_gene_ids
+
+
+class TestChemicalLookupIndex(unittest.TestCase):
+    """Test resolving chemicals by MeSH identifier, name, and CAS Registry Number."""
+
+    def setUp(self):
+        self.index = ChemicalLookupIndex.from_rows([
+            (1, 'MESH:D004052', 'Diethylnitrosamine', '55-18-5'),
+            (2, 'C490728', 'lapatinib', None),
+        ])
+
+    def test_mesh_identifier(self):
+        self.assertEqual(1, self.index.resolve('MESH', identifier='D004052'))
+        self.assertEqual(1, self.index.resolve('MESH', identifier='MESH:D004052'))
+        self.assertEqual(2, self.index.resolve('MESHC', identifier='MESH:C490728'))
+        self.assertIsNone(self.index.resolve('MESH', identifier='D000000'))
+
+    def test_mesh_name(self):
+        self.assertEqual(1, self.index.resolve('MESH', name='Diethylnitrosamine'))
+        self.assertEqual(1, self.index.resolve('MESH', name='diethylnitrosamine'))
+        self.assertEqual(2, self.index.resolve('MESHC', name='C490728'))
+        self.assertIsNone(self.index.resolve('MESH', name='N-nitrosodiethylamine'))
+
+    def test_cas(self):
+        self.assertEqual(1, self.index.resolve('CAS', identifier='55-18-5'))
+        self.assertEqual(1, self.index.resolve('CASRN', name='55-18-5'))
+        self.assertIsNone(self.index.resolve('CAS', name='Diethylnitrosamine'))
+
+    def test_other_namespace(self):
+        self.assertIsNone(self.index.resolve('CHEBI', identifier='34873'))
+
+
+class TestEntrezGeneIdentifiers(unittest.TestCase):
+    """Test converting Entrez Gene identifiers from graphs to the integers in the database."""
+
+    def test_convert(self):
+        self.assertEqual([3, 42, 7], get_entrez_gene_ids(['3', ' 42 ', 'GeneSymbol1', 7, '', '-1']))
@@ -2,9 +2,22 @@
 
 """Tests the database gets populated"""
 
+import gzip
 import logging
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-from tests.constants import PopulatedDatabaseMixin, TemporaryCacheClassMixin, resources_dir
+from bio2bel_ctd.bulk import load_tables
+from bio2bel_ctd.incremental import get_changed_tables, get_dependent_tables
+from bio2bel_ctd.models import (
+    ChemGeneIxn, ChemGeneIxnGeneForm, ChemGeneIxnInteractionAction, ChemGeneIxnPubmed, SourceFile,
+)
+from tests.constants import (
+    LegacyPopulatedDatabaseMixin, PopulatedDatabaseMixin, TemporaryCacheClassMixin, _only_tables, _urls,
+    chemical_gene_interaction_types_url, chemical_gene_interactions_url, chemicals_url, genes_url, resources_dir,
+)
 
 log = logging.getLogger(__name__)
 
@@ -13,7 +26,163 @@ class TestConfig(TemporaryCacheClassMixin):
     def test_config(self):
         self.assertEqual(resources_dir, self.manager.pyctd_data_dir)
 
+    def test_unpopulated(self):
+        self.assertFalse(self.manager.is_populated())
+        self.assertEqual(0, self.manager.summarize()['chemical_gene_interactions'])
+
+
+class _TestCountsMixin:
+    """Checks the row counts from the files in ``tests/resources``."""
 
-class TestImport(PopulatedDatabaseMixin):
     def test_count_genes(self):
         self.assertEqual(3, self.manager.count_genes())
+
+    def test_count_chemicals(self):
+        self.assertEqual(3, self.manager.count_chemicals())
+
+    def test_count_chemical_gene_interactions(self):
+        self.assertEqual(6, self.manager.count_chemical_gene_interactions())
+
+    def test_summarize(self):
+        """Test the counts stored when populating are the same as the exact counts."""
+        summary = self.manager.summarize()
+        self.assertEqual(3, summary['chemicals'])
+        self.assertEqual(6, summary['chemical_gene_interactions'])
+        self.assertEqual(0, summary['diseases'])
+        self.assertEqual(summary, self.manager.summarize(exact=True))
+        self.assertTrue(self.manager.is_populated())
+
+    def test_count_one_to_many(self):
+        self.assertEqual(12, self.manager.session.query(ChemGeneIxnPubmed).count())
+        self.assertEqual(12, self.manager.session.query(ChemGeneIxnGeneForm).count())
+        self.assertEqual(6, self.manager.session.query(ChemGeneIxnInteractionAction).count())
+
+
+class TestImport(_TestCountsMixin, PopulatedDatabaseMixin):
+    """Tests the bulk loader."""
+
+    def test_foreign_keys(self):
+        ixn = self.manager.get_interaction_by_id(6)
+        self.assertIsNotNone(ixn)
+        self.assertEqual('ChemicalID2', ixn.chemical.chemical_id)
+        self.assertEqual(3, ixn.gene.gene_id)
+        self.assertEqual({11, 12}, {reference.pubmed_id for reference in ixn.pubmed_ids})
+
+    def test_fingerprints(self):
+        """Test the fingerprints of the imported files are stored, so nothing needs to be reimported."""
+        self.assertEqual(4, self.manager.session.query(SourceFile).count())
+        self.assertEqual([], get_changed_tables(self.manager.session, self.manager.tables, resources_dir))
+
+    def test_bulk_lookup(self):
+        """Test looking up many chemicals and genes and counting their interactions with grouped queries."""
+        chemicals = self.manager.get_chemicals_by_mesh(['ChemicalID2', 'ChemicalID3', 'missing'], batch_size=1)
+        self.assertEqual({'ChemicalID2', 'ChemicalID3'}, set(chemicals))
+
+        chemicals_by_cas = self.manager.get_chemicals_by_cas(['CasRN1'])
+        self.assertEqual(['ChemicalID1'], [chemical.chemical_id for chemical in chemicals_by_cas.values()])
+
+        counts = self.manager.count_chemical_interactions(chemical.id for chemical in chemicals.values())
+        self.assertEqual({3, 1}, set(counts.values()))
+
+        genes = self.manager.get_genes_by_entrez_id(['3', 'nope', '42'])
+        self.assertEqual({3}, set(genes))
+        self.assertEqual({genes[3].id: 2}, self.manager.count_gene_interactions([genes[3].id]))
+
+    def test_dependent_tables(self):
+        self.assertEqual({'action'}, get_dependent_tables(self.manager.tables, ['action']))
+
+        dependent_tables = get_dependent_tables(self.manager.tables, ['gene'])
+        self.assertIn('gene', dependent_tables)
+        self.assertIn('chem_gene_ixn', dependent_tables)
+        self.assertNotIn('chemical', dependent_tables)
+
+
+class TestReloadVocabulary(PopulatedDatabaseMixin):
+    """Tests reloading a vocabulary table with the bulk loader."""
+
+    def test_reload_dependent_tables(self):
+        """Test the tables referencing a reloaded vocabulary are reloaded too, so their foreign keys stay valid."""
+        self.manager.session.add(ChemGeneIxn(id=7, chemical__id=1, gene__id=1))
+        self.manager.session.commit()
+
+        self.manager.populate(urls=_urls, only_tables=['chemical'])
+
+        self.assertIsNone(self.manager.get_interaction_by_id(7), msg='the interactions should have been reloaded')
+        self.assertEqual(6, self.manager.count_chemical_gene_interactions())
+        self.assertEqual(12, self.manager.session.query(ChemGeneIxnPubmed).count())
+        self.assertEqual('ChemicalID2', self.manager.get_interaction_by_id(6).chemical.chemical_id)
+
+
+class TestIncrementalImport(TemporaryCacheClassMixin):
+    """Tests only the tables whose files changed since they were imported are imported again."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        paths = [chemicals_url, genes_url, chemical_gene_interaction_types_url, chemical_gene_interactions_url]
+        for path in paths:
+            shutil.copy(path, self.directory.name)
+        self.urls = [os.path.join(self.directory.name, os.path.basename(path)) for path in paths]
+
+        patcher = mock.patch.object(type(self.manager), 'pyctd_data_dir', self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def populate_incremental(self):
+        """Populate the database incrementally and get the names of the tables the bulk loader was asked to load."""
+        with mock.patch('bio2bel_ctd.manager.load_tables', wraps=load_tables) as load:
+            self.manager.populate(urls=self.urls, only_tables=_only_tables, incremental=True)
+
+        if not load.called:
+            return set()
+        return load.call_args[1]['only_tables']
+
+    def get_imported(self):
+        self.manager.session.expire_all()
+        return {
+            source_file.table_name: source_file.imported
+            for source_file in self.manager.session.query(SourceFile)
+        }
+
+    def test_incremental(self):
+        self.assertEqual(set(_only_tables), self.populate_incremental())
+        self.assertEqual(6, self.manager.count_chemical_gene_interactions())
+        imported = self.get_imported()
+
+        # Touching a file changes its modification time, but not its contents
+        chemicals_path = os.path.join(self.directory.name, os.path.basename(chemicals_url))
+        os.utime(chemicals_path)
+        self.assertEqual(set(), self.populate_incremental())
+        self.assertEqual(imported, self.get_imported())
+
+        # The new modification time is stored, so the touched file isn't hashed again
+        source_file = self.manager.session.query(SourceFile).filter(SourceFile.table_name == 'chemical').one()
+        self.assertEqual(os.stat(chemicals_path).st_mtime, source_file.mtime)
+        with mock.patch('bio2bel_ctd.incremental.get_sha256') as get_sha256:
+            self.assertEqual(set(), self.populate_incremental())
+        get_sha256.assert_not_called()
+
+        genes_path = os.path.join(self.directory.name, os.path.basename(genes_url))
+        with gzip.open(genes_url, 'rt', encoding='utf-8') as file:
+            content = file.read()
+        with gzip.open(genes_path, 'wt', encoding='utf-8') as file:
+            file.write(content.replace('GeneSymbol3\t', 'GeneSymbol3a\t'))
+
+        # The interactions reference the genes, so they're imported again with them
+        self.assertEqual({'gene', 'chem_gene_ixn'}, self.populate_incremental())
+
+        reimported = self.get_imported()
+        self.assertEqual(imported['chemical'], reimported['chemical'])
+        self.assertEqual(imported['action'], reimported['action'])
+        self.assertLess(imported['gene'], reimported['gene'])
+        self.assertLess(imported['chem_gene_ixn'], reimported['chem_gene_ixn'])
+
+        self.assertEqual(6, self.manager.count_chemical_gene_interactions())
+        self.assertEqual(12, self.manager.session.query(ChemGeneIxnPubmed).count())
+        self.assertEqual('GeneSymbol3a', self.manager.get_interaction_by_id(6).gene.gene_symbol)
+
+
+class TestLegacyImport(_TestCountsMixin, LegacyPopulatedDatabaseMixin):
+    """Tests PyCTD's import gives the same counts as the bulk loader."""
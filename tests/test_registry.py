@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Test the registry of managers."""
+
+import threading
+
+from bio2bel_ctd import enrich_chemicals
+from bio2bel_ctd.registry import dispose_managers, get_manager
+from pybel import BELGraph
+from pybel.dsl import abundance
+from tests.constants import PopulatedDatabaseMixin
+
+
+class TestRegistry(PopulatedDatabaseMixin):
+    """Test managers are shared by connection string."""
+
+    def tearDown(self):
+        dispose_managers()
+        super().tearDown()
+
+    def test_same_manager(self):
+        manager = get_manager(self.connection)
+        self.assertIs(manager, get_manager(self.connection))
+        self.assertTrue(manager.is_populated())
+
+        dispose_managers()
+        self.assertIsNot(manager, get_manager(self.connection))
+
+    def test_session_per_thread(self):
+        manager = get_manager(self.connection)
+        sessions = []
+
+        thread = threading.Thread(target=lambda: sessions.append(manager.session()))
+        thread.start()
+        thread.join()
+
+        self.assertIs(manager.session(), manager.session())
+        self.assertIsNot(manager.session(), sessions[0])
+
+    def test_enrich_chemicals(self):
+        """Test calls of enrich_chemicals with the same connection string share a manager and its engine."""
+        manager = get_manager(self.connection)
+        engine = manager.engine
+
+        graph = BELGraph()
+        graph.add_node_from_data(abundance(namespace='MESH', identifier='ChemicalID2'))
+
+        enrich_chemicals(graph, connection=self.connection)
+        enrich_chemicals(graph, connection=self.connection)
+
+        self.assertIs(manager, get_manager(self.connection))
+        self.assertIs(engine, get_manager(self.connection).engine)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Test the statistics about the translation of interactions."""
+
+import json
+import unittest
+
+from bio2bel_ctd.enrichment_utils import add_chemical_gene_interaction
+from bio2bel_ctd.stats import TranslationStats
+from tests.constants import make_interaction
+
+
+class TestTranslationStats(unittest.TestCase):
+    """Test the translation statistics."""
+
+    def test_unmapped(self):
+        stats = TranslationStats()
+
+        for _ in range(2):
+            add_chemical_gene_interaction(None, make_interaction(['affects^methylation'], ['protein']), stats=stats)
+        add_chemical_gene_interaction(None, make_interaction(['increases^activity', 'affects^binding'], []),
+                                      stats=stats)
+
+        result = stats.to_dict()
+        self.assertEqual(0, result['translated'])
+        self.assertEqual(3, result['untranslated'])
+        self.assertEqual(
+            [('affects^methylation [protein]', 2), ('affects^binding|increases^activity []', 1)],
+            [(entry['signature'], entry['count']) for entry in result['unmapped']]
+        )
+
+    def test_update(self):
+        stats = TranslationStats()
+        stats.add_call('add_ixn_binding', 2, 0.5)
+        stats.add_call('add_ixn_increases_expression', 1, 0.25)
+
+        other = TranslationStats()
+        other.add_call('add_ixn_increases_expression', 1, 1.0)
+        other.add_unmapped((('affects^methylation',), ('protein',)))
+
+        stats.update(other)
+        result = json.loads(stats.to_json())
+
+        self.assertEqual(3, result['translated'])
+        self.assertEqual(1, result['untranslated'])
+        self.assertEqual(
+            [
+                dict(handler='add_ixn_increases_expression', calls=2, edges=2, seconds=1.25),
+                dict(handler='add_ixn_binding', calls=1, edges=2, seconds=0.5),
+            ],
+            result['handlers']
+        )
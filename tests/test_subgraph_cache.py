@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""Test the cache of the BEL translations of the interactions of chemicals and genes."""
+
+import pickle
+import unittest
+
+from bio2bel_ctd.subgraph_cache import EdgeBundle, EdgeBundleCache, apply_edge_bundle, get_edge_bundle
+from pybel import BELGraph
+from pybel.constants import INCREASES
+from pybel.dsl import abundance, protein
+from sqlalchemy import event
+from tests.constants import MappedInteractionsMixin, PopulatedDatabaseMixin
+
+
+def _make_bundle(name: str) -> EdgeBundle:
+    return EdgeBundle(nodes=[(name, {'name': name})], edges=[])
+
+
+_bundle_size = len(pickle.dumps(_make_bundle('a'), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class TestEdgeBundleCache(unittest.TestCase):
+    """Test the LRU cache of edge bundles."""
+
+    def test_lru(self):
+        cache = EdgeBundleCache(max_bytes=2 * _bundle_size)
+        cache.put('a', _make_bundle('a'))
+        cache.put('b', _make_bundle('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+        cache.put('c', _make_bundle('c'))
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('b'), msg='the least recently used bundle should have been evicted')
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+        info = cache.get_info()
+        self.assertEqual(3, info['hits'])
+        self.assertEqual(1, info['misses'])
+        self.assertEqual(1, info['evictions'])
+        self.assertLessEqual(info['bytes'], info['max_bytes'])
+
+    def test_too_big(self):
+        cache = EdgeBundleCache(max_bytes=_bundle_size - 1)
+        cache.put('a', _make_bundle('a'))
+        self.assertEqual(0, len(cache))
+
+    def test_version(self):
+        cache = EdgeBundleCache()
+        cache.put('a', _make_bundle('a'), version='v1')
+        self.assertIsNotNone(cache.get('a', version='v1'))
+        self.assertIsNone(cache.get('a', version='v2'))
+        self.assertEqual(0, len(cache))
+
+    def test_apply(self):
+        subgraph = BELGraph()
+        subgraph.add_qualified_edge(
+            abundance(namespace='MESH', name='Diethylnitrosamine'),
+            protein(namespace='ENTREZ', name='ABCC6'),
+            relation=INCREASES,
+            evidence='Diethylnitrosamine results in increased ABCC6 protein',
+            citation='19638242',
+        )
+        bundle = get_edge_bundle(subgraph)
+
+        graph = BELGraph()
+        apply_edge_bundle(graph, bundle)
+        self.assertEqual(subgraph.number_of_nodes(), graph.number_of_nodes())
+        self.assertEqual(subgraph.number_of_edges(), graph.number_of_edges())
+
+        # Changing the graph should not change the bundle
+        for _, _, data in graph.edges(data=True):
+            data['changed'] = True
+        self.assertTrue(all('changed' not in data for _, _, _, data in bundle.edges))
+
+
+class TestManagerEdgeBundleCache(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Test the manager copies the translations of chemicals and genes it already looked up from the cache."""
+
+    def setUp(self):
+        super().setUp()
+        self.manager.use_edge_bundle_cache()
+
+    def tearDown(self):
+        self.manager.edge_bundle_cache = None
+        super().tearDown()
+
+    def enrich(self):
+        graph = BELGraph()
+        self.manager.enrich_graph_chemical(graph, 'ChemicalID2')
+        self.manager.enrich_graph_gene(graph, '3')
+        return graph
+
+    def test_hit(self):
+        """Test a cache hit adds the same nodes and edges as a miss, without querying the database."""
+        graph = self.enrich()
+
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.manager.engine, 'before_cursor_execute', log_statement)
+        self.addCleanup(event.remove, self.manager.engine, 'before_cursor_execute', log_statement)
+
+        cached_graph = self.enrich()
+        self.assertEqual([], statements)
+
+        self.manager.edge_bundle_cache = None
+        uncached_graph = self.enrich()
+
+        # Interactions 2, 5, and 6 of ChemicalID2 and 3 and 6 of gene 3, which each have two PubMed identifiers
+        self.assertEqual(8, graph.number_of_edges())
+        for other_graph in (cached_graph, uncached_graph):
+            self.assertEqual(set(graph), set(other_graph))
+            self.assertEqual(set(graph.edges(keys=True)), set(other_graph.edges(keys=True)))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""Test the conversion of the whole database to BEL."""
+
+import os
+from unittest import mock
+
+from bio2bel_ctd.bel_cache import get_bel_cache_path
+from bio2bel_ctd.filters import InteractionFilter
+from bio2bel_ctd.manager import _is_shared_database
+from bio2bel_ctd.stats import TranslationStats
+from pybel.constants import EVIDENCE
+from sqlalchemy import event
+from sqlalchemy.engine.url import make_url
+from tests.constants import (
+    MappedInteractionsMixin, PopulatedDatabaseMixin, _only_tables, _urls, add_fixture_interaction,
+)
+
+
+class TestInteractionChunks(PopulatedDatabaseMixin):
+    """Test iterating over chunks of the interactions that are converted to BEL."""
+
+    def test_chunks(self):
+        """Test the chunks cover the interactions in order and come with everything needed to convert them."""
+        statements = []
+
+        def log_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.manager.engine, 'before_cursor_execute', log_statement)
+        self.addCleanup(event.remove, self.manager.engine, 'before_cursor_execute', log_statement)
+
+        ids = []
+        previous_chunk = []
+        for chunk in self.manager.iter_chemical_gene_interaction_chunks(chunk_size=2):
+            self.assertEqual(2, len(chunk))
+            self.assertFalse(
+                any(ixn in self.manager.session for ixn in previous_chunk),
+                msg='the session should be cleared between chunks',
+            )
+
+            del statements[:]
+            for ixn in chunk:
+                ids.append(ixn.id)
+                self.assertIsNotNone(ixn.chemical.chemical_id)
+                self.assertIsNotNone(ixn.gene.gene_id)
+                self.assertEqual(2, len(ixn.pubmed_ids))
+                self.assertEqual(2, len(ixn.gene_forms))
+                self.assertLess(0, len(ixn.interaction_actions))
+            self.assertEqual([], statements, msg='the related entities should be loaded with the chunk')
+
+            previous_chunk = chunk
+
+        self.assertEqual([1, 2, 3, 4, 5, 6], ids)
+        self.assertFalse(any(ixn in self.manager.session for ixn in previous_chunk))
+
+
+class TestToBEL(MappedInteractionsMixin, PopulatedDatabaseMixin):
+    """Test converting the database to BEL."""
+
+    def setUp(self):
+        super().setUp()
+
+        # The MeSH namespace is added from Bio2BEL MeSH's own tables, which the test database doesn't have
+        patcher = mock.patch('bio2bel_ctd.manager.bio2bel_mesh')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parallel(self):
+        """Test converting in several processes gives the same graph as converting in this one."""
+        graph = self.manager.to_bel(use_cache=False)
+        parallel_graph = self.manager.to_bel(workers=2, use_cache=False)
+
+        # Each of the six interactions is added with an edge for each of its two PubMed identifiers
+        self.assertEqual(12, graph.number_of_edges())
+        self.assertEqual(set(graph), set(parallel_graph))
+        self.assertEqual(set(graph.edges(keys=True)), set(parallel_graph.edges(keys=True)))
+
+    def test_in_memory(self):
+        """Test an in-memory database is converted in this process, since worker processes would get empty ones."""
+        self.assertTrue(_is_shared_database(self.manager.engine.url))
+        self.assertTrue(_is_shared_database(make_url('postgresql://localhost/ctd')))
+        self.assertFalse(_is_shared_database(make_url('sqlite://')))
+        self.assertFalse(_is_shared_database(make_url('sqlite:///:memory:')))
+
+        with mock.patch('bio2bel_ctd.manager._is_shared_database', return_value=False), \
+                mock.patch.object(self.manager, '_add_interactions_parallel') as add_interactions_parallel:
+            graph = self.manager.to_bel(workers=2, use_cache=False)
+
+        add_interactions_parallel.assert_not_called()
+        self.assertEqual(12, graph.number_of_edges())
+
+    def test_cache(self):
+        """Test the graph is loaded from the cache once it's built, until the database is populated again."""
+        self.manager.to_bel()
+        self.assertEqual([], os.listdir(self.bel_cache_dir), msg='the cache should only be used when asked for')
+
+        graph = self.manager.to_bel(use_cache=True)
+        path = get_bel_cache_path(self.manager.get_database_version(), directory=self.bel_cache_dir)
+        self.assertTrue(os.path.exists(path))
+
+        with mock.patch.object(self.manager, '_to_bel') as build:
+            cached_graph = self.manager.to_bel(use_cache=True)
+        build.assert_not_called()
+        self.assertEqual(set(graph), set(cached_graph))
+        self.assertEqual(set(graph.edges(keys=True)), set(cached_graph.edges(keys=True)))
+
+        self.manager.populate(urls=_urls, only_tables=_only_tables)
+        self.assertFalse(os.path.exists(path))
+
+        with mock.patch.object(self.manager, '_to_bel', return_value=graph) as build:
+            self.manager.to_bel(use_cache=True)
+        build.assert_called_once()
+
+    def test_filters(self):
+        """Test only the interactions that meet the conditions of the filters are translated."""
+        filters = InteractionFilter(organism_ids=[2])
+
+        for workers in (1, 2):
+            stats = TranslationStats()
+            graph = self.manager.to_bel(workers=workers, stats=stats, filters=filters, use_cache=False)
+
+            # Interaction 2 is the only one of organism 2. It's added with an edge for each of its PubMed identifiers.
+            self.assertEqual({add_fixture_interaction.__name__: 1}, dict(stats.calls), msg='workers={}'.format(workers))
+            self.assertEqual(2, graph.number_of_edges())
+            self.assertEqual({'Interaction2'}, {data[EVIDENCE] for _, _, data in graph.edges(data=True)})
+
+    def test_filters_cache(self):
+        """Test the graph built with filters is cached next to the graph of the whole database."""
+        graph = self.manager.to_bel(use_cache=True)
+        filtered_graph = self.manager.to_bel(filters=InteractionFilter(organism_ids=[2]), use_cache=True)
+
+        version = self.manager.get_database_version()
+        path = get_bel_cache_path(version, directory=self.bel_cache_dir)
+        filtered_path = get_bel_cache_path(
+            version,
+            directory=self.bel_cache_dir,
+            variant=InteractionFilter(organism_ids=[2]).get_key(),
+        )
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(os.path.exists(filtered_path))
+
+        with mock.patch.object(self.manager, '_to_bel') as build:
+            cached_graph = self.manager.to_bel(use_cache=True)
+            cached_filtered_graph = self.manager.to_bel(filters=InteractionFilter(organism_ids=[2]), use_cache=True)
+        build.assert_not_called()
+
+        self.assertEqual(12, cached_graph.number_of_edges())
+        self.assertEqual(set(graph.edges(keys=True)), set(cached_graph.edges(keys=True)))
+        self.assertEqual(2, cached_filtered_graph.number_of_edges())
+        self.assertEqual(set(filtered_graph.edges(keys=True)), set(cached_filtered_graph.edges(keys=True)))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Test the JSON API of the web application."""
+
+import json
+import unittest
+
+from tests.constants import PopulatedDatabaseMixin
+
+try:
+    from bio2bel_ctd.web import get_app
+except ImportError:
+    get_app = None
+
+
+@unittest.skipIf(get_app is None, 'Flask or Flask-Admin is not installed')
+class TestApi(PopulatedDatabaseMixin):
+    """Test the JSON API."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = get_app(connection=self.manager).test_client()
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code, msg=url)
+        return json.loads(response.data.decode('utf-8'))
+
+    def test_keyset_pages(self):
+        ids, after = [], None
+        while True:
+            url = '/api/interaction?limit=4' + ('' if after is None else '&after={}'.format(after))
+            page = self.get_json(url)
+            ids.extend(ixn['id'] for ixn in page['results'])
+            after = page['next']
+            if after is None:
+                break
+
+        self.assertEqual([1, 2, 3, 4, 5, 6], ids)
+
+    def test_get(self):
+        self.assertEqual('ChemicalName2', self.get_json('/api/chemical/ChemicalID2')['name'])
+        self.assertEqual('GeneSymbol3', self.get_json('/api/gene/3')['symbol'])
+        self.assertEqual([11, 12], sorted(self.get_json('/api/interaction/6')['pubmed_ids']))
+        self.assertEqual(404, self.client.get('/api/chemical/missing').status_code)
+
+    def test_lookup(self):
+        response = self.client.post(
+            '/api/lookup',
+            data=json.dumps(dict(chemicals=['ChemicalID1', 'missing'], genes=['3', 'nope'])),
+            content_type='application/json',
+        )
+        data = json.loads(response.data.decode('utf-8'))
+
+        self.assertEqual('ChemicalName1', data['chemicals']['ChemicalID1']['name'])
+        self.assertIsNone(data['chemicals']['missing'])
+        self.assertEqual(3, data['genes']['3']['entrez_id'])
+        self.assertIsNone(data['genes']['nope'])
+
+    def test_stream_interactions(self):
+        response = self.client.get('/api/chemical/ChemicalID2/interactions?chunk_size=1')
+        self.assertEqual('application/x-ndjson', response.mimetype)
+
+        rows = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        self.assertEqual([2, 5, 6], [row['id'] for row in rows])
+        self.assertTrue(all(row['chemical_mesh_id'] == 'ChemicalID2' for row in rows))
+
+    def test_stream_keeps_session(self):
+        """Test streaming interactions doesn't detach the objects other requests loaded in the manager's session."""
+        chemical = self.manager.get_chemical_by_mesh('ChemicalID2')
+
+        response = self.client.get('/api/gene/3/interactions?chunk_size=1')
+        self.assertEqual([3, 6], [json.loads(line)['id'] for line in response.data.decode('utf-8').splitlines()])
+
+        self.assertIn(chemical, self.manager.session)